@@ -42,5 +42,8 @@ setuptools.setup(
         "granary",
         "http_message_signatures",
         "python-jose"
-    ]
+    ],
+    extras_require={
+        "aio": ["aiohttp"]
+    }
 )
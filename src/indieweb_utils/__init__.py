@@ -4,7 +4,24 @@ Utilities to aid the implementation of various IndieWeb specifications and funct
 
 # Imports added for API backwards compatibility
 
-from .feeds import FeedUrl, discover_h_feed, discover_web_page_feeds, retrieve_feed_contents
+from .feeds import (
+    FeedDiscoveryResult,
+    FeedPollResponse,
+    FeedScheduler,
+    FeedState,
+    FeedUrl,
+    SeenFeedItems,
+    WebSubSubscriber,
+    WebSubSubscription,
+    discover_feeds_for_sites,
+    discover_h_feed,
+    discover_web_page_feeds,
+    iter_feed_items,
+    iter_new_feed_items,
+    poll_feed,
+    retrieve_feed_contents,
+    retrieve_new_feed_items,
+)
 from .images import reduce_image_size
 from .indieauth import (
     _validate_indieauth_response,
@@ -20,13 +37,21 @@ from .indieauth import (
 )
 from .indieauth.flask import IndieAuthCallbackResponse, indieauth_callback_handler
 from .indieauth.scopes import SCOPE_DEFINITIONS
+from .network import HTTPClient, get_default_client, set_default_client
 from .pagination import Paginator
+from .parsing import MF2ParseResult, ParsedPage, parse_mf2_documents
 from .posts.discovery import discover_author, discover_original_post, get_post_type
 from .posts.in_reply_to import get_reply_urls
 from .posts.page_name import get_page_name
 from .posts.posse import get_syndicated_copies
 from .posts.representative_h_card import get_representative_h_card
-from .replies import ReplyContext, get_reply_context
+from .replies import (
+    ReplyContext,
+    ReplyContextCache,
+    ReplyContextResult,
+    get_reply_context,
+    get_reply_contexts,
+)
 from .rsd import rsd_discovery
 from .salmention import SalmentionParsedResponse, process_salmention
 from .trackback import (
@@ -44,10 +69,17 @@ from .utils.url_summary import InvalidURL, get_url_summary
 from .utils.urls import canonicalize_url, is_site_url, remove_tracking_params, slugify
 from .utils.web_bot_auth import HTTPSignatureKeyResolver, signed_web_bot_auth_request
 from .webmentions import (
+    BulkWebmentionResult,
     SendWebmentionResponse,
+    WebmentionCoalescer,
+    WebmentionOutbox,
+    WebmentionOutboxResult,
+    WebmentionQueue,
+    WebmentionQueueResult,
     discover_endpoints,
     discover_webmention_endpoint,
     send_webmention,
+    send_webmentions,
     validate_webmention,
 )
 from .feeds import urls
@@ -59,6 +91,8 @@ _discover_endpoints = discover_endpoints
 
 __all__ = [
     "discover_web_page_feeds",
+    "discover_feeds_for_sites",
+    "FeedDiscoveryResult",
     "discover_author",
     "discover_original_post",
     "get_post_type",
@@ -112,6 +146,32 @@ __all__ = [
     "add_footnote_links",
     "SalmentionParsedResponse",
     "retrieve_feed_contents",
+    "iter_feed_items",
     "HTTPSignatureKeyResolver",
     "signed_web_bot_auth_request",
+    "HTTPClient",
+    "get_default_client",
+    "set_default_client",
+    "send_webmentions",
+    "BulkWebmentionResult",
+    "ParsedPage",
+    "poll_feed",
+    "FeedPollResponse",
+    "FeedScheduler",
+    "FeedState",
+    "WebSubSubscriber",
+    "WebSubSubscription",
+    "iter_new_feed_items",
+    "SeenFeedItems",
+    "retrieve_new_feed_items",
+    "parse_mf2_documents",
+    "MF2ParseResult",
+    "WebmentionQueue",
+    "WebmentionQueueResult",
+    "WebmentionOutbox",
+    "WebmentionOutboxResult",
+    "WebmentionCoalescer",
+    "get_reply_contexts",
+    "ReplyContextResult",
+    "ReplyContextCache",
 ]
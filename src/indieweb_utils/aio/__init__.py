@@ -0,0 +1,42 @@
+"""
+Asynchronous versions of the IndieWeb Utils functions that make network requests.
+
+This module requires aiohttp, which you can install with `pip install indieweb-utils[aio]`.
+"""
+
+try:
+    import aiohttp  # noqa: F401
+except ImportError:  # pragma: no cover
+    raise ImportError("indieweb_utils.aio requires aiohttp. Install it with `pip install indieweb-utils[aio]`.")
+
+from .client import (
+    AsyncHTTPClient,
+    AsyncRequestError,
+    AsyncRequestTimeout,
+    AsyncResponse,
+    get_default_client,
+    set_default_client,
+)
+from .feeds import discover_web_page_feeds
+from .replies import get_reply_context
+from .webmentions import (
+    discover_endpoints,
+    discover_webmention_endpoint,
+    send_webmention,
+    validate_webmention,
+)
+
+__all__ = [
+    "AsyncHTTPClient",
+    "AsyncRequestError",
+    "AsyncRequestTimeout",
+    "AsyncResponse",
+    "get_default_client",
+    "set_default_client",
+    "discover_endpoints",
+    "discover_webmention_endpoint",
+    "send_webmention",
+    "validate_webmention",
+    "get_reply_context",
+    "discover_web_page_feeds",
+]
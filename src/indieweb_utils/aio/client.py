@@ -0,0 +1,283 @@
+import asyncio
+import json
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .. import constants
+from ..network.client import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+from ..network.limits import DEFAULT_CHUNK_SIZE, ResponseTooLarge, _get_content_length
+
+
+class AsyncRequestError(requests.exceptions.RequestException):
+    """
+    Raised when an asynchronous request cannot be completed.
+
+    This is a subclass of `requests.exceptions.RequestException` so the same error handling
+    works with both the synchronous and asynchronous APIs.
+    """
+
+
+class AsyncRequestTimeout(AsyncRequestError, requests.exceptions.Timeout):
+    """
+    Raised when an asynchronous request times out.
+    """
+
+
+class AsyncTooManyRedirects(AsyncRequestError, requests.exceptions.TooManyRedirects):
+    """
+    Raised when an asynchronous request is redirected more times than allowed.
+    """
+
+
+class AsyncResponseTooLarge(AsyncRequestError, ResponseTooLarge):
+    """
+    Raised when the body of an asynchronous response is larger than the number of bytes allowed.
+    """
+
+
+@dataclass
+class AsyncResponse:
+    """
+    A fully read response to an asynchronous request.
+
+    The attribute names match those of `requests.Response`, so responses can be passed
+    to the parsing functions shared with the synchronous API.
+    """
+
+    url: str
+    status_code: int
+    headers: CaseInsensitiveDict
+    content: bytes
+    encoding: Optional[str]
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+async def _read_content(response: aiohttp.ClientResponse, max_bytes: Optional[int]) -> bytes:
+    if max_bytes is None:
+        return await response.read()
+
+    if _get_content_length(response.headers) > max_bytes:
+        raise AsyncResponseTooLarge(f"Response from {response.url} is larger than {max_bytes} bytes.")
+
+    chunks = []
+    received = 0
+
+    # Content-Length can be missing or wrong, so the bytes received are counted too
+    async for chunk in response.content.iter_chunked(DEFAULT_CHUNK_SIZE):
+        received += len(chunk)
+
+        if received > max_bytes:
+            raise AsyncResponseTooLarge(f"Response from {response.url} is larger than {max_bytes} bytes.")
+
+        chunks.append(chunk)
+
+    return b"".join(chunks)
+
+
+def _join_headers(headers) -> CaseInsensitiveDict:
+    # repeated headers (i.e. several Link headers) are joined the same way requests joins them
+    joined: CaseInsensitiveDict = CaseInsensitiveDict()
+
+    for name in headers.keys():
+        if name not in joined:
+            joined[name] = ", ".join(headers.getall(name))
+
+    return joined
+
+
+class AsyncHTTPClient:
+    """
+    A pooled asyncio HTTP client used by the functions in `indieweb_utils.aio`.
+
+    The client is backed by an `aiohttp.ClientSession`, which is created on first use
+    and keeps keep-alive connections open for every host.
+
+    :param timeout: The total timeout, in seconds, applied to requests that do not specify one.
+    :type timeout: float
+    :param limit: The maximum number of simultaneous connections.
+    :type limit: int
+    :param limit_per_host: The maximum number of simultaneous connections to one host.
+    :type limit_per_host: int
+    :param user_agent: The User-Agent to send with requests that do not set one.
+    :type user_agent: str
+
+    Example:
+
+    .. code-block:: python
+
+        import asyncio
+
+        from indieweb_utils import aio
+
+        async def main():
+            async with aio.AsyncHTTPClient() as client:
+                endpoint = await aio.discover_webmention_endpoint("https://jamesg.blog/", client=client)
+
+        asyncio.run(main())
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        limit: int = 100,
+        limit_per_host: int = DEFAULT_POOL_SIZE,
+        user_agent: Optional[str] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.user_agent = user_agent or constants.USER_AGENT
+
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions must be created inside a running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host),
+                headers={"User-Agent": self.user_agent},
+            )
+
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        allow_redirects: bool = True,
+        max_redirects: int = 30,
+        verify: bool = True,
+        max_bytes: Optional[int] = None,
+        on_headers: Optional[Callable[[AsyncResponse], None]] = None,
+    ) -> AsyncResponse:
+        """
+        Make a HTTP request and read the full response.
+
+        The timeout applies to the whole request, including reading the response body.
+
+        :param method: The HTTP method to use.
+        :type method: str
+        :param url: The URL to request.
+        :type url: str
+        :param max_bytes: The maximum number of bytes of the response body to read (optional).
+            The request stops as soon as more bytes are received.
+        :type max_bytes: int
+        :param on_headers: A function called with the response before its body is read (optional).
+            The content of the response is empty. If the function raises an exception, the body
+            is not read and the exception is raised.
+        :type on_headers: Callable[[AsyncResponse], None]
+        :return: The response.
+        :rtype: AsyncResponse
+
+        :raises AsyncRequestError: The request could not be completed.
+        """
+        try:
+            async with self._get_session().request(
+                method,
+                url,
+                headers=headers,
+                data=data,
+                timeout=aiohttp.ClientTimeout(total=timeout or self.timeout),
+                allow_redirects=allow_redirects,
+                max_redirects=max_redirects,
+                ssl=verify,
+            ) as response:
+                headers = _join_headers(response.headers)
+
+                if on_headers is not None:
+                    on_headers(AsyncResponse(str(response.url), response.status, headers, b"", None))
+
+                content = await _read_content(response, max_bytes)
+
+                return AsyncResponse(
+                    url=str(response.url),
+                    status_code=response.status,
+                    headers=headers,
+                    content=content,
+                    encoding=response.get_encoding() if content else None,
+                )
+        except asyncio.TimeoutError:
+            raise AsyncRequestTimeout(f"Request to {url} timed out.")
+        except aiohttp.TooManyRedirects:
+            raise AsyncTooManyRedirects(f"Request to {url} was redirected too many times.")
+        except (aiohttp.ClientError, ValueError) as e:
+            raise AsyncRequestError(f"Request to {url} could not be completed: {e}")
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        """Make a GET request. Accepts the same arguments as `request()`."""
+        return await self.request("GET", url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> AsyncResponse:
+        """Make a HEAD request. Accepts the same arguments as `request()`."""
+        kwargs.setdefault("allow_redirects", False)
+        return await self.request("HEAD", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> AsyncResponse:
+        """Make a POST request. Accepts the same arguments as `request()`."""
+        return await self.request("POST", url, **kwargs)
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+
+_default_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHTTPClient]" = weakref.WeakKeyDictionary()
+
+
+def get_default_client() -> AsyncHTTPClient:
+    """
+    Return the asynchronous HTTP client used by functions that are not given a `client` argument.
+
+    Connections cannot be shared between event loops, so each event loop has its own default
+    client, which is created on first use. Close it with `await client.close()` before the
+    event loop stops.
+
+    :return: The default asynchronous HTTP client of the running event loop.
+    :rtype: AsyncHTTPClient
+    """
+    loop = asyncio.get_running_loop()
+    client = _default_clients.get(loop)
+
+    if client is None:
+        client = _default_clients[loop] = AsyncHTTPClient()
+
+    return client
+
+
+def set_default_client(client: AsyncHTTPClient) -> None:
+    """
+    Set the asynchronous HTTP client used by functions that are not given a `client` argument
+    in the running event loop.
+
+    :param client: The client to use by default.
+    :type client: AsyncHTTPClient
+    """
+    _default_clients[asyncio.get_running_loop()] = client
+
+
+def _get_client(client: Optional[AsyncHTTPClient] = None) -> AsyncHTTPClient:
+    """
+    Return the given client, or the default client of the running event loop if none was provided.
+    """
+    return client if client is not None else get_default_client()
@@ -0,0 +1,47 @@
+from typing import List, Optional
+
+import requests
+
+from ..feeds.discovery import FeedUrl, _find_page_feeds, _normalize_page_url
+from .client import AsyncHTTPClient, _get_client
+
+
+async def discover_web_page_feeds(
+    url: str,
+    user_mime_types: Optional[List[str]] = None,
+    html: str = "",
+    user_agent: str = "",
+    client: Optional[AsyncHTTPClient] = None,
+) -> List[FeedUrl]:
+    """
+    Get all feeds on a web page.
+
+    This is the asynchronous version of `indieweb_utils.discover_web_page_feeds()`.
+
+    :param url: The URL of the page whose associated feeds you want to retrieve.
+    :type url: str
+    :param user_mime_types: A list of mime types whose associated feeds you want to retrieve.
+    :type user_mime_types: Optional[List[str]]
+    :param html: A string with the HTML on a page.
+    :type html: str
+    :param client: The asynchronous HTTP client to use (optional).
+    :type client: AsyncHTTPClient
+    :return: A list of FeedUrl objects.
+    :rtype: List[FeedUrl]
+    """
+    url = _normalize_page_url(url)
+
+    headers = {"User-Agent": user_agent} if user_agent else None
+
+    http = _get_client(client)
+
+    try:
+        if html:
+            web_page_request = await http.head(url, timeout=10, allow_redirects=True, headers=headers)
+        else:
+            web_page_request = await http.get(url, timeout=10, headers=headers)
+            html = web_page_request.text
+    except requests.RequestException:
+        raise Exception("Request to retrieve URL did not return a valid response.")
+
+    return _find_page_feeds(url, html, web_page_request.headers, user_mime_types or [])
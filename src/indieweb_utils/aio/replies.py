@@ -0,0 +1,191 @@
+import asyncio
+from typing import Any, Awaitable, List, Optional
+from urllib import parse as url_parse
+
+import requests
+from bs4 import BeautifulSoup
+
+from ..network.cache import Cache
+from ..replies.context import (
+    _HEAD_NOT_SUPPORTED,
+    _WEBMENTION_ENDPOINT_ERRORS,
+    DEFAULT_ICON_TTL,
+    DEFAULT_SUBREQUEST_DEADLINE,
+    ReplyContext,
+    ReplyContextRetrievalError,
+    UnsupportedScheme,
+    _find_favicon,
+    _find_post_content_favicon,
+    _generate_h_entry_reply_context,
+    _generate_reply_context_from_main_page,
+    _get_author_page_url,
+    _get_favicon_url,
+    _get_icon_cache,
+    _get_icon_cache_key,
+    _get_reply_context_h_entry,
+)
+from ..webmentions.discovery import (
+    _WEBMENTION,
+    _parse_endpoints,
+    _process_webmention_endpoint,
+)
+from .client import AsyncHTTPClient, AsyncResponse, AsyncResponseTooLarge, _get_client
+
+
+async def _get_author_page(author_url: Optional[str], client: AsyncHTTPClient) -> Optional[str]:
+    if not author_url:
+        return None
+
+    try:
+        response = await client.get(author_url, timeout=10, verify=False)
+    except requests.exceptions.RequestException:
+        return None
+
+    return response.text
+
+
+async def _check_icon(photo_url: str, client: AsyncHTTPClient) -> bool:
+    r = await client.head(photo_url, timeout=10, verify=False, allow_redirects=True)
+
+    if r.status_code not in _HEAD_NOT_SUPPORTED:
+        return r.status_code == 200
+
+    statuses: List[int] = []
+
+    def check_status(response: AsyncResponse) -> None:
+        statuses.append(response.status_code)
+
+    # if the Range header is ignored, the request stops after the first byte, so the icon is not downloaded
+    try:
+        await client.get(
+            photo_url,
+            headers={"Range": "bytes=0-0"},
+            timeout=10,
+            verify=False,
+            max_bytes=1,
+            on_headers=check_status,
+        )
+    except AsyncResponseTooLarge:
+        pass
+
+    return statuses[0] in (200, 206)
+
+
+async def _get_favicon(
+    photo_url: Optional[str], domain: str, client: AsyncHTTPClient, icon_cache: Optional[Cache] = None
+) -> str:
+    if not photo_url:
+        return ""
+
+    cache = _get_icon_cache(icon_cache)
+    key = _get_icon_cache_key(domain)
+
+    icon = cache.get(key)
+
+    if icon is None:
+        photo_url = _get_favicon_url(photo_url, domain)
+
+        try:
+            exists = await _check_icon(photo_url, client)
+        except requests.exceptions.RequestException:
+            return ""
+
+        icon = photo_url if exists else ""
+
+        cache.set(key, icon, DEFAULT_ICON_TTL)
+
+    return icon
+
+
+async def _with_deadline(request: Awaitable, deadline: float, default: Any) -> Any:
+    try:
+        return await asyncio.wait_for(request, deadline)
+    except asyncio.TimeoutError:
+        return default
+
+
+async def get_reply_context(
+    url: str,
+    summary_word_limit: int = 75,
+    client: Optional[AsyncHTTPClient] = None,
+    deadline: float = DEFAULT_SUBREQUEST_DEADLINE,
+    icon_cache: Optional[Cache] = None,
+) -> ReplyContext:
+    """
+    Generate reply context for use on your website based on a URL.
+
+    This is the asynchronous version of `indieweb_utils.get_reply_context()`.
+
+    The webmention endpoint is read from the page that is retrieved to generate the reply context,
+    and the author page and favicon of the page are retrieved at the same time.
+
+    :param url: The URL of the post to generate reply context for.
+    :type url: str
+    :param summary_word_limit: The maximum number of words to include in the summary (default 75).
+    :type summary_word_limit: int
+    :param client: The asynchronous HTTP client to use (optional).
+    :type client: AsyncHTTPClient
+    :param deadline: The number of seconds in which the author page and favicon must be retrieved
+        (default 10). If they are not retrieved in time, the reply context is generated without them.
+    :type deadline: float
+    :param icon_cache: The cache in which to store the icon of each site for a day (optional).
+        If None, icons are stored in memory and shared by every reply context.
+    :type icon_cache: Cache
+    :return: A ReplyContext object with information about the specified web page.
+    :rtype: ReplyContext
+
+    :raises ReplyContextRetrievalError: Reply context cannot be retrieved.
+    :raises UnsupportedScheme: The specified URL does not use http:// or https://.
+    """
+    parsed_url = url_parse.urlsplit(url)
+    http_headers = {"Accept": "text/html"}
+
+    if parsed_url.scheme not in ["http", "https"]:
+        raise UnsupportedScheme(f"{parsed_url.scheme} is not supported.")
+
+    domain = parsed_url.netloc
+
+    http = _get_client(client)
+
+    try:
+        page_content = await http.get(url, timeout=10, verify=False, headers=http_headers)
+    except requests.exceptions.RequestException:
+        raise ReplyContextRetrievalError("Could not retrieve page content.")
+
+    if page_content.status_code != 200:
+        raise ReplyContextRetrievalError(f"Page returned a {page_content.status_code} response.")
+
+    html = page_content.text
+
+    try:
+        endpoints = _parse_endpoints(url, page_content.headers, html, [_WEBMENTION])
+        webmention_endpoint_url = _process_webmention_endpoint(url, endpoints).endpoint
+    except _WEBMENTION_ENDPOINT_ERRORS:
+        webmention_endpoint_url = ""
+
+    h_entry = _get_reply_context_h_entry(html)
+
+    if h_entry:
+        author_page_url = _get_author_page_url(h_entry, url, domain)
+
+        # both requests start at the same time, so they share one deadline. The page itself has already
+        # been retrieved, so it is not retrieved again as the author page
+        author_page_html, favicon_url = await asyncio.gather(
+            _with_deadline(_get_author_page(author_page_url if author_page_url != url else None, http), deadline, None),
+            _with_deadline(_get_favicon(_find_post_content_favicon(h_entry), domain, http, icon_cache), deadline, ""),
+        )
+
+        if author_page_url == url:
+            author_page_html = html
+
+        return _generate_h_entry_reply_context(
+            h_entry, url, domain, webmention_endpoint_url, summary_word_limit, author_page_html, favicon_url
+        )
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    favicon_url = await _with_deadline(_get_favicon(_find_favicon(soup), domain, http, icon_cache), deadline, "")
+
+    return _generate_reply_context_from_main_page(
+        soup, domain, webmention_endpoint_url, summary_word_limit, favicon_url
+    )
@@ -0,0 +1,298 @@
+from typing import Dict, List, Optional
+
+import requests
+from bs4 import BeautifulSoup
+
+from ..network.cache import Cache
+from ..network.limits import ResponseTooLarge
+from ..webmentions.discovery import (
+    _WEBMENTION,
+    TargetNotProvided,
+    WebmentionDiscoveryResponse,
+    _cache_webmention_endpoint,
+    _check_target_status,
+    _get_cached_webmention_endpoint,
+    _parse_endpoints,
+    _process_webmention_endpoint,
+)
+from ..webmentions.send import (
+    CouldNotConnectToWebmentionEndpoint,
+    SendWebmentionResponse,
+    _get_webmention_request_data,
+    _process_webmention_response,
+    _validate_approved_domain,
+    _validate_webmention,
+)
+from ..webmentions.validate import (
+    DEFAULT_MAX_SOURCE_SIZE,
+    DEFAULT_SOURCE_DEADLINE,
+    NoTokenEndpointForPrivateWebmention,
+    WebmentionCheckResponse,
+    WebmentionValidationError,
+    _check_source_document,
+    _check_source_status,
+    _validate_headers,
+    _validate_source_and_target,
+    _vouch_is_candidate,
+    _vouch_links_to_source,
+)
+from .client import AsyncHTTPClient, AsyncResponse, _get_client
+
+
+async def discover_endpoints(
+    url: str, headers_to_find: List[str], client: Optional[AsyncHTTPClient] = None
+) -> Dict[str, str]:
+    """
+    Return a dictionary of specified endpoint locations for the given URL, if available.
+
+    This is the asynchronous version of `indieweb_utils.discover_endpoints()`.
+
+    :param url: The URL to discover endpoints for.
+    :type url: str
+    :param headers_to_find: The headers to find.
+    :type headers_to_find: list[str]
+    :param client: The asynchronous HTTP client to use (optional).
+    :type client: AsyncHTTPClient
+    :return: The discovered endpoints.
+    :rtype: dict[str, str]
+
+    :raises requests.exceptions.RequestException: Error raised while making the network request to discover endpoints.
+    """
+    http = _get_client(client)
+
+    try:
+        endpoint_request = await http.get(url, timeout=5)
+    except requests.exceptions.RequestException:
+        raise requests.exceptions.RequestException("Could not connect to the specified URL.")
+
+    return _parse_endpoints(url, endpoint_request.headers, endpoint_request.text, headers_to_find)
+
+
+async def discover_webmention_endpoint(
+    target: str, client: Optional[AsyncHTTPClient] = None, cache: Optional[Cache] = None
+) -> WebmentionDiscoveryResponse:
+    """
+    Return the webmention endpoint for the given target.
+
+    This is the asynchronous version of `indieweb_utils.discover_webmention_endpoint()`.
+
+    :param target: The target to discover the webmention endpoint for.
+    :type target: str
+    :param client: The asynchronous HTTP client to use (optional).
+    :type client: AsyncHTTPClient
+    :param cache: The cache in which to store discovered endpoints (optional).
+    :type cache: Cache
+    :return: The discovered webmention endpoint.
+    :rtype: WebmentionDiscoveryResponse
+
+    .. code-block:: python
+
+        from indieweb_utils import aio
+
+        webmention_endpoint = await aio.discover_webmention_endpoint("https://jamesg.blog/")
+
+    :raises TargetNotProvided: Target is not provided.
+    :raises WebmentionEndpointNotFound: Webmention endpoint is not found.
+    :raises WebmentionTargetUnavailable: Target returned a 5xx or 429 status code.
+    :raises UnacceptableIPAddress: Endpoint does not connect to an accepted IP.
+    :raises LocalhostEndpointFound: Discovered endpoint is equal to localhost.
+    """
+    if not target:
+        raise TargetNotProvided("No target provided.")
+
+    if cache is not None:
+        cached_endpoint = _get_cached_webmention_endpoint(target, cache)
+
+        if cached_endpoint is not None:
+            return cached_endpoint
+
+    http = _get_client(client)
+
+    try:
+        endpoint_request = await http.get(target, timeout=5)
+    except requests.exceptions.RequestException:
+        raise requests.exceptions.RequestException("Could not connect to the specified URL.")
+
+    _check_target_status(endpoint_request.status_code, endpoint_request.headers)
+
+    endpoints = _parse_endpoints(target, endpoint_request.headers, endpoint_request.text, [_WEBMENTION])
+
+    if cache is None:
+        return _process_webmention_endpoint(target, endpoints)
+
+    return _cache_webmention_endpoint(target, endpoints, endpoint_request.status_code, endpoint_request.headers, cache)
+
+
+async def send_webmention(
+    source: str,
+    target: str,
+    me: str = None,
+    code: str = None,
+    realm: str = None,
+    target_webmention_endpoint: str = None,
+    client: Optional[AsyncHTTPClient] = None,
+    cache: Optional[Cache] = None,
+) -> SendWebmentionResponse:
+    """
+    Send a webmention to a target URL.
+
+    This is the asynchronous version of `indieweb_utils.send_webmention()`, and accepts the same arguments.
+
+    .. code-block:: python
+
+        from indieweb_utils import aio
+
+        response = await aio.send_webmention(
+            source="https://example.com",
+            target="https://example.example.com/post/1",
+        )
+
+    :raises TargetIsNotApprovedDomain: Target is not in list of approved domains.
+    :raises GenericWebmentionError: Generic webmention error.
+    :raises CouldNotConnectToWebmentionEndpoint: Could not connect to the receiver's webmention endpoint.
+    """
+    _validate_webmention(source, target)
+
+    _validate_approved_domain(target, me)
+
+    http = _get_client(client)
+
+    if not target_webmention_endpoint:
+        response = await discover_webmention_endpoint(target, client=http, cache=cache)
+
+        target_webmention_endpoint = response.endpoint
+
+    try:
+        r = await http.post(
+            target_webmention_endpoint,
+            data=_get_webmention_request_data(source, target, code, realm),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+    except requests.exceptions.RequestException:
+        raise CouldNotConnectToWebmentionEndpoint("Could not connect to the receiver's webmention endpoint.")
+
+    return _process_webmention_response(target, r.status_code, r.headers, r.text)
+
+
+async def _validate_private_webmention(source: str, client: AsyncHTTPClient, code: str) -> str:
+    source_token_endpoint = await discover_endpoints(source, ["token_endpoint"], client=client)
+
+    if source_token_endpoint.get("token_endpoint") is None:
+        raise NoTokenEndpointForPrivateWebmention(
+            "The webmention sent is a private webmention but the source has no token endpoint."
+        )
+
+    try:
+        token_request = await client.post(
+            source_token_endpoint["token_endpoint"], data={"grant_type": "authorization_code", "code": code}
+        )
+    except requests.exceptions.RequestException:
+        raise WebmentionValidationError(
+            "Token endpoint of source could not be accessed while trying to validate private webmention."
+        )
+
+    if token_request.status_code != 200:
+        raise WebmentionValidationError(
+            "Token endpoint of source returned an error while trying to validate private webmention."
+        )
+
+    return token_request.json().get("access_token")
+
+
+async def _process_vouch(vouch: str, source: str, vouch_list: List[str], client: AsyncHTTPClient) -> bool:
+    if not _vouch_is_candidate(vouch, vouch_list):
+        return True
+
+    try:
+        r = await client.get(vouch, timeout=5)
+    except requests.exceptions.RequestException:
+        return True
+
+    return not _vouch_links_to_source(r.text, source)
+
+
+async def validate_webmention(
+    source: str,
+    target: str,
+    code: str = None,
+    vouch: str = "",
+    vouch_list: List[str] = [],
+    client: Optional[AsyncHTTPClient] = None,
+    max_bytes: Optional[int] = DEFAULT_MAX_SOURCE_SIZE,
+    deadline: Optional[float] = DEFAULT_SOURCE_DEADLINE,
+) -> WebmentionCheckResponse:
+    """
+    Check if a webmention is valid.
+
+    This is the asynchronous version of `indieweb_utils.validate_webmention()`.
+
+    :param source: The source URL of the webmention.
+    :type source: str
+    :param target: The target URL of the webmention.
+    :type target: str
+    :param code: The code to use to validate a private webmention.
+    :type code: str
+    :param vouch: The vouch URL of the webmention.
+    :type vouch: str
+    :param vouch_list: A list of vouch domains.
+    :type vouch_list: list
+    :param client: The asynchronous HTTP client to use (optional).
+    :type client: AsyncHTTPClient
+    :param max_bytes: The largest source to accept, in bytes (default: 10MB). If None, there is no limit.
+    :type max_bytes: int
+    :param deadline: The number of seconds in which the source must be downloaded (default: 30).
+    :type deadline: float
+    :return: The result of the validation.
+    :rtype: WebmentionCheckResponse
+
+    :raises WebmentionValidationError: Webmention is invalid.
+    :raises WebmentionIsGone: Webmention source returns a 410 Gone code.
+    :raises NoTokenEndpointForPrivateWebmention: Webmention is private but source has no token endpoint.
+    """
+    _validate_source_and_target(source, target)
+
+    http = _get_client(client)
+
+    request_headers = {}
+
+    if code:
+        access_token = await _validate_private_webmention(source, http, code)
+
+        request_headers = {"Authorization": f"Bearer {access_token}"}
+
+    def check_headers(response: AsyncResponse) -> None:
+        # the body is only read if the source can be a valid webmention source
+        _check_source_status(response.status_code)
+        _validate_headers(response, max_bytes)
+
+    try:
+        source_request = await http.get(
+            source,
+            headers=request_headers,
+            max_redirects=3,
+            max_bytes=max_bytes,
+            timeout=deadline,
+            on_headers=check_headers,
+        )
+    except ResponseTooLarge:
+        raise WebmentionValidationError("Source is too large.")
+    except requests.exceptions.TooManyRedirects:
+        raise WebmentionValidationError("Source redirected too many times.")
+    except requests.exceptions.Timeout:
+        raise WebmentionValidationError("Source timed out.")
+    except requests.exceptions.RequestException:
+        raise WebmentionValidationError("Source could not be retrieved.")
+
+    page_html = source_request.text
+    parsed_page_html_tree = BeautifulSoup(page_html, "html.parser")
+
+    _check_source_document(parsed_page_html_tree, page_html, target)
+
+    moderate = await _process_vouch(vouch, source, vouch_list, http)
+
+    return WebmentionCheckResponse(
+        webmention_is_valid=True,
+        vouch_check_has_passed=moderate,
+        source_text=page_html,
+        source_tree=parsed_page_html_tree,
+    )
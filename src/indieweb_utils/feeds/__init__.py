@@ -1,21 +1,41 @@
+from .bulk import FeedDiscoveryResult, discover_feeds_for_sites
 from .discovery import FeedUrl, discover_h_feed, discover_web_page_feeds
-from .poll import retrieve_feed_contents
+from .incremental import SeenFeedItems, iter_new_feed_items, retrieve_new_feed_items
+from .poll import FeedPollResponse, poll_feed, retrieve_feed_contents
+from .scheduler import FeedPollResult, FeedScheduler, FeedState
+from .stream import iter_feed_items
 from .urls import (
     ACTIVITYPUB_USERNAME_REGEX,
     BLUESKY_USERNAME_REGEX,
     check_if_feed_is_activitypub,
     get_web_feed_url,
     check_if_feed_is_bsky,
+    register_feed_url_rule,
 )
+from .websub import WebSubSubscriber, WebSubSubscription
 
 __all__ = [
     "discover_web_page_feeds",
     "FeedUrl",
     "discover_h_feed",
+    "discover_feeds_for_sites",
+    "FeedDiscoveryResult",
     "retrieve_feed_contents",
+    "iter_feed_items",
+    "poll_feed",
+    "FeedPollResponse",
+    "FeedScheduler",
+    "FeedState",
+    "FeedPollResult",
+    "WebSubSubscriber",
+    "WebSubSubscription",
+    "iter_new_feed_items",
+    "SeenFeedItems",
+    "retrieve_new_feed_items",
     "get_web_feed_url",
     "check_if_feed_is_activitypub",
     "check_if_feed_is_bsky",
+    "register_feed_url_rule",
     "ACTIVITYPUB_USERNAME_REGEX",
     "BLUESKY_USERNAME_REGEX",
 ]
@@ -0,0 +1,166 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional
+
+import requests
+
+from ..network.client import HTTPClient, _get_client
+from ..network.limits import HostLimiter, iter_limited_content
+from .discovery import FeedUrl, _find_page_feeds, _normalize_page_url
+from .urls import get_web_feed_url
+
+# the largest home page that is read, in bytes
+DEFAULT_MAX_PAGE_SIZE = 2 * 1024 * 1024
+
+# the number of seconds in which a home page must be read
+DEFAULT_PAGE_DEADLINE = 30
+
+
+@dataclass
+class FeedDiscoveryResult:
+    """
+    The feeds found for one site with `discover_feeds_for_sites()`.
+
+    If the home page of the site could not be retrieved, `error` is the exception that was raised
+    and `feeds` is empty.
+    """
+
+    url: str
+    feeds: List[FeedUrl] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+
+def _read_page_start(response: requests.Response, max_bytes: Optional[int], deadline: Optional[float]) -> bytes:
+    # feeds are linked near the top of a page, so a page larger than max_bytes is cut off, not rejected
+    content = bytearray()
+    chunks = iter_limited_content(response, deadline=deadline)
+
+    try:
+        for chunk in chunks:
+            content += chunk
+
+            if max_bytes is not None and len(content) >= max_bytes:
+                break
+    finally:
+        # closes the response without reading the rest of the page
+        chunks.close()
+
+    return bytes(content[:max_bytes])
+
+
+def _discover_limited_feeds(
+    url: str,
+    user_mime_types: List[str],
+    limiter: HostLimiter,
+    client: Optional[HTTPClient],
+    user_agent: str,
+    max_bytes: Optional[int],
+    deadline: Optional[float],
+) -> FeedDiscoveryResult:
+    page_url = _normalize_page_url(url)
+    headers = {"User-Agent": user_agent} if user_agent else None
+
+    try:
+        with limiter.limit(page_url):
+            # the deadline starts when the page is requested, not while waiting for the host limiter
+            deadline_at = time.monotonic() + deadline if deadline is not None else None
+            response = _get_client(client).get(page_url, timeout=10, headers=headers, stream=True)
+            content = _read_page_start(response, max_bytes, deadline_at)
+    except Exception as e:
+        return FeedDiscoveryResult(url=url, error=e)
+
+    html = content.decode(response.encoding or "utf-8", errors="replace")
+
+    return FeedDiscoveryResult(url=url, feeds=_find_page_feeds(page_url, html, response.headers, user_mime_types))
+
+
+def discover_feeds_for_sites(
+    urls: Iterable[str],
+    user_mime_types: Optional[List[str]] = None,
+    max_workers: int = 16,
+    max_per_host: int = 2,
+    client: Optional[HTTPClient] = None,
+    user_agent: str = "",
+    max_bytes: Optional[int] = DEFAULT_MAX_PAGE_SIZE,
+    deadline: Optional[float] = DEFAULT_PAGE_DEADLINE,
+) -> Iterator[FeedDiscoveryResult]:
+    """
+    Discover the feeds of many sites at the same time, i.e. to import a list of subscriptions.
+
+    Sites whose feed URL follows a known pattern (see `get_web_feed_url()`) are resolved without
+    making any request, and their results are yielded first. The home pages of the other sites are
+    retrieved by a pool of `max_workers` threads, with no more than `max_per_host` requests to one
+    host at once, and are searched for feeds as `discover_web_page_feeds()` does. Duplicate URLs
+    are only processed once.
+
+    Results are yielded as soon as they are ready. An error for one site does not stop the other
+    sites from being processed.
+
+    :param urls: The URLs of the sites whose feeds you want to discover.
+    :type urls: Iterable[str]
+    :param user_mime_types: A list of additional mime types whose associated feeds you want to retrieve.
+    :type user_mime_types: Optional[List[str]]
+    :param max_workers: The maximum number of home pages to retrieve at once.
+    :type max_workers: int
+    :param max_per_host: The maximum number of simultaneous requests to one host.
+    :type max_per_host: int
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
+    :param user_agent: The User-Agent to send with requests (optional). By default, the User-Agent of the
+        client is sent.
+    :type user_agent: str
+    :param max_bytes: The maximum number of bytes of each home page to read (default 2MB). Feeds are
+        discovered in the part of a larger page that has been read.
+    :type max_bytes: int
+    :param deadline: The number of seconds in which each home page must be read (default: 30). If None,
+        there is no deadline.
+    :type deadline: float
+    :return: One FeedDiscoveryResult per unique URL, in the order in which they complete.
+    :rtype: Iterator[FeedDiscoveryResult]
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        urls = ["https://jamesg.blog/", "https://github.com/capjamesg"]
+
+        for result in indieweb_utils.discover_feeds_for_sites(urls):
+            for feed in result.feeds:
+                print(result.url, feed.url)
+    """
+    user_mime_types = user_mime_types or []
+    unique_urls = list(dict.fromkeys(urls))
+
+    pages_to_retrieve = []
+
+    for url in unique_urls:
+        feed_url, _ = get_web_feed_url(_normalize_page_url(url))
+
+        if feed_url:
+            yield FeedDiscoveryResult(url=url, feeds=[FeedUrl(url=feed_url, mime_type="", title="")])
+        else:
+            pages_to_retrieve.append(url)
+
+    if not pages_to_retrieve:
+        return
+
+    limiter = HostLimiter(max_per_host)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pages_to_retrieve))) as executor:
+        futures = [
+            executor.submit(
+                _discover_limited_feeds, url, user_mime_types, limiter, client, user_agent, max_bytes, deadline
+            )
+            for url in pages_to_retrieve
+        ]
+
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # if the caller stops early, sites that have not been started are not processed
+            for future in futures:
+                future.cancel()
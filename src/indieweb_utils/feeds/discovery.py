@@ -2,13 +2,14 @@ import dataclasses
 from typing import Dict, List, Optional, Tuple
 from urllib import parse as url_parse
 
-import mf2py
 import requests
 from bs4 import BeautifulSoup
 
+from ..network.client import HTTPClient, _get_client
+from ..parsing.parse import get_parsed_mf2_data
 from ..utils.urls import _is_http_url, canonicalize_url
 from ..webmentions.discovery import _find_links_in_headers
-from ..constants import USER_AGENT
+
 
 @dataclasses.dataclass
 class FeedUrl:
@@ -18,16 +19,22 @@ class FeedUrl:
     social: bool = False
 
 
-def _get_page_feed_contents(url: str, html: str, user_agent: str = USER_AGENT) -> Tuple[requests.Response, str]:
+def _get_page_feed_contents(
+    url: str, html: str, user_agent: str = "", client: Optional[HTTPClient] = None
+) -> Tuple[requests.Response, str]:
+    client = _get_client(client)
+    # without a User-Agent, the User-Agent of the client is sent
+    headers = {"User-Agent": user_agent} if user_agent else None
+
     if html:
         try:
-            web_page_request = requests.head(url, timeout=10, allow_redirects=True, headers={"User-Agent": user_agent})
+            web_page_request = client.head(url, timeout=10, allow_redirects=True, headers=headers)
         except requests.RequestException:
             raise Exception("Request to retrieve URL did not return a valid response.")
 
     if not html:
         try:
-            web_page_request = requests.get(url, timeout=10, allow_redirects=True, headers={"User-Agent": user_agent})
+            web_page_request = client.get(url, timeout=10, allow_redirects=True, headers=headers)
         except requests.RequestException:
             raise Exception("Request to retrieve URL did not return a valid response.")
         else:
@@ -36,8 +43,21 @@ def _get_page_feed_contents(url: str, html: str, user_agent: str = USER_AGENT) -
     return web_page_request, html
 
 
+def _normalize_page_url(url: str) -> str:
+    if not _is_http_url(url):
+        url = "https://" + url
+    elif url.startswith("//"):
+        url = "https:" + url
+
+    return url
+
+
 def discover_web_page_feeds(
-    url: str, user_mime_types: Optional[List[str]] = None, html: str = "", user_agent: str = ""
+    url: str,
+    user_mime_types: Optional[List[str]] = None,
+    html: str = "",
+    user_agent: str = "",
+    client: Optional[HTTPClient] = None,
 ) -> List[FeedUrl]:
     """
     Get all feeds on a web page.
@@ -48,6 +68,8 @@ def discover_web_page_feeds(
     :type user_mime_types: Optional[List[str]]
     :param html: A string with the HTML on a page.
     :type html: str
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
     :return: A list of FeedUrl objects.
     :rtype: List[FeedUrl]
 
@@ -67,51 +89,73 @@ def discover_web_page_feeds(
     """
     user_mime_types = user_mime_types or []
 
-    if not _is_http_url(url):
-        url = "https://" + url
-    elif url.startswith("//"):
-        url = "https:" + url
+    url = _normalize_page_url(url)
 
-    web_page_request, html = _get_page_feed_contents(url, html, user_agent=user_agent)
+    web_page_request, html = _get_page_feed_contents(url, html, user_agent=user_agent, client=client)
 
-    soup = BeautifulSoup(html, "lxml")
+    return _find_page_feeds(url, html, web_page_request.headers, user_mime_types)
 
-    # check for presence of mf2 hfeed
-    h_feed = soup.find_all(class_="h-feed")
-    page_title = soup.find("title")
 
-    page_domain = url_parse.urlsplit(url).netloc
+# the rel values of links to feeds
+_FEED_RELS = frozenset({"alternate", "feed"})
 
-    valid_mime_types = {
+# the MIME types of feeds that are discovered on every page
+_FEED_MIME_TYPES = frozenset(
+    {
         "application/rss+xml",
         "application/atom+xml",
         "application/rdf+xml",
         "application/xml",
         "application/json",
         "application/mf2+json",
-        "application/atom+xml",
         "application/feed+json",
         "application/jf2feed+json",
     }
+)
+
+
+def _normalize_mime_type(mime_type: str) -> str:
+    # i.e. "Application/RSS+XML; charset=utf-8" -> "application/rss+xml"
+    return mime_type.split(";", 1)[0].strip().lower()
+
+
+def _find_page_feeds(url: str, html: str, headers, user_mime_types: List[str]) -> List[FeedUrl]:
+    """
+    Return all feeds referenced in the HTML and HTTP Link headers of a web page.
+
+    The document is traversed once: feed links, the page title, and h-feed markup are all
+    collected in the same pass, and feed links are matched to a MIME type with a set lookup.
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    page_domain = url_parse.urlsplit(url).netloc
+
+    mime_types = _FEED_MIME_TYPES.union(_normalize_mime_type(mime_type) for mime_type in user_mime_types)
 
     feeds: List[FeedUrl] = []
+    page_title = None
+    has_h_feed = False
 
-    for mime_type in valid_mime_types.union(user_mime_types):
-        for item in soup.find_all("link", rel="alternate", type=mime_type):
-            feed_title = item.get("title")
-            feed_url = canonicalize_url(item.get("href"), page_domain, full_url=url)
+    for element in soup.find_all(True):
+        if not has_h_feed and "h-feed" in element.get("class", []):
+            has_h_feed = True
 
-            feeds.append(FeedUrl(url=feed_url, mime_type=mime_type, title=feed_title))
-        for item in soup.find_all("link", rel="feed", type=mime_type):
-            feed_title = item.get("title")
-            feed_url = canonicalize_url(item.get("href"), page_domain, full_url=url)
+        if element.name == "title" and page_title is None:
+            page_title = element.text
+        elif element.name == "link" and element.get("href") and _FEED_RELS.intersection(element.get("rel", [])):
+            mime_type = _normalize_mime_type(element.get("type", ""))
 
-            feeds.append(FeedUrl(url=feed_url, mime_type=mime_type, title=feed_title))
+            if mime_type not in mime_types:
+                continue
 
-    if h_feed:
-        feeds.append(FeedUrl(url=url, mime_type="text/html", title=page_title.text))
+            feed_url = canonicalize_url(element.get("href"), page_domain, full_url=url)
 
-    http_headers = _find_links_in_headers(headers=web_page_request.headers, target_headers=["alternate", "feed"])
+            feeds.append(FeedUrl(url=feed_url, mime_type=mime_type, title=element.get("title")))
+
+    if has_h_feed:
+        feeds.append(FeedUrl(url=url, mime_type="text/html", title=page_title or ""))
+
+    http_headers = _find_links_in_headers(headers=headers, target_headers=["alternate", "feed"])
 
     for rel, item in http_headers.items():
         feed_mime_type = item.get("mime_type", "")
@@ -124,7 +168,7 @@ def discover_web_page_feeds(
     return feeds
 
 
-def discover_h_feed(url: str, html: str = "") -> Dict:
+def discover_h_feed(url: str, html: str = "", client: Optional[HTTPClient] = None) -> Dict:
     """
     Find the main h-feed that represents a web page as per the h-feed Discovery algorithm.
 
@@ -134,6 +178,8 @@ def discover_h_feed(url: str, html: str = "") -> Dict:
     :type url: str
     :param html: The HTML of a page whose feeds you want to retrieve
     :type html: str
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
     :return: The h-feed data.
     :rtype: dict
 
@@ -150,19 +196,16 @@ def discover_h_feed(url: str, html: str = "") -> Dict:
         print(hfeed)
     """
 
-    if html:
-        parsed_main_page_mf2 = mf2py.parse(doc=html)
-    else:
-        parsed_main_page_mf2 = mf2py.parse(url=url)
+    parsed_main_page_mf2 = get_parsed_mf2_data(html=html, url=url, client=client)
 
-    all_page_feeds = discover_web_page_feeds(url)
+    all_page_feeds = discover_web_page_feeds(url, client=client)
 
     get_mf2_feed = [feed for feed in all_page_feeds if feed.mime_type == "text/mf2+html"]
 
     if len(get_mf2_feed) > 0:
         feed = get_mf2_feed[0].url
 
-        parsed_feed = mf2py.parse(url=feed)
+        parsed_feed = get_parsed_mf2_data(url=feed, client=client)
 
         h_feed = [item for item in parsed_feed["items"] if item.get("type") and item.get("type")[0] == "h-feed"]
 
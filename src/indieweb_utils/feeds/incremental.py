@@ -0,0 +1,187 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Iterator, Optional
+
+from ..network.client import HTTPClient
+from .poll import retrieve_feed_contents
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_feed_items (
+    feed TEXT NOT NULL,
+    item TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    PRIMARY KEY (feed, item)
+)
+"""
+
+
+class SeenFeedItems:
+    """
+    The fingerprints of the feed items that `iter_new_feed_items()` has seen, stored in a SQLite database.
+
+    Fingerprints are never evicted, so an item is not yielded again however many other items have
+    been seen since, and saving a fingerprint only writes one row.
+
+    :param path: The path to the SQLite database (default: ":memory:", which is not saved between runs).
+    :type path: str
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        seen = indieweb_utils.SeenFeedItems("seen_items.db")
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._lock = threading.Lock()
+
+        # one connection is shared by every thread, and is only used while holding the lock
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+        with self._lock:
+            # in WAL mode, a write does not wait for the disk, so saving one fingerprint per item is cheap
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(_SCHEMA)
+
+    def get(self, feed: str, item: str) -> Optional[str]:
+        """
+        Return the fingerprint of an item, or None if it has not been seen.
+
+        :param feed: The URL of the feed.
+        :type feed: str
+        :param item: The id (or URL) of the item.
+        :type item: str
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fingerprint FROM seen_feed_items WHERE feed = ? AND item = ?", (feed, item)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def set(self, feed: str, item: str, fingerprint: str) -> None:
+        """
+        Save the fingerprint of an item.
+
+        :param feed: The URL of the feed.
+        :type feed: str
+        :param item: The id (or URL) of the item.
+        :type item: str
+        :param fingerprint: The fingerprint of the contents of the item.
+        :type fingerprint: str
+        """
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO seen_feed_items (feed, item, fingerprint) VALUES (?, ?, ?)
+                ON CONFLICT (feed, item) DO UPDATE SET fingerprint = excluded.fingerprint
+                """,
+                (feed, item, fingerprint),
+            )
+
+    def forget(self, feed: str) -> None:
+        """
+        Remove the fingerprints of every item in a feed, i.e. when you stop following it.
+
+        :param feed: The URL of the feed.
+        :type feed: str
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM seen_feed_items WHERE feed = ?", (feed,))
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        with self._lock:
+            self._db.close()
+
+
+def _get_item_key(item: dict) -> str:
+    key = item.get("id") or item.get("url")
+
+    if key:
+        return str(key)
+
+    # items without an id or URL can only be identified by their contents
+    return _get_item_hash(item)
+
+
+def _get_item_hash(item: dict) -> str:
+    return hashlib.sha256(json.dumps(item, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def iter_new_feed_items(contents: dict, seen: SeenFeedItems, feed: str = "") -> Iterator[dict]:
+    """
+    Yield the items in a JSON Feed that are new, or that have changed, since they were last seen.
+
+    Each item is identified by its id (or URL) and fingerprinted with a hash of its contents.
+    The fingerprints are stored in `seen`. An item is only recorded as seen once the next
+    item has been requested from the generator, so an item that is being processed when
+    your program stops is yielded again next time.
+
+    :param contents: A JSON Feed, i.e. from `retrieve_feed_contents()` or `poll_feed()`.
+    :type contents: dict
+    :param seen: The store in which fingerprints of seen items are saved. Give it a path
+        to remember seen items between runs.
+    :type seen: SeenFeedItems
+    :param feed: The URL of the feed. Fingerprints are stored per feed.
+    :type feed: str
+    :return: The new and changed items.
+    :rtype: Iterator[dict]
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        seen = indieweb_utils.SeenFeedItems("seen_items.db")
+
+        contents = indieweb_utils.retrieve_feed_contents("https://jamesg.blog/feeds/posts.xml")
+
+        for item in indieweb_utils.iter_new_feed_items(contents, seen, "https://jamesg.blog/feeds/posts.xml"):
+            print(item["url"])
+    """
+    for item in (contents or {}).get("items", []):
+        key = _get_item_key(item)
+        fingerprint = _get_item_hash(item)
+
+        if seen.get(feed, key) == fingerprint:
+            continue
+
+        yield item
+
+        seen.set(feed, key, fingerprint)
+
+
+def retrieve_new_feed_items(
+    feed: str, seen: SeenFeedItems, format: str = "jsonfeed", client: Optional[HTTPClient] = None
+) -> Iterator[dict]:
+    """
+    Retrieve a feed and yield only the items that are new, or that have changed, since the feed was last retrieved.
+
+    See `iter_new_feed_items()` for how items are compared.
+
+    :param feed: The URL of the feed.
+    :type feed: str
+    :param seen: The store in which fingerprints of seen items are saved.
+    :type seen: SeenFeedItems
+    :param format: The format to return the items in.
+    :type format: str
+    :param client: The HTTP client to use for the request (optional).
+    :type client: HTTPClient
+    :return: The new and changed items.
+    :rtype: Iterator[dict]
+
+    :raises FailedToFetchFeed: The feed could not be retrieved.
+    :raises UnsupportedFeedFormat: The feed is not in a supported format.
+    """
+    contents = retrieve_feed_contents(feed, format=format, client=client)
+
+    yield from iter_new_feed_items(contents, seen, feed)
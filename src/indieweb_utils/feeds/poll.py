@@ -1,7 +1,12 @@
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
 import requests
 from granary import atom, jsonfeed, microformats2, rss
 
-from ..constants import USER_AGENT
+from ..network.client import HTTPClient, _get_client
+
 
 class FailedToFetchFeed(Exception):
     pass
@@ -11,18 +16,86 @@ class UnsupportedFeedFormat(Exception):
     pass
 
 
-def retrieve_feed_contents(feed, format="jsonfeed"):
+@dataclass
+class FeedPollResponse:
     """
-    Retrieve the contents from a feed.
+    The result of polling a feed with `poll_feed()`.
+
+    If the feed has not changed since the validators passed to `poll_feed()` were issued,
+    `modified` is False and `contents` is None.
+    """
+
+    url: str
+    status_code: int
+    modified: bool
+    contents: Optional[dict] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+_FEED_IDENTIFICATION = {
+    "rss+xml": rss.to_activities,
+    "atom+xml": atom.atom_to_activities,
+    "html": microformats2.html_to_activities,
+    "feed+json": jsonfeed.jsonfeed_to_activities,
+    "json": jsonfeed.jsonfeed_to_activities,
+    "mf2+json": microformats2.json_to_activities,
+}
+
+
+def _get_feed_content_type(content_type_header: str) -> str:
+    content_type = content_type_header.split(";")[0].split("/")[-1].strip()
+
+    if content_type not in _FEED_IDENTIFICATION:
+        raise UnsupportedFeedFormat("Feed format is not supported, according to feed Content-Type header.")
+
+    return content_type
+
+
+def _convert_feed(content_type: str, body: str, format: str = "jsonfeed") -> dict:
+    """
+    Convert the body of a feed of a supported content type to the requested format.
+
+    Feeds that are retrieved (`poll_feed()`) and feeds that are pushed to a WebSub subscriber are both converted here.
+    """
+    if format == "jsonfeed":
+        conversion_function = jsonfeed.activities_to_jsonfeed
+    else:
+        raise ValueError("Unsupported format")
 
-    This function returns contents as a JSON Feed.
+    if content_type in ["json", "feed+json"]:
+        return conversion_function(_FEED_IDENTIFICATION[content_type](json.loads(body))[0])
+
+    return conversion_function(_FEED_IDENTIFICATION[content_type](body))
+
+
+def poll_feed(
+    feed: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    format: str = "jsonfeed",
+    client: Optional[HTTPClient] = None,
+) -> FeedPollResponse:
+    """
+    Retrieve the contents of a feed, unless the feed has not changed since it was last retrieved.
+
+    Pass the `etag` and `last_modified` values returned by the previous poll of a feed.
+    If the server says that the feed has not changed (304 Not Modified), the feed is
+    neither downloaded nor converted.
 
     :param feed: The URL of the feed.
     :type feed: str
+    :param etag: The ETag returned by the previous poll of the feed (optional).
+    :type etag: str
+    :param last_modified: The Last-Modified value returned by the previous poll of the feed (optional).
+    :type last_modified: str
     :param format: The format to return the feed in.
     :type format: str
-    :return: The contents of the feed.
-    :rtype: dict
+    :param client: The HTTP client to use for the request (optional).
+    :type client: HTTPClient
+    :return: The contents of the feed, if the feed has changed, and the validators to use in the next poll.
+    :rtype: FeedPollResponse
 
     Example:
 
@@ -32,40 +105,91 @@ def retrieve_feed_contents(feed, format="jsonfeed"):
 
         feed = "https://jamesg.blog/feeds/posts.xml"
 
-        feed_contents = indieweb_utils.retrieve_feed_contents(feed)
+        response = indieweb_utils.poll_feed(feed)
 
-        print(feed_contents)
-    """
-    FEED_IDENTIFICATION = {
-        "rss+xml": rss.to_activities,
-        "atom+xml": atom.atom_to_activities,
-        "html": microformats2.html_to_activities,
-        "feed+json": jsonfeed.jsonfeed_to_activities,
-        "json": jsonfeed.jsonfeed_to_activities,
-        "mf2+json": microformats2.json_to_activities,
-    }
+        # later...
+        response = indieweb_utils.poll_feed(feed, etag=response.etag, last_modified=response.last_modified)
 
-    if format == "jsonfeed":
-        CONVERSION_FUNCTION = jsonfeed.activities_to_jsonfeed
-    else:
+        if response.modified:
+            print(response.contents)
+
+    :raises FailedToFetchFeed: The feed could not be retrieved.
+    :raises UnsupportedFeedFormat: The feed is not in a supported format.
+    """
+    if format != "jsonfeed":
         raise ValueError("Unsupported format")
 
+    headers: Dict[str, str] = {}
+
+    if etag:
+        headers["If-None-Match"] = etag
+
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
     try:
-        resp = requests.get(feed, headers={"User-Agent": USER_AGENT}, allow_redirects=True)
+        resp = _get_client(client).get(feed, headers=headers, allow_redirects=True)
     except requests.RequestException:
         raise FailedToFetchFeed("Request to retrieve feed did not return a valid response.")
 
+    response_headers = dict(resp.headers)
+
+    # a 304 response may omit validators that have not changed
+    etag = resp.headers.get("ETag", etag)
+    last_modified = resp.headers.get("Last-Modified", last_modified)
+
+    if resp.status_code == 304:
+        return FeedPollResponse(
+            url=resp.url,
+            status_code=resp.status_code,
+            modified=False,
+            etag=etag,
+            last_modified=last_modified,
+            headers=response_headers,
+        )
+
     if resp.status_code != 200:
         raise FailedToFetchFeed("Request to retrieve feed did not return a valid response.")
 
-    content_type = resp.headers.get("Content-Type", "").split(";")[0].split("/")[1]
+    content_type = _get_feed_content_type(resp.headers.get("Content-Type", ""))
 
-    if content_type not in FEED_IDENTIFICATION:
-        raise UnsupportedFeedFormat("Feed format is not supported, according to feed Content-Type header.")
+    return FeedPollResponse(
+        url=resp.url,
+        status_code=resp.status_code,
+        modified=True,
+        contents=_convert_feed(content_type, resp.text, format),
+        etag=etag,
+        last_modified=last_modified,
+        headers=response_headers,
+    )
 
-    if content_type in ["json", "feed+json"]:
-        activities = CONVERSION_FUNCTION(FEED_IDENTIFICATION[content_type](resp.json())[0])
-    else:
-        activities = CONVERSION_FUNCTION(FEED_IDENTIFICATION[content_type](resp.text))
 
-    return activities
+def retrieve_feed_contents(feed, format="jsonfeed", client: Optional[HTTPClient] = None):
+    """
+    Retrieve the contents from a feed.
+
+    This function returns contents as a JSON Feed. To only retrieve a feed if it has changed
+    since it was last retrieved, use `poll_feed()`.
+
+    :param feed: The URL of the feed.
+    :type feed: str
+    :param format: The format to return the feed in.
+    :type format: str
+    :param client: The HTTP client to use for the request (optional).
+    :type client: HTTPClient
+    :return: The contents of the feed.
+    :rtype: dict
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        feed = "https://jamesg.blog/feeds/posts.xml"
+
+        feed_contents = indieweb_utils.retrieve_feed_contents(feed)
+
+        print(feed_contents)
+    """
+    return poll_feed(feed, format=format, client=client).contents
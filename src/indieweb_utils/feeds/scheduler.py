@@ -0,0 +1,471 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from ..network.client import HTTPClient
+from ..network.limits import HostLimiter, _get_host
+from .poll import FeedPollResponse, poll_feed
+
+DEFAULT_POLL_INTERVAL = 60 * 60
+MIN_POLL_INTERVAL = 5 * 60
+MAX_POLL_INTERVAL = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeedState:
+    """
+    Everything a FeedScheduler knows about a feed.
+
+    States can be saved (i.e. with `dataclasses.asdict()`) and passed to `FeedScheduler.add_feed()`
+    later, so a scheduler can continue where it left off.
+    """
+
+    url: str
+    interval: float = DEFAULT_POLL_INTERVAL
+    next_poll: float = 0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    last_polled: Optional[float] = None
+    last_changed: Optional[float] = None
+    errors: int = 0
+    push_expires: Optional[float] = None
+
+
+@dataclass
+class FeedPollResult:
+    """
+    The result of one poll made by a FeedScheduler.
+
+    If the poll failed, `error` is the exception raised by the poll and `response` is None.
+    """
+
+    state: FeedState
+    response: Optional[FeedPollResponse] = None
+    error: Optional[Exception] = None
+
+
+def _interleave_by_host(states: List[FeedState]) -> List[FeedState]:
+    # workers take feeds in order, so alternating hosts stops one busy host from occupying every worker
+    by_host: Dict[str, List[FeedState]] = defaultdict(list)
+
+    for state in states:
+        by_host[_get_host(state.url)].append(state)
+
+    interleaved = itertools.zip_longest(*by_host.values())
+
+    return [state for group in interleaved for state in group if state is not None]
+
+
+class FeedScheduler:
+    """
+    Poll many feeds, each as often as it changes.
+
+    Each feed has its own poll interval. When a feed has changed since the last poll, its
+    interval is halved. When it has not changed, its interval grows by half. Intervals stay
+    between `min_interval` and `max_interval`. A feed that fails to be retrieved is retried
+    with exponential backoff.
+
+    Polls use conditional requests (see `poll_feed()`), so feeds that have not changed are
+    not downloaded again. Feeds that are due at the same time are polled concurrently, with
+    no more than `max_per_host` polls to one host at once. `run()` starts each poll as soon as
+    the feed is due and a worker is free, so a slow feed does not delay the others.
+
+    If `on_update` raises an exception, the exception is passed to `on_error`. Exceptions raised
+    by `on_error` are logged. Either way, the feed is still polled again.
+
+    Feeds that are pushed to a WebSubSubscriber are only polled every `max_interval` seconds,
+    in case a push is missed.
+
+    :param on_update: A function called with the FeedState and FeedPollResponse of every feed that has changed.
+    :type on_update: Callable[[FeedState, FeedPollResponse], None]
+    :param on_error: A function called with the FeedState and the exception of every failed poll (optional).
+    :type on_error: Callable[[FeedState, Exception], None]
+    :param default_interval: The poll interval of a new feed, in seconds.
+    :type default_interval: float
+    :param min_interval: The shortest poll interval, in seconds.
+    :type min_interval: float
+    :param max_interval: The longest poll interval, in seconds.
+    :type max_interval: float
+    :param max_workers: The maximum number of feeds to poll at once.
+    :type max_workers: int
+    :param max_per_host: The maximum number of feeds on one host to poll at once.
+    :type max_per_host: int
+    :param client: The HTTP client to use (optional).
+    :type client: HTTPClient
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        def on_update(state, response):
+            print(state.url, response.contents["items"])
+
+        scheduler = indieweb_utils.FeedScheduler(on_update=on_update)
+
+        scheduler.add_feed("https://jamesg.blog/feeds/posts.xml")
+        scheduler.add_feed("https://aaronparecki.com/feed.xml")
+
+        # poll each feed when it is due, forever
+        scheduler.run()
+    """
+
+    def __init__(
+        self,
+        on_update: Optional[Callable[[FeedState, FeedPollResponse], None]] = None,
+        on_error: Optional[Callable[[FeedState, Exception], None]] = None,
+        default_interval: float = DEFAULT_POLL_INTERVAL,
+        min_interval: float = MIN_POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+        max_workers: int = 8,
+        max_per_host: int = 1,
+        client: Optional[HTTPClient] = None,
+    ) -> None:
+        self.on_update = on_update
+        self.on_error = on_error
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_workers = max_workers
+        self.client = client
+
+        self.feeds: Dict[str, FeedState] = {}
+
+        self._limiter = HostLimiter(max_per_host)
+        self._queue: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        # completed to wake up `run()` when a feed is added or the scheduler is stopped
+        self._wakeup: "Future[None]" = Future()
+
+    def add_feed(self, url: str, state: Optional[FeedState] = None) -> FeedState:
+        """
+        Start polling a feed. A new feed is polled as soon as possible.
+
+        :param url: The URL of the feed.
+        :type url: str
+        :param state: The saved state of the feed (optional).
+        :type state: FeedState
+        :return: The state of the feed.
+        :rtype: FeedState
+        """
+        if state is None:
+            state = FeedState(url=url, interval=self.default_interval)
+
+        with self._lock:
+            self.feeds[url] = state
+            heapq.heappush(self._queue, (state.next_poll, url))
+
+        self._wake()
+
+        return state
+
+    def remove_feed(self, url: str) -> None:
+        """
+        Stop polling a feed.
+
+        :param url: The URL of the feed.
+        :type url: str
+        """
+        with self._lock:
+            self.feeds.pop(url, None)
+
+    def next_poll_time(self) -> Optional[float]:
+        """
+        Return the time (as a UNIX timestamp) at which the next feed is due, or None if there are no feeds.
+        """
+        with self._lock:
+            self._discard_stale_entries()
+
+            return self._queue[0][0] if self._queue else None
+
+    def _discard_stale_entries(self) -> None:
+        # feeds that were removed or rescheduled leave entries behind in the queue
+        while self._queue:
+            next_poll, url = self._queue[0]
+            state = self.feeds.get(url)
+
+            if state is not None and state.next_poll == next_poll:
+                return
+
+            heapq.heappop(self._queue)
+
+    def _pop_due_feeds(self, now: float) -> List[FeedState]:
+        due: Dict[str, FeedState] = {}
+
+        with self._lock:
+            self._discard_stale_entries()
+
+            while self._queue and self._queue[0][0] <= now:
+                _, url = heapq.heappop(self._queue)
+                due[url] = self.feeds[url]
+                self._discard_stale_entries()
+
+        return _interleave_by_host(list(due.values()))
+
+    def _take_startable_feeds(
+        self, now: float, free_workers: int, polls_per_host: Counter, polling: Set[str]
+    ) -> Tuple[List[FeedState], bool]:
+        """
+        Take the due feeds that can be polled straight away: no more than one per free worker, and no
+        more per host than `max_per_host` allows. Return them, and whether any due feed has to wait.
+        """
+        taken: List[FeedState] = []
+        waiting: Dict[str, Tuple[float, str]] = {}
+
+        with self._lock:
+            self._discard_stale_entries()
+
+            while self._queue and self._queue[0][0] <= now:
+                entry = heapq.heappop(self._queue)
+                url = entry[1]
+                host = _get_host(url)
+
+                # a feed that is being polled, i.e. one that was added again during its poll, waits for the poll
+                # to complete, so its new state is not dropped
+                if url in waiting:
+                    pass
+                elif (
+                    url not in polling
+                    and len(taken) < free_workers
+                    and polls_per_host[host] < self._limiter.max_per_host
+                ):
+                    taken.append(self.feeds[url])
+                    polling.add(url)
+                    polls_per_host[host] += 1
+                else:
+                    waiting[url] = entry
+
+                self._discard_stale_entries()
+
+            for entry in waiting.values():
+                heapq.heappush(self._queue, entry)
+
+        return taken, bool(waiting)
+
+    def _poll(self, state: FeedState) -> FeedPollResponse:
+        with self._limiter.limit(state.url):
+            return poll_feed(state.url, etag=state.etag, last_modified=state.last_modified, client=self.client)
+
+    def _clamp(self, interval: float) -> float:
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _reschedule(self, result: FeedPollResult, now: float) -> None:
+        state = result.state
+        state.last_polled = now
+
+        if result.error is not None:
+            state.errors += 1
+            # exponential backoff with jitter, so failing feeds on one host do not retry in lockstep
+            delay = self._clamp(state.interval * 2 ** min(state.errors, 10)) * random.uniform(0.9, 1.1)
+        else:
+            state.errors = 0
+            state.etag = result.response.etag
+            state.last_modified = result.response.last_modified
+
+            if result.response.modified:
+                state.last_changed = now
+                state.interval = self._clamp(state.interval / 2)
+            else:
+                state.interval = self._clamp(state.interval * 1.5)
+
+            delay = state.interval
+
+            # a feed that is pushed to a WebSub subscriber is only polled as a fallback
+            if state.push_expires is not None and state.push_expires > now:
+                delay = self.max_interval
+
+        state.next_poll = now + delay
+
+        with self._lock:
+            if self.feeds.get(state.url) is state:
+                heapq.heappush(self._queue, (state.next_poll, state.url))
+
+    def set_push_expiry(self, url: str, expires: Optional[float], now: Optional[float] = None) -> None:
+        """
+        Record until when a feed is pushed to a WebSub subscriber.
+
+        While a feed is pushed, it is only polled every `max_interval` seconds. When it is no
+        longer pushed, it is polled as often as it changes again.
+
+        :param url: The URL of the feed.
+        :type url: str
+        :param expires: The time (as a UNIX timestamp) at which the subscription expires, or None if the
+            feed is no longer pushed.
+        :type expires: float
+        :param now: The current time, as a UNIX timestamp (optional).
+        :type now: float
+        """
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            state = self.feeds.get(url)
+
+            if state is None:
+                return
+
+            state.push_expires = expires
+
+            if expires is not None and expires > now:
+                state.next_poll = max(state.next_poll, now + self.max_interval)
+            else:
+                state.next_poll = min(state.next_poll, now + state.interval)
+
+            heapq.heappush(self._queue, (state.next_poll, url))
+
+        self._wake()
+
+    def receive_push(self, url: str, response: FeedPollResponse, now: Optional[float] = None) -> None:
+        """
+        Pass the pushed contents of a feed to `on_update`, as if the feed had been polled.
+
+        :param url: The URL of the feed.
+        :type url: str
+        :param response: The pushed contents of the feed.
+        :type response: FeedPollResponse
+        :param now: The current time, as a UNIX timestamp (optional).
+        :type now: float
+        """
+        state = self.feeds.get(url)
+
+        if state is None:
+            return
+
+        state.last_changed = time.time() if now is None else now
+
+        if self.on_update is not None:
+            self.on_update(state, response)
+
+    def run_pending(self, now: Optional[float] = None) -> List[FeedPollResult]:
+        """
+        Poll every feed that is due, then schedule the next poll of each feed.
+
+        :param now: The current time, as a UNIX timestamp (optional).
+        :type now: float
+        :return: The result of each poll.
+        :rtype: List[FeedPollResult]
+        """
+        if now is None:
+            now = time.time()
+
+        due = self._pop_due_feeds(now)
+
+        if not due:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(due))) as executor:
+            futures = {executor.submit(self._poll, state): state for state in due}
+
+            return [self._complete(futures[future], future, now) for future in as_completed(futures)]
+
+    def _complete(self, state: FeedState, future: "Future[FeedPollResponse]", now: float) -> FeedPollResult:
+        try:
+            result = FeedPollResult(state=state, response=future.result())
+        except Exception as e:
+            result = FeedPollResult(state=state, error=e)
+
+        # the feed is rescheduled before any callback runs, so a failing callback cannot stop it from being polled
+        self._reschedule(result, now)
+        self._report(result)
+
+        return result
+
+    def _report(self, result: FeedPollResult) -> None:
+        error = result.error
+
+        if error is None and result.response.modified and self.on_update is not None:
+            try:
+                self.on_update(result.state, result.response)
+            except Exception as e:
+                error = e
+
+        if error is None or self.on_error is None:
+            return
+
+        try:
+            self.on_error(result.state, error)
+        except Exception:
+            logger.exception("on_error raised an exception for the feed %s", result.state.url)
+
+    def _wake(self) -> None:
+        with self._lock:
+            if not self._wakeup.done():
+                self._wakeup.set_result(None)
+
+    def run(self) -> None:
+        """
+        Poll feeds as they become due until `stop()` is called.
+
+        A feed is polled as soon as it is due and a worker (and a slot for its host) is free,
+        without waiting for polls of other feeds to complete.
+        """
+        self._stopped.clear()
+
+        polls: Dict["Future[FeedPollResponse]", FeedState] = {}
+        polls_per_host: Counter = Counter()
+        polling: Set[str] = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not self._stopped.is_set():
+                with self._lock:
+                    if self._wakeup.done():
+                        self._wakeup = Future()
+
+                    wakeup = self._wakeup
+
+                started, has_waiting_feeds = self._take_startable_feeds(
+                    time.time(), self.max_workers - len(polls), polls_per_host, polling
+                )
+
+                for state in started:
+                    polls[executor.submit(self._poll, state)] = state
+
+                if has_waiting_feeds:
+                    # due feeds are waiting for a worker or a host slot, which a completed poll frees
+                    timeout = None
+                else:
+                    next_poll = self.next_poll_time()
+                    timeout = self.min_interval if next_poll is None else max(next_poll - time.time(), 0)
+
+                done, _ = wait([*polls, wakeup], timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    state = polls.pop(future, None)
+
+                    if state is None:
+                        continue
+
+                    polling.discard(state.url)
+                    polls_per_host[_get_host(state.url)] -= 1
+
+                    self._complete(state, future, time.time())
+
+            # polls that were running when the scheduler stopped are completed, so their feeds are rescheduled
+            for future, state in polls.items():
+                self._complete(state, future, time.time())
+
+    def stop(self) -> None:
+        """
+        Stop a scheduler that was started with `run()`.
+
+        Polls that have already started are completed before `run()` returns.
+        """
+        self._stopped.set()
+        self._wake()
@@ -0,0 +1,203 @@
+import copy
+import itertools
+from typing import Callable, Iterator, Optional
+
+import requests
+from granary import atom, jsonfeed, rss
+from lxml import etree
+
+from ..network.client import HTTPClient, _get_client
+from ..network.limits import iter_limited_content
+from .poll import FailedToFetchFeed, UnsupportedFeedFormat
+
+_ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+_RSS_1_NAMESPACE = "http://purl.org/rss/1.0/"
+
+_ITEM_TAGS = {"item", f"{{{_RSS_1_NAMESPACE}}}item", f"{{{_ATOM_NAMESPACE}}}entry"}
+
+# elements that list every item in a feed, i.e. <items><rdf:Seq> in the channel of an RSS 1.0 feed
+_ITEM_LIST_TAGS = {f"{{{_RSS_1_NAMESPACE}}}items"}
+
+# the subtypes of Content-Type headers of feeds that are not XML
+_NOT_XML_FEED_TYPES = {"json", "feed+json", "mf2+json", "html"}
+
+
+def _get_item_converter(root: etree._Element) -> Callable[[str], list]:
+    if root.tag == f"{{{_ATOM_NAMESPACE}}}feed":
+        return atom.atom_to_activities
+
+    if etree.QName(root).localname in ("rss", "RDF"):
+        return rss.to_activities
+
+    raise UnsupportedFeedFormat("Feed is not an RSS or Atom feed.")
+
+
+def _copy_feed_element(element: etree._Element) -> etree._Element:
+    """
+    Copy a feed-level element, such as the channel of a feed, without any list of the items in the feed.
+    """
+    if not any(child.tag in _ITEM_LIST_TAGS for child in element):
+        return copy.deepcopy(element)
+
+    element_copy = etree.Element(element.tag, attrib=dict(element.attrib), nsmap=element.nsmap)
+    element_copy.text = element.text
+    element_copy.tail = element.tail
+    element_copy.extend(copy.deepcopy(child) for child in element if child.tag not in _ITEM_LIST_TAGS)
+
+    return element_copy
+
+
+def _get_single_item_feed(item: etree._Element) -> str:
+    """
+    Return a feed that only contains one item, along with the feed-level elements that come before it.
+
+    Feed-level elements, such as the title and author of a feed, are used when items are converted.
+    Other items, and lists of items, are left out, so the size of the feed does not grow with the
+    number of items that have been read.
+    """
+    element = copy.deepcopy(item)
+    original = item
+
+    while original.getparent() is not None:
+        parent = original.getparent()
+
+        # elements after the item may not have been parsed yet, and earlier items have been removed
+        preceding = [
+            _copy_feed_element(sibling)
+            for sibling in original.itersiblings(preceding=True)
+            if sibling.tag not in _ITEM_TAGS and sibling.tag not in _ITEM_LIST_TAGS
+        ]
+
+        parent_copy = etree.Element(parent.tag, attrib=dict(parent.attrib), nsmap=parent.nsmap)
+        parent_copy.extend(reversed(preceding))
+        parent_copy.append(element)
+
+        element = parent_copy
+        original = parent
+
+    return etree.tostring(element, encoding="unicode")
+
+
+def iter_feed_items(feed: str, limit: Optional[int] = None, client: Optional[HTTPClient] = None) -> Iterator[dict]:
+    """
+    Retrieve an RSS or Atom feed and yield its items one by one, as JSON Feed items.
+
+    The feed is parsed while it is downloaded, and each item is converted and discarded before
+    the next item is read, so only one item is held in memory at a time. Use this function
+    instead of `retrieve_feed_contents()` for very large feeds, such as podcast feeds and archives.
+
+    Each item is converted as if it were the only item in the feed, so it can use feed-level
+    values (i.e. the title of the feed as its author) that come before the items in the feed.
+
+    Feeds that are not well-formed XML, i.e. that use HTML entities such as `&nbsp;`, cannot be
+    parsed while they are downloaded. Such a feed is downloaded again and converted as a whole,
+    as `retrieve_feed_contents()` does, and the items that have not been yielded yet are yielded.
+
+    :param feed: The URL of the feed.
+    :type feed: str
+    :param limit: The maximum number of items to yield (optional). The download stops once
+        this many items have been read.
+    :type limit: int
+    :param client: The HTTP client to use for the request (optional).
+    :type client: HTTPClient
+    :return: The items in the feed, in the order in which they appear in the feed.
+    :rtype: Iterator[dict]
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        for item in indieweb_utils.iter_feed_items("https://jamesg.blog/feeds/posts.xml", limit=10):
+            print(item["url"])
+
+    :raises FailedToFetchFeed: The feed could not be retrieved, or is not valid XML.
+    :raises UnsupportedFeedFormat: The feed is not an RSS or Atom feed.
+    """
+    try:
+        resp = _get_client(client).get(feed, allow_redirects=True, stream=True)
+    except requests.RequestException:
+        raise FailedToFetchFeed("Request to retrieve feed did not return a valid response.")
+
+    try:
+        if resp.status_code != 200:
+            raise FailedToFetchFeed("Request to retrieve feed did not return a valid response.")
+
+        content_type = resp.headers.get("Content-Type", "").split(";")[0].split("/")[-1].strip()
+
+        if content_type in _NOT_XML_FEED_TYPES:
+            raise UnsupportedFeedFormat("Only RSS and Atom feeds can be streamed.")
+
+        yield from itertools.islice(_iter_parsed_feed_items(resp, feed, client), limit)
+    finally:
+        resp.close()
+
+
+def _feed_parser(parser: etree.XMLPullParser, resp: requests.Response) -> Iterator[None]:
+    """
+    Feed the body of a response to a parser in chunks, pausing after each chunk so its events can be read.
+    """
+    for chunk in iter_limited_content(resp):
+        parser.feed(chunk)
+        yield
+
+    parser.close()
+    yield
+
+
+def _iter_remaining_feed_items(
+    feed: str, client: Optional[HTTPClient], convert: Callable[[str], list], skip: int
+) -> Iterator[dict]:
+    """
+    Retrieve a feed that could not be parsed while it was downloaded, and yield the items after the first `skip` items.
+    """
+    try:
+        resp = _get_client(client).get(feed, allow_redirects=True)
+    except requests.RequestException:
+        raise FailedToFetchFeed("Request to retrieve feed did not return a valid response.")
+
+    if resp.status_code != 200:
+        raise FailedToFetchFeed("Request to retrieve feed did not return a valid response.")
+
+    try:
+        activities = convert(resp.text)
+    except etree.XMLSyntaxError:
+        raise FailedToFetchFeed("Feed is not valid XML.")
+
+    yield from jsonfeed.activities_to_jsonfeed(activities)["items"][skip:]
+
+
+def _iter_parsed_feed_items(resp: requests.Response, feed: str, client: Optional[HTTPClient]) -> Iterator[dict]:
+    parser = etree.XMLPullParser(events=("start", "end"), resolve_entities=False, no_network=True)
+
+    root = None
+    yielded = 0
+
+    try:
+        for _ in _feed_parser(parser, resp):
+            for event, element in parser.read_events():
+                if root is None:
+                    root = element
+                    convert = _get_item_converter(root)
+
+                if event != "end" or element.tag not in _ITEM_TAGS or element.getparent() is None:
+                    continue
+
+                items = jsonfeed.activities_to_jsonfeed(convert(_get_single_item_feed(element)))["items"]
+
+                # the item has been converted, so it no longer needs to be kept in memory
+                element.clear()
+                element.getparent().remove(element)
+
+                for item in items:
+                    yield item
+                    yielded += 1
+    except etree.XMLSyntaxError:
+        if root is None:
+            raise FailedToFetchFeed("Feed is not valid XML.")
+
+        # the converters used by retrieve_feed_contents() accept some feeds that are not well-formed XML
+        resp.close()
+
+        yield from _iter_remaining_feed_items(feed, client, convert, yielded)
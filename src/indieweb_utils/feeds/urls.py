@@ -1,34 +1,93 @@
 import re
-from typing import Tuple, Optional, Dict
-
-patterns = {
-    r"https://(www\.)?reddit\.com/r/([^/]+)/?": r"https://www.reddit.com/r/\2.rss",
-    r"https://(www\.)?pinterest\.com/([^/]+)/?": r"https://www.pinterest.com/\2.rss",
-    r"https://(www\.)?github\.com/([^/]+)/?": r"https://github.com/\2.atom",
-    r"https://(www\.)?medium\.com/@([^/]+)/?": r"https://medium.com/@\2/feed",
-    # // tumblr shuold turn https://www.tumblr.com/capjamesg into https://capjamesg.tumblr.com/rss
-    r"https://(www\.)?tumblr\.com/([^/]+)/?": r"https://\2.tumblr.com/rss",
-    r"https:\/\/?(www\.|arxiv\.org\/list\/)([^\/]+)\/recent": r"https://rss.arxiv.org/rss/\2",
-}
+from typing import Dict, List, Optional, Pattern, Tuple
+from urllib import parse as url_parse
+
+# feed URL rules, indexed by host name (without "www."). Each rule is a pattern matched against
+# the path of a URL and the feed URL to return, which can refer to the groups in the pattern.
+_feed_url_rules: Dict[str, List[Tuple[Pattern[str], str]]] = {}
 
 ACTIVITYPUB_USERNAME_REGEX = re.compile(r"^@([a-zA-Z0-9._-]+)@([a-zA-Z0-9.-]+)$")
 BLUESKY_USERNAME_REGEX = re.compile(r"^@([a-zA-Z0-9._-]+)")
 
+_ACTIVITYPUB_HANDLE_REGEX = re.compile(r"^@.*@.*\..*$")
+_ACTIVITYPUB_PROFILE_REGEX = re.compile(
+    r"https:\/\/(www\.)?(?!instagram|x.com|twitter.com|facebook.com)([^\/]+)\/@(.*)"
+)
+_BLUESKY_PROFILE_REGEX = re.compile(r"https:\/\/?(www\.|bsky\.app\/profile\/)([^\/]+)")
+
+
+def _get_rule_host(host: str) -> str:
+    host = host.lower()
+
+    if host.startswith("www."):
+        host = host[len("www.") :]
+
+    return host
+
+
+def register_feed_url_rule(host: str, path_pattern: str, feed_url: str) -> None:
+    """
+    Add a rule that `get_web_feed_url()` uses to turn URLs on a host into feed URLs.
+
+    Rules added with this function are checked before the built-in rules for the same host.
+
+    :param host: The host name of the URLs to which the rule applies. "www." is ignored, so
+        a rule for "example.com" also applies to "www.example.com".
+    :type host: str
+    :param path_pattern: A regular expression that must match the start of the path of a URL.
+    :type path_pattern: str
+    :param feed_url: The feed URL to return. Use \\1, \\2, etc. to include the groups matched by `path_pattern`.
+    :type feed_url: str
+
+    Example:
+
+    .. code-block:: python
+
+        from indieweb_utils.feeds import get_web_feed_url, register_feed_url_rule
+
+        register_feed_url_rule("codeberg.org", r"/([^/]+)/?$", r"https://codeberg.org/\\1.rss")
+
+        print(get_web_feed_url("https://codeberg.org/capjamesg"))
+        # ("https://codeberg.org/capjamesg.rss", "")
+    """
+    _feed_url_rules.setdefault(_get_rule_host(host), []).insert(0, (re.compile(path_pattern), feed_url))
+
+
+for _host, _path_pattern, _feed_url in (
+    ("reddit.com", r"/r/([^/]+)/?", r"https://www.reddit.com/r/\1.rss"),
+    ("pinterest.com", r"/([^/]+)/?", r"https://www.pinterest.com/\1.rss"),
+    ("github.com", r"/([^/]+)/?", r"https://github.com/\1.atom"),
+    ("medium.com", r"/@([^/]+)/?", r"https://medium.com/@\1/feed"),
+    # https://www.tumblr.com/capjamesg becomes https://capjamesg.tumblr.com/rss
+    ("tumblr.com", r"/([^/]+)/?", r"https://\1.tumblr.com/rss"),
+    ("arxiv.org", r"/list/([^/]+)/recent", r"https://rss.arxiv.org/rss/\1"),
+):
+    register_feed_url_rule(_host, _path_pattern, _feed_url)
+
 
 def get_web_feed_url(url: str) -> Optional[Tuple[str, str]]:
     """
     Given a URL, return the corresponding feed URL if it matches a known pattern.
 
+    The rules for the host of the URL are found with one dictionary lookup, so only the
+    patterns for that host are checked. Add your own rules with `register_feed_url_rule()`.
+
     :param url: The URL to check.
     :type url: str
     :return: A tuple containing the feed URL and an empty string, or (None,
                 None) if no pattern matches.
     """
-    for pattern, feed in patterns.items():
-        if re.match(pattern, url):
-            print(pattern, url)
-            result = re.sub(pattern, feed, url)
-            return result, ""
+    parsed_url = url_parse.urlsplit(url)
+
+    if parsed_url.scheme not in ("http", "https") or not parsed_url.hostname:
+        return None, None
+
+    for path_pattern, feed_url in _feed_url_rules.get(_get_rule_host(parsed_url.hostname), []):
+        match = path_pattern.match(parsed_url.path)
+
+        if match:
+            return match.expand(feed_url), ""
+
     return None, None
 
 
@@ -42,9 +101,9 @@ def check_if_feed_is_activitypub(url: str) -> Optional[str]:
     :rtype: str | None
     """
     # if matches @x@y.com, return
-    if re.match(r"^@.*@.*\..*$", url):
+    if _ACTIVITYPUB_HANDLE_REGEX.match(url):
         return url
-    result = re.match(r"https:\/\/(www\.)?(?!instagram|x.com|twitter.com|facebook.com)([^\/]+)\/@(.*)", url)
+    result = _ACTIVITYPUB_PROFILE_REGEX.match(url)
     if result:
         return f"@{result.group(3)}@{result.group(2)}"
     return None
@@ -60,7 +119,7 @@ def check_if_feed_is_bsky(url: str) -> Optional[str]:
     :rtype: str | None
     """
 
-    result = re.match(r"https:\/\/?(www\.|bsky\.app\/profile\/)([^\/]+)", url)
+    result = _BLUESKY_PROFILE_REGEX.match(url)
     if result:
         return f"@{result.group(2)}"
     return None
@@ -0,0 +1,475 @@
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from urllib import parse as url_parse
+
+import requests
+from bs4 import BeautifulSoup
+
+from ..network.client import HTTPClient, _get_client
+from ..webmentions.discovery import (
+    _check_endpoint_host,
+    _find_links_html,
+    _find_links_in_headers,
+)
+from .poll import FeedPollResponse, _convert_feed, _get_feed_content_type
+from .scheduler import FeedScheduler
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+ACTIVE = "active"
+DENIED = "denied"
+UNSUBSCRIBING = "unsubscribing"
+
+DEFAULT_LEASE_SECONDS = 10 * 24 * 60 * 60
+# a lease is renewed this many seconds before it expires, or half way through it if it is shorter
+DEFAULT_RENEW_BEFORE = 24 * 60 * 60
+# the number of seconds to wait for a hub to verify a request, or before retrying a failed request
+DEFAULT_RETRY_DELAY = 60 * 60
+
+_WEBSUB_RELS = ["hub", "self"]
+
+_SIGNATURE_METHODS = {
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "sha384": hashlib.sha384,
+    "sha512": hashlib.sha512,
+}
+
+
+class WebSubSubscriptionFailed(Exception):
+    pass
+
+
+@dataclass
+class WebSubSubscription:
+    """
+    A subscription of a WebSubSubscriber to a feed.
+
+    Subscriptions can be saved (i.e. with `dataclasses.asdict()`) and passed to
+    `WebSubSubscriber.add_subscription()` later, so a subscriber can continue where it left off.
+
+    The status of a subscription is "pending", "active", "denied", or "unsubscribing".
+    """
+
+    id: str
+    feed: str
+    topic: str
+    hub: str
+    secret: str
+    status: str = PENDING
+    lease_seconds: Optional[float] = None
+    lease_expires: Optional[float] = None
+    next_renewal: float = 0
+
+
+def _find_websub_links(url: str, headers, body: str) -> Dict[str, str]:
+    """
+    Return the absolute hub and self URLs advertised by a feed, in its Link headers or in the feed itself.
+    """
+    links = {
+        rel: link["url"] for rel, link in _find_links_in_headers(headers=headers, target_headers=_WEBSUB_RELS).items()
+    }
+
+    content_type = headers.get("Content-Type", "")
+
+    if "xml" in content_type and "html" not in content_type:
+        # RSS feeds use <atom:link>, and Atom feeds use <link>
+        for link in BeautifulSoup(body, "xml").find_all("link"):
+            for rel in (link.get("rel") or "").split():
+                if rel in _WEBSUB_RELS and link.get("href"):
+                    links.setdefault(rel, link["href"])
+    else:
+        for rel, href in _find_links_html(body=body, target_headers=_WEBSUB_RELS).items():
+            links.setdefault(rel, href)
+
+    return {rel: url_parse.urljoin(url, href) for rel, href in links.items()}
+
+
+def _is_valid_signature(secret: str, body: bytes, signature_header: str) -> bool:
+    method, _, signature = signature_header.partition("=")
+    digest = _SIGNATURE_METHODS.get(method.strip().lower())
+
+    if digest is None or not signature:
+        return False
+
+    expected = hmac.new(secret.encode("utf-8"), body, digest).hexdigest()
+
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+
+class WebSubSubscriber:
+    """
+    Subscribe to feeds that advertise a WebSub hub, so new content is pushed to you instead of polled.
+
+    Feeds are added to a FeedScheduler. If a feed advertises a hub, the subscriber asks the hub to
+    send new content to a callback URL on your site. Content pushed to the callback is converted
+    in the same way as polled feeds, and passed to the scheduler's `on_update` function. While a
+    subscription is active, the scheduler only polls the feed every `max_interval` seconds, in
+    case a push is missed. Feeds without a hub are polled as usual.
+
+    Each subscription has its own callback URL: `callback_url` followed by "/" and the id of the
+    subscription. Route requests to these URLs to `verify_intent()` (GET requests) and
+    `receive_content()` (POST requests). Pushed content is only accepted if it is signed with the
+    secret of the subscription. Call `run()` (or `run_pending()` regularly) to renew subscriptions
+    before their leases expire.
+
+    :param scheduler: The scheduler that polls the feeds.
+    :type scheduler: FeedScheduler
+    :param callback_url: The base URL of the callback URLs, i.e. "https://example.com/websub".
+    :type callback_url: str
+    :param lease_seconds: The number of seconds for which to ask the hub to keep each subscription.
+    :type lease_seconds: float
+    :param renew_before: The number of seconds before a lease expires at which to renew it.
+    :type renew_before: float
+    :param retry_delay: The number of seconds to wait for a hub to verify a request, or to retry a failed request.
+    :type retry_delay: float
+    :param on_error: A function called with the WebSubSubscription and the exception of every failed request (optional).
+    :type on_error: Callable[[WebSubSubscription, Exception], None]
+    :param client: The HTTP client to use (optional).
+    :type client: HTTPClient
+
+    Example:
+
+    .. code-block:: python
+
+        import threading
+
+        import indieweb_utils
+        from flask import Flask, request
+
+        scheduler = indieweb_utils.FeedScheduler(on_update=lambda state, response: print(response.contents))
+        subscriber = indieweb_utils.WebSubSubscriber(scheduler, "https://example.com/websub")
+
+        app = Flask(__name__)
+
+        @app.route("/websub/<id>", methods=["GET", "POST"])
+        def websub(id):
+            if request.method == "GET":
+                return subscriber.verify_intent(id, request.args)
+
+            return "", subscriber.receive_content(id, request.get_data(), request.headers)
+
+        subscriber.subscribe("https://jamesg.blog/feeds/posts.xml")
+
+        threading.Thread(target=scheduler.run, daemon=True).start()
+        threading.Thread(target=subscriber.run, daemon=True).start()
+    """
+
+    def __init__(
+        self,
+        scheduler: FeedScheduler,
+        callback_url: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        renew_before: float = DEFAULT_RENEW_BEFORE,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        on_error: Optional[Callable[[WebSubSubscription, Exception], None]] = None,
+        client: Optional[HTTPClient] = None,
+    ) -> None:
+        self.scheduler = scheduler
+        self.callback_url = callback_url.rstrip("/")
+        self.lease_seconds = lease_seconds
+        self.renew_before = renew_before
+        self.retry_delay = retry_delay
+        self.on_error = on_error
+        self.client = client
+
+        self.subscriptions: Dict[str, WebSubSubscription] = {}
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _get_callback(self, subscription: WebSubSubscription) -> str:
+        return f"{self.callback_url}/{subscription.id}"
+
+    def _send_request(self, subscription: WebSubSubscription, mode: str, now: float) -> None:
+        data = {
+            "hub.mode": mode,
+            "hub.topic": subscription.topic,
+            "hub.callback": self._get_callback(subscription),
+        }
+
+        if mode == "subscribe":
+            data["hub.secret"] = subscription.secret
+            data["hub.lease_seconds"] = str(int(self.lease_seconds))
+
+        # the request is retried if the hub does not verify it in time
+        with self._lock:
+            subscription.next_renewal = now + self.retry_delay
+
+        try:
+            response = _get_client(self.client).post(subscription.hub, data=data, timeout=10)
+        except requests.exceptions.RequestException as e:
+            raise WebSubSubscriptionFailed(f"Could not connect to the hub: {e}")
+
+        if not 200 <= response.status_code < 300:
+            raise WebSubSubscriptionFailed(f"The hub returned a {response.status_code} response.")
+
+    def add_subscription(self, subscription: WebSubSubscription) -> None:
+        """
+        Restore a saved subscription.
+
+        :param subscription: The saved subscription.
+        :type subscription: WebSubSubscription
+        """
+        with self._lock:
+            self.subscriptions[subscription.id] = subscription
+
+        if subscription.feed not in self.scheduler.feeds:
+            self.scheduler.add_feed(subscription.feed)
+
+        if subscription.status == ACTIVE:
+            self.scheduler.set_push_expiry(subscription.feed, subscription.lease_expires)
+
+    def subscribe(self, feed: str, now: Optional[float] = None) -> Optional[WebSubSubscription]:
+        """
+        Add a feed to the scheduler, and subscribe to it if it advertises a WebSub hub.
+
+        The subscription is active once the hub has verified it with a request to `verify_intent()`.
+
+        :param feed: The URL of the feed.
+        :type feed: str
+        :param now: The current time, as a UNIX timestamp (optional).
+        :type now: float
+        :return: The subscription (or the existing one for the feed), or None if the feed does not advertise a hub.
+        :rtype: Optional[WebSubSubscription]
+
+        :raises WebSubSubscriptionFailed: The hub could not be reached, or did not accept the subscription.
+        :raises requests.exceptions.RequestException: The feed could not be retrieved.
+        """
+        if now is None:
+            now = time.time()
+
+        if feed not in self.scheduler.feeds:
+            self.scheduler.add_feed(feed)
+
+        with self._lock:
+            for subscription in self.subscriptions.values():
+                if subscription.feed == feed and subscription.status in (PENDING, ACTIVE):
+                    return subscription
+
+        try:
+            response = _get_client(self.client).get(feed, timeout=10)
+        except requests.exceptions.RequestException:
+            raise requests.exceptions.RequestException("Could not connect to the specified URL.")
+
+        links = _find_websub_links(response.url or feed, response.headers, response.text)
+
+        if "hub" not in links:
+            return None
+
+        _check_endpoint_host(url_parse.urlsplit(links["hub"]).hostname or "")
+
+        subscription = WebSubSubscription(
+            id=secrets.token_urlsafe(16),
+            feed=feed,
+            # the hub knows the feed by its self URL, which may differ from the URL that was retrieved
+            topic=links.get("self", feed),
+            hub=links["hub"],
+            secret=secrets.token_hex(32),
+        )
+
+        with self._lock:
+            self.subscriptions[subscription.id] = subscription
+
+        self._send_request(subscription, "subscribe", now)
+
+        return subscription
+
+    def unsubscribe(self, feed: str, now: Optional[float] = None) -> None:
+        """
+        Ask the hub of a feed to stop pushing content. The feed is still polled by the scheduler.
+
+        :param feed: The URL of the feed.
+        :type feed: str
+        :param now: The current time, as a UNIX timestamp (optional).
+        :type now: float
+
+        :raises WebSubSubscriptionFailed: The hub could not be reached, or did not accept the request.
+        """
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            subscriptions = [subscription for subscription in self.subscriptions.values() if subscription.feed == feed]
+
+        for subscription in subscriptions:
+            with self._lock:
+                subscription.status = UNSUBSCRIBING
+
+            self.scheduler.set_push_expiry(feed, None, now)
+            self._send_request(subscription, "unsubscribe", now)
+
+    def verify_intent(
+        self, subscription_id: str, params: Mapping[str, str], now: Optional[float] = None
+    ) -> Tuple[str, int]:
+        """
+        Answer a hub's request to verify a subscription or an unsubscription (a GET request to a callback URL).
+
+        :param subscription_id: The id of the subscription, from the callback URL.
+        :type subscription_id: str
+        :param params: The query string parameters of the request.
+        :type params: Mapping[str, str]
+        :param now: The current time, as a UNIX timestamp (optional).
+        :type now: float
+        :return: The body and status code of the response to send to the hub.
+        :rtype: Tuple[str, int]
+        """
+        if now is None:
+            now = time.time()
+
+        # the lock is held while the subscription is checked and updated, so a renewal or another
+        # request from the hub cannot change it at the same time
+        with self._lock:
+            return self._verify_intent(subscription_id, params, now)
+
+    def _verify_intent(self, subscription_id: str, params: Mapping[str, str], now: float) -> Tuple[str, int]:
+        subscription = self.subscriptions.get(subscription_id)
+        mode = params.get("hub.mode")
+
+        if subscription is None or params.get("hub.topic") != subscription.topic:
+            return "", 404
+
+        if mode == "denied":
+            subscription.status = DENIED
+            self.scheduler.set_push_expiry(subscription.feed, None, now)
+
+            return "", 200
+
+        challenge = params.get("hub.challenge")
+
+        if not challenge:
+            return "", 400
+
+        if mode == "subscribe" and subscription.status in (PENDING, ACTIVE):
+            try:
+                lease_seconds = float(params.get("hub.lease_seconds") or self.lease_seconds)
+            except ValueError:
+                lease_seconds = self.lease_seconds
+
+            subscription.status = ACTIVE
+            subscription.lease_seconds = lease_seconds
+            subscription.lease_expires = now + lease_seconds
+            subscription.next_renewal = subscription.lease_expires - min(self.renew_before, lease_seconds / 2)
+
+            self.scheduler.set_push_expiry(subscription.feed, subscription.lease_expires, now)
+
+            return challenge, 200
+
+        if mode == "unsubscribe" and subscription.status == UNSUBSCRIBING:
+            self.subscriptions.pop(subscription_id, None)
+
+            return challenge, 200
+
+        return "", 404
+
+    def receive_content(
+        self, subscription_id: str, body: bytes, headers: Mapping[str, str], now: Optional[float] = None
+    ) -> int:
+        """
+        Accept content pushed by a hub (a POST request to a callback URL), and pass it to the scheduler's `on_update`.
+
+        Content that is not signed with the secret of the subscription is ignored, but a 2xx status
+        code is still returned, as the WebSub specification requires.
+
+        :param subscription_id: The id of the subscription, from the callback URL.
+        :type subscription_id: str
+        :param body: The body of the request.
+        :type body: bytes
+        :param headers: The headers of the request.
+        :type headers: Mapping[str, str]
+        :param now: The current time, as a UNIX timestamp (optional).
+        :type now: float
+        :return: The status code of the response to send to the hub.
+        :rtype: int
+        """
+        headers = requests.structures.CaseInsensitiveDict(headers)
+
+        with self._lock:
+            subscription = self.subscriptions.get(subscription_id)
+
+            if subscription is None or subscription.status != ACTIVE:
+                return 404
+
+            secret = subscription.secret
+
+        if not _is_valid_signature(secret, body, headers.get("X-Hub-Signature", "")):
+            return 202
+
+        # the hub is always sent a 2xx status code, so it does not retry content that cannot be processed
+        try:
+            content_type = _get_feed_content_type(headers.get("Content-Type", ""))
+            contents = _convert_feed(content_type, body.decode("utf-8", errors="replace"))
+
+            response = FeedPollResponse(
+                url=subscription.feed, status_code=200, modified=True, contents=contents, headers=dict(headers)
+            )
+
+            self.scheduler.receive_push(subscription.feed, response, now)
+        except Exception as e:
+            self._report_error(subscription, e)
+
+        return 202
+
+    def _report_error(self, subscription: WebSubSubscription, error: Exception) -> None:
+        if self.on_error is None:
+            return
+
+        try:
+            self.on_error(subscription, error)
+        except Exception:
+            logger.exception("on_error raised an exception for the feed %s", subscription.feed)
+
+    def run_pending(self, now: Optional[float] = None) -> List[WebSubSubscription]:
+        """
+        Renew every subscription whose lease is about to expire, and retry requests that were not verified.
+
+        :param now: The current time, as a UNIX timestamp (optional).
+        :type now: float
+        :return: The subscriptions for which a request was sent.
+        :rtype: List[WebSubSubscription]
+        """
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            due = [
+                subscription
+                for subscription in self.subscriptions.values()
+                if subscription.status != DENIED and subscription.next_renewal <= now
+            ]
+
+        for subscription in due:
+            mode = "unsubscribe" if subscription.status == UNSUBSCRIBING else "subscribe"
+
+            try:
+                self._send_request(subscription, mode, now)
+            except WebSubSubscriptionFailed as e:
+                self._report_error(subscription, e)
+
+        return due
+
+    def run(self, poll_interval: float = 60) -> None:
+        """
+        Renew subscriptions as they become due until `stop()` is called.
+
+        :param poll_interval: The number of seconds to wait between checks for subscriptions to renew.
+        :type poll_interval: float
+        """
+        self._stopped.clear()
+
+        while not self._stopped.is_set():
+            self.run_pending()
+            self._stopped.wait(poll_interval)
+
+    def stop(self) -> None:
+        """
+        Stop a subscriber that was started with `run()`.
+        """
+        self._stopped.set()
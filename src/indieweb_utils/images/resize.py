@@ -1,9 +1,10 @@
-import requests
 from PIL import Image
-from ..constants import USER_AGENT
+from ..network.client import _get_client
 
 
-def reduce_image_size(url=None, image_data=None, pil_image=None, reduction_size=0.5, height=None, width=None):
+def reduce_image_size(
+    url=None, image_data=None, pil_image=None, reduction_size=0.5, height=None, width=None, client=None
+):
     """
     Reduce the size of an image. Returns a PIL.Image object. Useful for creating images for use in HTML source sets.
 
@@ -15,6 +16,8 @@ def reduce_image_size(url=None, image_data=None, pil_image=None, reduction_size=
     :type pil_image: PIL.Image
     :param reduction_size: The scale factor by which to reduce the image, expressed as a number between 0 and 1. (i.e. 0.5 = 50%)
     :type reduction_size: float
+    :param client: The HTTP client to use to retrieve the image from a URL (optional).
+    :type client: HTTPClient
     :returns: The reduced image data.
     :rtype: PIL.Image
 
@@ -32,7 +35,7 @@ def reduce_image_size(url=None, image_data=None, pil_image=None, reduction_size=
         raise Exception("Please provide either a URL, image data, or a PIL.Image object.")
 
     if url:
-        image_data = requests.get(url, headers={"User-Agent": USER_AGENT}).content
+        image_data = _get_client(client).get(url).content
         image = Image.open(image_data)
 
     if image_data:
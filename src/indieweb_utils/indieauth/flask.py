@@ -1,8 +1,8 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 import requests
-from ..constants import USER_AGENT
+from ..network.client import HTTPClient, _get_client
 
 @dataclass
 class IndieAuthCallbackResponse:
@@ -45,6 +45,7 @@ def indieauth_callback_handler(
     callback_url: str,
     client_id: str,
     required_scopes: List[str],
+    client: Optional[HTTPClient] = None,
 ) -> IndieAuthCallbackResponse:
     """
     Exchange a callback 'code' for an authentication token.
@@ -68,6 +69,8 @@ def indieauth_callback_handler(
     :param required_scopes: The scopes required for the application to work.
         This list should not include optional scopes.
     :type required_scopes: list[str]
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
     :return: A message indicating the result of the callback (success or failure) and the token endpoint response.
         The endpoint response will be equal to None if the callback failed.
     :rtype: tuple[str, dict]
@@ -115,7 +118,7 @@ def indieauth_callback_handler(
     headers = {"Accept": "application/json"}
 
     try:
-        auth_request = requests.post(token_endpoint, data=data, headers=headers)
+        auth_request = _get_client(client).post(token_endpoint, data=data, headers=headers)
     except requests.exceptions.RequestException:
         message = "Your token endpoint server could not be accessed."
         raise AuthenticationError(message)
@@ -131,7 +134,13 @@ def indieauth_callback_handler(
     return IndieAuthCallbackResponse(message="Authentication was successful.", response=auth_request.json())
 
 
-def is_authenticated(token_endpoint: str, headers: dict, session: dict, approved_user: bool = None) -> bool:
+def is_authenticated(
+    token_endpoint: str,
+    headers: dict,
+    session: dict,
+    approved_user: bool = None,
+    client: Optional[HTTPClient] = None,
+) -> bool:
     """
     Check if a user has provided a valid Authorization header or access token in session. Designed for use with Flask.
 
@@ -139,6 +148,7 @@ def is_authenticated(token_endpoint: str, headers: dict, session: dict, approved
     :param headers: The headers sent by a request.
     :param session: The session object from a Flask application.
     :param approved_user: The optional URL of the that is approved to use the API.
+    :param client: The HTTP client to use for requests (optional).
     :return: True if the user is authenticated, False otherwise.
     :rtype: bool
 
@@ -176,7 +186,9 @@ def is_authenticated(token_endpoint: str, headers: dict, session: dict, approved
         return False
 
     try:
-        check_token = requests.get(token_endpoint, headers={"Authorization": f"Bearer {access_token}", "User-Agent": USER_AGENT}, timeout=5)
+        check_token = _get_client(client).get(
+            token_endpoint, headers={"Authorization": f"Bearer {access_token}"}, timeout=5
+        )
     except requests.exceptions.Timeout:
         raise AuthenticationError("The specified token endpoint timed out.")
     except requests.exceptions.RequestException:
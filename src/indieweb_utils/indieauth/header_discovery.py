@@ -3,8 +3,8 @@ from typing import List, Optional
 
 import requests
 
+from ..network.client import HTTPClient, _get_client
 from ..webmentions.discovery import discover_endpoints
-from ..constants import USER_AGENT
 
 @dataclass
 class IndieAuthEndpoints:
@@ -27,12 +27,14 @@ class IndieAuthEndpoints:
     raw_metadata_endpoint_response: Optional[dict] = None
 
 
-def discover_indieauth_endpoints(url: str) -> IndieAuthEndpoints:
+def discover_indieauth_endpoints(url: str, client: Optional[HTTPClient] = None) -> IndieAuthEndpoints:
     """
     Discover and return the IndieAuth endpoints associated with a resource.
 
     :param url: The URL of the resource whose endpoints should be discovered.
     :type url: str
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
     :return: The IndieAuth endpoints associated with the resource.
     :rtype: IndieAuthEndpoints
 
@@ -49,12 +51,12 @@ def discover_indieauth_endpoints(url: str) -> IndieAuthEndpoints:
     :raises requests.exceptions.RequestException: If the request to the resource fails.
     """
     endpoints = discover_endpoints(
-        url, ["indieauth-metadata", "authorization_endpoint", "token_endpoint", "ticket_endpoint"]
+        url, ["indieauth-metadata", "authorization_endpoint", "token_endpoint", "ticket_endpoint"], client=client
     )
 
     if endpoints.get("indieauth-metadata"):
         try:
-            response = requests.get(endpoints["indieauth-metadata"], headers={"User-Agent": USER_AGENT}, timeout=5)
+            response = _get_client(client).get(endpoints["indieauth-metadata"], timeout=5)
         except requests.exceptions.RequestException:
             raise requests.exceptions.RequestException("Could not connect to the specified URL.")
 
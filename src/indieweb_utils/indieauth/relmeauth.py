@@ -1,17 +1,21 @@
-from typing import List, Set
+from typing import List, Optional, Set
 from urllib.parse import urlparse as parse_url
 
 import mf2py
 import requests
 from bs4 import BeautifulSoup
 
+from ..network.client import HTTPClient, _get_client
 from ..parsing.parse import get_parsed_mf2_data
 from ..utils.urls import canonicalize_url
-from ..constants import USER_AGENT
 
 
 def get_valid_relmeauth_links(
-    url: str, require_rel_me_link_back: bool = True, html: str = None, parsed_mf2: mf2py.Parser = None
+    url: str,
+    require_rel_me_link_back: bool = True,
+    html: str = None,
+    parsed_mf2: mf2py.Parser = None,
+    client: Optional[HTTPClient] = None,
 ) -> List[str]:
     """
     Get the valid links on a page that point back to a rel=me URL per RelMeAuth.
@@ -27,6 +31,8 @@ def get_valid_relmeauth_links(
         set to True (the default), this function will only return sites that have a rel=me link
         pointing back to your URL.
     :type require_rel_me_link_back: bool
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
     :return: The valid relmeauth links.
     :rtype: dict
 
@@ -48,7 +54,7 @@ def get_valid_relmeauth_links(
 
     canonical_url = canonicalize_url(url, domain).strip("/")
 
-    mf2_data = get_parsed_mf2_data(parsed_mf2, html, canonical_url)
+    mf2_data = get_parsed_mf2_data(parsed_mf2, html, canonical_url, client)
 
     rel_me_links = [canonicalize_url(url, domain) for url in mf2_data["rels"].get("me", [])]
 
@@ -64,7 +70,7 @@ def get_valid_relmeauth_links(
 
     for link in rel_me_links:
         try:
-            link_valid = requests.get(link, headers={"User-Agent": USER_AGENT}, timeout=5)
+            link_valid = _get_client(client).get(link, timeout=5)
         except requests.exceptions.RequestException:
             continue
 
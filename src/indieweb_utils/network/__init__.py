@@ -0,0 +1,28 @@
+from .cache import Cache, FileCache, MemoryCache, get_cache_ttl
+from .client import HTTPClient, get_default_client, set_default_client
+from .limits import (
+    HostLimiter,
+    ResponseDeadlineExceeded,
+    ResponseTooLarge,
+    iter_limited_content,
+    read_limited_content,
+)
+from .resolver import PinnedIPAdapter, Resolver, UnacceptableIPAddress
+
+__all__ = [
+    "HTTPClient",
+    "get_default_client",
+    "set_default_client",
+    "HostLimiter",
+    "ResponseTooLarge",
+    "ResponseDeadlineExceeded",
+    "iter_limited_content",
+    "read_limited_content",
+    "Cache",
+    "MemoryCache",
+    "FileCache",
+    "get_cache_ttl",
+    "Resolver",
+    "PinnedIPAdapter",
+    "UnacceptableIPAddress",
+]
@@ -0,0 +1,265 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 1024
+
+# a FileCache file is not rewritten until it has at least this many lines
+_MIN_COMPACTED_LINES = 1024
+
+
+class Cache(ABC):
+    """
+    The interface implemented by every cache used in IndieWeb Utils.
+
+    Subclass this class to store cached values somewhere else (i.e. in Redis).
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the value stored for a key, or None if the key is missing or has expired.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value for a key.
+
+        :param key: The key.
+        :type key: str
+        :param value: The value.
+        :type value: Any
+        :param ttl: The number of seconds after which the value expires. If None, the value does not expire.
+        :type ttl: float
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove a key from the cache, if it is present.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Remove every key from the cache.
+        """
+
+
+class MemoryCache(Cache):
+    """
+    An in-memory cache with per-key expiry and least recently used eviction.
+
+    The cache is safe to share between threads.
+
+    :param max_entries: The maximum number of keys to keep. When the cache is full,
+        the least recently used key is removed.
+    :type max_entries: int
+
+    Example:
+
+    .. code-block:: python
+
+        from indieweb_utils.network import MemoryCache
+
+        cache = MemoryCache(max_entries=512)
+
+        cache.set("key", "value", ttl=60)
+
+        print(cache.get("key")) # value
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+
+            if expires_at is not None and expires_at <= time.time():
+                # expired keys are not kept when a cache is loaded, so their removal is not saved
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            expires_at = time.time() + ttl if ttl is not None else None
+
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            self._saved_set(key, value, expires_at)
+
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._saved_delete(evicted_key)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._saved_delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._saved_clear()
+
+    def _saved_set(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        pass
+
+    def _saved_delete(self, key: str) -> None:
+        pass
+
+    def _saved_clear(self) -> None:
+        pass
+
+
+class FileCache(MemoryCache):
+    """
+    A cache that is kept in memory and saved to a file, so cached values are kept between runs.
+
+    Values must be serializable to JSON.
+
+    Every change is appended to the file as one line of JSON, so saving a change does not
+    depend on the size of the cache. When the file holds more than twice as many lines as
+    the cache has keys, it is rewritten with only the current keys.
+
+    :param path: The path of the file in which to store the cache.
+    :type path: str
+    :param max_entries: The maximum number of keys to keep.
+    :type max_entries: int
+
+    Example:
+
+    .. code-block:: python
+
+        from indieweb_utils.network import FileCache
+
+        cache = FileCache("webmention_endpoints.json")
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        super().__init__(max_entries=max_entries)
+
+        self.path = path
+
+        # the number of lines in the file
+        self._saved_lines = 0
+
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+
+        now = time.time()
+        is_complete = True
+
+        for line in lines:
+            try:
+                key, *entry = json.loads(line)
+            except ValueError:
+                # a line can be incomplete if the process stopped while it was written
+                is_complete = False
+                continue
+
+            if not entry:
+                self._entries.pop(key, None)
+            elif entry[1] is None or entry[1] > now:
+                self._entries[key] = (entry[0], entry[1])
+                self._entries.move_to_end(key)
+            else:
+                self._entries.pop(key, None)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        self._saved_lines = len(lines)
+
+        if not is_complete or self._saved_lines > len(self._entries):
+            self._compact()
+
+    def _append(self, line: list) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps(line) + "\n")
+
+        self._saved_lines += 1
+
+        if self._saved_lines > max(2 * len(self._entries), _MIN_COMPACTED_LINES):
+            self._compact()
+
+    def _compact(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+
+        # write to a temporary file first so a crash cannot leave a partially written cache
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False) as f:
+            for key, (value, expires_at) in self._entries.items():
+                f.write(json.dumps([key, value, expires_at]) + "\n")
+
+        os.replace(f.name, self.path)
+
+        self._saved_lines = len(self._entries)
+
+    def _saved_set(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        self._append([key, value, expires_at])
+
+    def _saved_delete(self, key: str) -> None:
+        self._append([key])
+
+    def _saved_clear(self) -> None:
+        self._compact()
+
+
+def get_cache_ttl(headers, default_ttl: float) -> float:
+    """
+    Return the number of seconds for which a response may be cached, according to its Cache-Control header.
+
+    If the response says it must not be cached, 0 is returned.
+    If the response does not specify a max-age, `default_ttl` is returned.
+
+    :param headers: The headers of a HTTP response.
+    :type headers: dict
+    :param default_ttl: The number of seconds to use if the response does not specify a max-age.
+    :type default_ttl: float
+    :return: The number of seconds for which the response may be cached.
+    :rtype: float
+    """
+    cache_control = headers.get("Cache-Control", "")
+
+    directives = {}
+
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.strip().lower()] = value.strip().strip('"')
+
+    if "no-store" in directives or "no-cache" in directives:
+        return 0
+
+    try:
+        return max(int(directives["max-age"]), 0)
+    except (KeyError, ValueError):
+        return default_ttl
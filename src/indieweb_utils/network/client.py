@@ -0,0 +1,225 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .. import constants
+from .resolver import PinnedIPAdapter, Resolver
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 32
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_STATUS_CODES = (502, 503, 504)
+
+
+class HTTPClient:
+    """
+    A pooled HTTP client shared by every function in IndieWeb Utils that makes a network request.
+
+    One client holds one connection pool per host, so repeated requests to the same
+    site reuse an open (keep-alive) TCP and TLS connection instead of opening a new one.
+
+    :param timeout: The timeout, in seconds, applied to requests that do not specify one.
+    :type timeout: float
+    :param max_retries: The number of times to retry idempotent requests that fail to connect,
+        time out while reading, or return a retryable status code.
+    :type max_retries: int
+    :param backoff_factor: The backoff factor used between retries.
+    :type backoff_factor: float
+    :param pool_connections: The number of per-host connection pools to keep.
+    :type pool_connections: int
+    :param pool_maxsize: The maximum number of connections kept open in each per-host pool.
+    :type pool_maxsize: int
+    :param user_agent: The User-Agent to send with requests that do not set one.
+    :type user_agent: str
+    :param retry_status_codes: The status codes on which an idempotent request is retried.
+    :type retry_status_codes: Iterable[int]
+    :param resolver: A Resolver with which to check the address of every host before connecting to it (optional).
+        Connections are made to the checked address. See `Resolver`.
+    :type resolver: Resolver
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        client = indieweb_utils.HTTPClient(timeout=5, pool_maxsize=64)
+
+        # use the client for every request made by the library
+        indieweb_utils.set_default_client(client)
+
+        # or use it for a single call
+        endpoint = indieweb_utils.discover_webmention_endpoint("https://jamesg.blog/", client=client)
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = 0.3,
+        pool_connections: int = DEFAULT_POOL_SIZE,
+        pool_maxsize: int = DEFAULT_POOL_SIZE,
+        user_agent: Optional[str] = None,
+        retry_status_codes: Iterable[int] = DEFAULT_RETRY_STATUS_CODES,
+        resolver: Optional[Resolver] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.resolver = resolver
+
+        retries = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=tuple(retry_status_codes),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+
+        if resolver is not None:
+            self.adapter: HTTPAdapter = PinnedIPAdapter(
+                resolver, pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retries
+            )
+        else:
+            self.adapter = HTTPAdapter(
+                pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retries
+            )
+
+        self.session = self._create_session()
+        self.session.headers["User-Agent"] = user_agent or constants.USER_AGENT
+
+        # sessions with a different redirect limit share the same adapter (and so the same connection pools)
+        self._redirect_limited_sessions: Dict[int, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+
+        return session
+
+    def _session_for(self, max_redirects: Optional[int]) -> requests.Session:
+        if max_redirects is None or max_redirects == self.session.max_redirects:
+            return self.session
+
+        with self._lock:
+            session = self._redirect_limited_sessions.get(max_redirects)
+
+            if session is None:
+                session = self._create_session()
+                session.headers = self.session.headers
+                session.max_redirects = max_redirects
+                self._redirect_limited_sessions[max_redirects] = session
+
+        return session
+
+    def request(self, method: str, url: str, max_redirects: Optional[int] = None, **kwargs) -> requests.Response:
+        """
+        Make a HTTP request using the pooled session.
+
+        :param method: The HTTP method to use.
+        :type method: str
+        :param url: The URL to request.
+        :type url: str
+        :param max_redirects: The maximum number of redirects to follow for this request (optional).
+        :type max_redirects: int
+        :return: The response.
+        :rtype: requests.Response
+
+        :raises requests.exceptions.RequestException: The request could not be completed.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+
+        return self._session_for(max_redirects).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Make a GET request. Accepts the same arguments as `request()`."""
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """Make a HEAD request. Accepts the same arguments as `request()`."""
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Make a POST request. Accepts the same arguments as `request()`."""
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+        for session in self._redirect_limited_sessions.values():
+            session.close()
+
+    def __enter__(self) -> "HTTPClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+_default_client: Optional[HTTPClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> HTTPClient:
+    """
+    Return the HTTP client used by functions that are not given a `client` argument.
+
+    The default client is created on first use.
+
+    :return: The default HTTP client.
+    :rtype: HTTPClient
+    """
+    global _default_client
+
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = HTTPClient()
+
+    return _default_client
+
+
+def set_default_client(client: HTTPClient) -> None:
+    """
+    Set the HTTP client used by functions that are not given a `client` argument.
+
+    :param client: The client to use by default.
+    :type client: HTTPClient
+    """
+    global _default_client
+
+    with _default_client_lock:
+        _default_client = client
+
+
+def _get_client(client: Optional[HTTPClient] = None) -> HTTPClient:
+    """
+    Return the given client, or the default client if none was provided.
+    """
+    return client if client is not None else get_default_client()
+
+
+def _get_retry_after(headers) -> Optional[float]:
+    value = headers.get("Retry-After")
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    # Retry-After can also be a HTTP date
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
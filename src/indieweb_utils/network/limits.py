@@ -0,0 +1,160 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib import parse as url_parse
+
+import requests
+
+DEFAULT_CHUNK_SIZE = 16384
+
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    """
+    Raised when a response body is larger than the number of bytes allowed.
+    """
+
+
+class ResponseDeadlineExceeded(requests.exceptions.Timeout):
+    """
+    Raised when a response body is not fully received before a deadline.
+    """
+
+
+def _get_host(url: str) -> str:
+    return url_parse.urlsplit(url).netloc.lower()
+
+
+class HostLimiter:
+    """
+    Limit the number of simultaneous requests made to each host.
+
+    A limiter can be shared between threads. Requests to different hosts do not block each other.
+
+    :param max_per_host: The maximum number of simultaneous requests to one host.
+    :type max_per_host: int
+
+    Example:
+
+    .. code-block:: python
+
+        from indieweb_utils.network import HostLimiter
+
+        limiter = HostLimiter(max_per_host=2)
+
+        with limiter.limit("https://jamesg.blog/"):
+            ...
+    """
+
+    def __init__(self, max_per_host: int = 2) -> None:
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be at least 1.")
+
+        self.max_per_host = max_per_host
+
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def _get_semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._semaphores[host] = semaphore
+
+            return semaphore
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        """
+        Wait until a request can be made to the host of a URL, then hold a slot for that host.
+
+        :param url: The URL that will be requested.
+        :type url: str
+        """
+        semaphore = self._get_semaphore(_get_host(url))
+
+        with semaphore:
+            yield
+
+
+def _get_content_length(headers) -> int:
+    try:
+        return int(headers.get("Content-Length") or 0)
+    except ValueError:
+        return 0
+
+
+def iter_limited_content(
+    response: requests.Response,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield the body of a streamed response in chunks, stopping if it is too large or too slow.
+
+    The response must have been requested with `stream=True`. The response is closed when
+    the body has been read, when a limit is exceeded, or when the generator is closed, so
+    at most `max_bytes` (plus one chunk) are ever held in memory.
+
+    :param response: The streamed response.
+    :type response: requests.Response
+    :param max_bytes: The maximum number of bytes to read (optional).
+    :type max_bytes: int
+    :param deadline: The time, as returned by `time.monotonic()`, by which the body must be read (optional).
+    :type deadline: float
+    :param chunk_size: The number of bytes to read at a time.
+    :type chunk_size: int
+    :return: The chunks of the body.
+    :rtype: Iterator[bytes]
+
+    :raises ResponseTooLarge: The body is larger than `max_bytes`.
+    :raises ResponseDeadlineExceeded: The body was not read before `deadline`.
+    """
+    if max_bytes is not None and _get_content_length(response.headers) > max_bytes:
+        response.close()
+        raise ResponseTooLarge(f"Response from {response.url} is larger than {max_bytes} bytes.")
+
+    received = 0
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            received += len(chunk)
+
+            # Content-Length can be missing or wrong, so the bytes received are counted too
+            if max_bytes is not None and received > max_bytes:
+                raise ResponseTooLarge(f"Response from {response.url} is larger than {max_bytes} bytes.")
+
+            # the read timeout of a request applies to each read, so a server that sends a few bytes
+            # at a time could otherwise keep a request open indefinitely
+            if deadline is not None and time.monotonic() > deadline:
+                raise ResponseDeadlineExceeded(f"Response from {response.url} was not received in time.")
+
+            yield chunk
+    finally:
+        response.close()
+
+
+def read_limited_content(
+    response: requests.Response, max_bytes: Optional[int] = None, deadline: Optional[float] = None
+) -> bytes:
+    """
+    Read the body of a streamed response, stopping if it is too large or too slow.
+
+    See `iter_limited_content()` for details.
+
+    :param response: The streamed response.
+    :type response: requests.Response
+    :param max_bytes: The maximum number of bytes to read (optional).
+    :type max_bytes: int
+    :param deadline: The time, as returned by `time.monotonic()`, by which the body must be read (optional).
+    :type deadline: float
+    :return: The body.
+    :rtype: bytes
+
+    :raises ResponseTooLarge: The body is larger than `max_bytes`.
+    :raises ResponseDeadlineExceeded: The body was not read before `deadline`.
+    """
+    return b"".join(iter_limited_content(response, max_bytes, deadline))
@@ -0,0 +1,184 @@
+import ipaddress
+import socket
+from typing import List, Optional, Union
+from urllib import parse as url_parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import DEFAULT_MAX_ENTRIES, MemoryCache
+
+DEFAULT_DNS_TTL = 5 * 60
+
+
+class UnacceptableIPAddress(requests.exceptions.ConnectionError):
+    """
+    Raised if an IP address for a webmention endpoint does not resolve on the public internet.
+
+    Local, loopback, private, reserved, and multicast IP addresses are not acceptable. This is a
+    ConnectionError, so code that handles requests that could not connect also handles it.
+    """
+
+
+def _is_public_address(address: Union[ipaddress.IPv4Address, ipaddress.IPv6Address]) -> bool:
+    # an IPv6 address can wrap an IPv4 address, i.e. ::ffff:127.0.0.1
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+
+    return not (
+        address.is_private
+        or address.is_loopback
+        or address.is_link_local
+        or address.is_multicast
+        or address.is_reserved
+        or address.is_unspecified
+    )
+
+
+def _parse_ip_address(host: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    try:
+        return ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return None
+
+
+class Resolver:
+    """
+    Resolve host names to IP addresses that are safe to connect to, and cache the answers.
+
+    Every address a host name resolves to is checked. If any address is private, loopback,
+    link-local, multicast, reserved, or unspecified, the host is rejected, so a page cannot
+    make your server send requests to your own network (server-side request forgery).
+
+    Pass a resolver to a HTTPClient to check, and connect to, the vetted address of every
+    request the client makes. Answers are cached for `ttl` seconds, so a host is only looked
+    up once however many requests are made to it.
+
+    :param ttl: The number of seconds for which to cache an answer.
+    :type ttl: float
+    :param allow_private: If True, addresses are resolved and cached but not checked.
+    :type allow_private: bool
+    :param max_entries: The maximum number of host names to cache.
+    :type max_entries: int
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+        from indieweb_utils.network import Resolver
+
+        client = indieweb_utils.HTTPClient(resolver=Resolver())
+
+        # raises UnacceptableIPAddress if the endpoint resolves to a private address
+        indieweb_utils.send_webmention(
+            "https://jamesg.blog/post", "https://example.com/post", client=client
+        )
+    """
+
+    def __init__(
+        self, ttl: float = DEFAULT_DNS_TTL, allow_private: bool = False, max_entries: int = DEFAULT_MAX_ENTRIES
+    ) -> None:
+        self.ttl = ttl
+        self.allow_private = allow_private
+
+        self._cache = MemoryCache(max_entries=max_entries)
+
+    def _check(self, host: str, addresses: List[str]) -> None:
+        if self.allow_private:
+            return
+
+        for address in addresses:
+            if not _is_public_address(ipaddress.ip_address(address)):
+                raise UnacceptableIPAddress(f"{host} does not connect to an accepted IP address.")
+
+    def resolve(self, host: str, port: int = 443) -> List[str]:
+        """
+        Return the IP addresses of a host that are safe to connect to.
+
+        :param host: The host name or IP address.
+        :type host: str
+        :param port: The port that will be connected to.
+        :type port: int
+        :return: The IP addresses of the host.
+        :rtype: List[str]
+
+        :raises UnacceptableIPAddress: The host resolves to an address that is not on the public internet.
+        :raises socket.gaierror: The host name could not be resolved.
+        """
+        host = host.lower()
+        address = _parse_ip_address(host)
+
+        if address is not None:
+            addresses = [str(address)]
+            self._check(host, addresses)
+            return addresses
+
+        key = f"dns:{host}:{port}"
+        addresses = self._cache.get(key)
+
+        if addresses is None:
+            answers = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            addresses = list(dict.fromkeys(answer[4][0] for answer in answers))
+
+            # answers are only cached once they have been checked
+            self._check(host, addresses)
+            self._cache.set(key, addresses, self.ttl)
+
+        return addresses
+
+
+class PinnedIPAdapter(HTTPAdapter):
+    """
+    A transport adapter that connects to the address vetted by a Resolver instead of looking the host up again.
+
+    The host name is still used for the Host header, and for TLS server name indication and
+    certificate verification. Connections are pooled per host name and address.
+
+    Requires requests 2.32 or later. With older versions of requests, the address of the host is
+    checked before each request but the connection is not pinned to it.
+    """
+
+    def __init__(self, resolver: Resolver, **kwargs) -> None:
+        self.resolver = resolver
+
+        super().__init__(**kwargs)
+
+    def _resolve(self, url: str) -> str:
+        parsed_url = url_parse.urlsplit(url)
+        port = parsed_url.port or (443 if parsed_url.scheme == "https" else 80)
+
+        try:
+            return self.resolver.resolve(parsed_url.hostname or "", port)[0]
+        except socket.gaierror as e:
+            raise requests.exceptions.ConnectionError(f"Could not resolve {parsed_url.hostname}: {e}")
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+
+        hostname = host_params["host"]
+        host_params["host"] = self._resolve(request.url)
+
+        if host_params["scheme"] == "https":
+            pool_kwargs["server_hostname"] = hostname
+            pool_kwargs["assert_hostname"] = hostname
+
+        return host_params, pool_kwargs
+
+    def send(self, request, **kwargs):
+        parsed_url = url_parse.urlsplit(request.url)
+
+        # checked for every request, including each redirect, before any connection is made
+        self._resolve(request.url)
+
+        if "Host" in request.headers:
+            return super().send(request, **kwargs)
+
+        # the connection is made to an IP address, so the Host header is set explicitly. It is
+        # removed afterwards, because redirects to other hosts are made with a copy of the request.
+        request.headers["Host"] = parsed_url.netloc.rsplit("@", 1)[-1]
+
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            del request.headers["Host"]
@@ -1,3 +1,5 @@
+from .batch import MF2ParseResult, parse_mf2_documents
+from .page import ParsedPage
 from .parse import get_soup
 
-__all__ = ["get_soup"]
+__all__ = ["get_soup", "ParsedPage", "parse_mf2_documents", "MF2ParseResult"]
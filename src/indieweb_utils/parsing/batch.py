@@ -0,0 +1,130 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import mf2py
+
+
+@dataclass
+class MF2ParseResult:
+    """
+    The result of parsing one document with `parse_mf2_documents()`.
+
+    If the document could not be parsed, `error` is the exception raised by the parser and `data` is None.
+    """
+
+    url: str
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+
+
+def _parse_mf2_chunk(chunk: List[Tuple[str, str]], html_parser: Optional[str]) -> List[MF2ParseResult]:
+    # runs in a worker process, so it must be a module-level function
+    results = []
+
+    for url, html in chunk:
+        try:
+            results.append(
+                MF2ParseResult(url=url, data=mf2py.parse(doc=html, url=url or None, html_parser=html_parser))
+            )
+        except Exception as e:
+            results.append(MF2ParseResult(url=url, error=e))
+
+    return results
+
+
+def _chunks(documents: Iterable[Tuple[str, str]], chunksize: int) -> Iterator[List[Tuple[str, str]]]:
+    iterator = iter(documents)
+
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def parse_mf2_documents(
+    documents: Iterable[Tuple[str, str]],
+    max_workers: Optional[int] = None,
+    chunksize: int = 16,
+    ordered: bool = True,
+    html_parser: Optional[str] = None,
+) -> Iterator[MF2ParseResult]:
+    """
+    Parse the microformats2 in many documents at once, using one process per CPU core.
+
+    Documents are sent to worker processes in chunks of `chunksize` documents, and only a few
+    chunks per worker are in progress at any time, so `documents` can be a generator that yields
+    tens of thousands of documents without all of them being held in memory.
+
+    :param documents: (url, html) pairs to parse. The URL is used to resolve relative URLs.
+    :type documents: Iterable[Tuple[str, str]]
+    :param max_workers: The number of worker processes (default: the number of CPU cores).
+    :type max_workers: int
+    :param chunksize: The number of documents to send to a worker process at once.
+    :type chunksize: int
+    :param ordered: If True, results are yielded in the order of `documents`. If False,
+        results are yielded as soon as they are ready.
+    :type ordered: bool
+    :param html_parser: The BeautifulSoup parser for mf2py to use (default: mf2py's default parser).
+    :type html_parser: str
+    :return: One MF2ParseResult per document.
+    :rtype: Iterator[MF2ParseResult]
+
+    Example:
+
+    .. code-block:: python
+
+        from indieweb_utils.parsing import parse_mf2_documents
+
+        documents = [
+            ("https://jamesg.blog/", "<div class='h-entry'>...</div>"),
+            ("https://aaronparecki.com/", "<div class='h-entry'>...</div>"),
+        ]
+
+        if __name__ == "__main__":
+            for result in parse_mf2_documents(documents):
+                print(result.url, result.data["items"])
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1.")
+
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # keep every worker busy without reading all documents ahead of time
+    max_in_flight = 2 * max_workers
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        chunks = _chunks(documents, chunksize)
+        in_flight: "deque[Future]" = deque()
+
+        def submit_chunks() -> None:
+            while len(in_flight) < max_in_flight:
+                chunk = next(chunks, None)
+
+                if chunk is None:
+                    return
+
+                in_flight.append(executor.submit(_parse_mf2_chunk, chunk, html_parser))
+
+        submit_chunks()
+
+        while in_flight:
+            if ordered:
+                done = [in_flight.popleft()]
+            else:
+                completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                done = [future for future in in_flight if future in completed]
+
+                for future in done:
+                    in_flight.remove(future)
+
+            submit_chunks()
+
+            for future in done:
+                yield from future.result()
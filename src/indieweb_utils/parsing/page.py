@@ -0,0 +1,143 @@
+from typing import Any, Dict, Optional, Union
+
+import mf2py
+import requests
+from bs4 import BeautifulSoup, UnicodeDammit
+
+from ..network.client import HTTPClient, _get_client
+from .parse import RequestError
+
+
+class ParsedPage:
+    """
+    A web page that is parsed at most once, no matter how many functions use it.
+
+    The HTML of the page is only parsed when it is first needed. The BeautifulSoup tree
+    and the microformats2 tree are then kept and reused, and the microformats2 tree is
+    built from the same BeautifulSoup tree, so a page is parsed by one HTML parser once.
+
+    Functions that parse a page, like `get_page_name()`, `get_reply_urls()`,
+    `get_syndicated_copies()`, `discover_author()`, `get_representative_h_card()`,
+    and `get_post_type()`, accept a ParsedPage as the `page` argument.
+
+    :param url: The URL of the page.
+    :type url: str
+    :param html: The HTML of the page, as a string or as bytes.
+    :type html: Union[str, bytes]
+    :param encoding: The character encoding of `html`, if `html` is bytes and the encoding is known (optional).
+        If no encoding is given, the encoding is detected from the document.
+    :type encoding: str
+    :param html_parser: The BeautifulSoup parser to use (default: html.parser).
+    :type html_parser: str
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        page = indieweb_utils.ParsedPage.from_url("https://jamesg.blog/")
+
+        page_name = indieweb_utils.get_page_name(page=page)
+        reply_urls = indieweb_utils.get_reply_urls(page=page)
+        author = indieweb_utils.discover_author(page=page)
+    """
+
+    def __init__(
+        self,
+        url: str = "",
+        html: Union[str, bytes] = b"",
+        encoding: Optional[str] = None,
+        html_parser: str = "html.parser",
+    ) -> None:
+        self.url = url
+        self.encoding = encoding
+        self.html_parser = html_parser
+
+        self._html = html
+        self._text: Optional[str] = html if isinstance(html, str) else None
+        self._soup: Optional[BeautifulSoup] = None
+        self._mf2: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_url(
+        cls, url: str, client: Optional[HTTPClient] = None, headers: Optional[dict] = None, **kwargs
+    ) -> "ParsedPage":
+        """
+        Retrieve a page and return it as a ParsedPage. The page is not parsed until it is used.
+
+        :param url: The URL of the page.
+        :type url: str
+        :param client: The HTTP client to use for the request (optional).
+        :type client: HTTPClient
+        :param headers: The headers to send with the request (optional).
+        :type headers: dict
+        :return: The page.
+        :rtype: ParsedPage
+
+        :raises RequestError: The page could not be retrieved.
+        """
+        try:
+            response = _get_client(client).get(url, headers=headers, timeout=10)
+        except requests.exceptions.RequestException:
+            raise RequestError("Request to retrieve URL did not return a valid response.")
+
+        return cls.from_response(response, **kwargs)
+
+    @classmethod
+    def from_response(cls, response: requests.Response, **kwargs) -> "ParsedPage":
+        """
+        Create a ParsedPage from a response that has already been retrieved.
+
+        :param response: The response.
+        :type response: requests.Response
+        :return: The page.
+        :rtype: ParsedPage
+        """
+        # only trust the encoding of a response if the server declared one
+        encoding = response.encoding if "charset" in response.headers.get("content-type", "").lower() else None
+
+        return cls(url=response.url, html=response.content, encoding=encoding, **kwargs)
+
+    @property
+    def content(self) -> bytes:
+        """
+        The HTML of the page, as bytes.
+        """
+        if isinstance(self._html, bytes):
+            return self._html
+
+        return self._html.encode(self.encoding or "utf-8")
+
+    @property
+    def text(self) -> str:
+        """
+        The HTML of the page, as a string.
+        """
+        if self._text is None:
+            known_encodings = [self.encoding] if self.encoding else []
+
+            self._text = UnicodeDammit(self._html, known_definite_encodings=known_encodings).unicode_markup or ""
+
+        return self._text
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """
+        The BeautifulSoup tree of the page.
+        """
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.text, self.html_parser)
+
+        return self._soup
+
+    @property
+    def mf2(self) -> Dict[str, Any]:
+        """
+        The microformats2 tree of the page, built from the BeautifulSoup tree of the page.
+        """
+        if self._mf2 is None:
+            # mf2py copies the parts of the tree it changes, so the soup can still be used afterwards
+            self._mf2 = mf2py.parse(doc=self.soup, url=self.url or None)
+
+        return self._mf2
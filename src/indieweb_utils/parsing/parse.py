@@ -1,13 +1,18 @@
+from typing import Optional
+
 import mf2py
 import requests
 from bs4 import BeautifulSoup
-from ..constants import USER_AGENT
+from ..network.client import HTTPClient, _get_client
+
 
 class RequestError(Exception):
     pass
 
 
-def get_parsed_mf2_data(parsed_mf2: mf2py.Parser = None, html: str = None, url: str = ""):
+def get_parsed_mf2_data(
+    parsed_mf2: mf2py.Parser = None, html: str = None, url: str = "", client: Optional[HTTPClient] = None
+):
     """
     Return or create an mf2py object from a parsed document, a HTML string, and a URL.
     """
@@ -16,12 +21,20 @@ def get_parsed_mf2_data(parsed_mf2: mf2py.Parser = None, html: str = None, url:
     elif html:
         return mf2py.parse(doc=html)
     elif url:
-        return mf2py.parse(url=url)
+        contents = _get_client(client).get(url)
+
+        # let mf2py detect the encoding when the server does not declare one, as mf2py.parse(url=url) does
+        if "charset" in contents.headers.get("content-type", ""):
+            return mf2py.parse(doc=contents.text, url=contents.url)
+
+        return mf2py.parse(doc=contents.content, url=contents.url)
 
     raise RequestError("No soup, url, or HTML document provided.")
 
 
-def get_soup(html: str = "", url: str = "", headers: dict = dict()) -> BeautifulSoup:
+def get_soup(
+    html: str = "", url: str = "", headers: dict = dict(), client: Optional[HTTPClient] = None
+) -> BeautifulSoup:
     """
     Return or create a BeautifulSoup object from a HTML string, and a URL.
     """
@@ -29,19 +42,17 @@ def get_soup(html: str = "", url: str = "", headers: dict = dict()) -> Beautiful
         return BeautifulSoup(html, "html.parser")
 
     if url:
-        return _get_soup_from_request(url, headers=headers)
+        return _get_soup_from_request(url, headers=headers, client=client)
 
     raise RequestError("No soup, url, or HTML document provided.")
 
 
-def _get_soup_from_request(url: str, headers: dict = {}) -> BeautifulSoup:
+def _get_soup_from_request(url: str, headers: dict = {}, client: Optional[HTTPClient] = None) -> BeautifulSoup:
     """
     Create a BeautifulSoup object from a URL.
     """
-    if not headers.get("User-Agent"):
-        headers["User-Agent"] = USER_AGENT
     try:
-        contents = requests.get(url, timeout=10, headers=headers).text
+        contents = _get_client(client).get(url, timeout=10, headers=headers).text
     except requests.exceptions.RequestException:
         raise RequestError("Request to retrieve URL did not return a valid response.")
 
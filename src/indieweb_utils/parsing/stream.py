@@ -0,0 +1,200 @@
+import codecs
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional
+from urllib import parse as url_parse
+
+import requests
+
+from ..utils.urls import canonicalize_url
+
+DEFAULT_CHUNK_SIZE = 8192
+
+# elements that may appear before the <body> of a document. Any other element starts the body.
+_HEAD_ELEMENTS = {"html", "head", "title", "meta", "link", "base", "script", "style", "noscript", "template"}
+
+
+class HeadLinkParser(HTMLParser):
+    """
+    An incremental parser that finds the <link rel> elements in the <head> of a HTML document.
+
+    Feed the parser a document in chunks with `feed()`. Once `done` is True, the rest of
+    the document does not need to be read: either every wanted rel has been found, or the
+    parser has reached the <body> of the document.
+
+    When more than one link has the same rel, the first link is used.
+    """
+
+    def __init__(self, rels: Iterable[str], domain: Optional[str] = None) -> None:
+        super().__init__(convert_charrefs=True)
+
+        self.rels = set(rels)
+        self.domain = domain
+        self.links: Dict[str, str] = {}
+        self.reached_body = False
+
+    @property
+    def done(self) -> bool:
+        return self.reached_body or self.rels.issubset(self.links)
+
+    def handle_starttag(self, tag: str, attrs: List) -> None:
+        if self.done:
+            return
+
+        if tag not in _HEAD_ELEMENTS:
+            self.reached_body = True
+            return
+
+        if tag != "link":
+            return
+
+        attributes = dict(attrs)
+        href = attributes.get("href")
+
+        if href is None:
+            return
+
+        for rel in (attributes.get("rel") or "").split():
+            if rel in self.rels and rel not in self.links:
+                self.links[rel] = canonicalize_url(url=href, domain=self.domain)
+
+    def handle_startendtag(self, tag: str, attrs: List) -> None:
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self.reached_body = True
+
+
+class TargetLinkParser(HTMLParser):
+    """
+    An incremental parser that looks for a hyperlink to a target URL in a HTML document.
+
+    Feed the parser a document in chunks with `feed()`. `found` becomes True as soon as an
+    <a> element that links to the target has been parsed, or the target URL appears in the
+    document text. Only links on the same host as the target (or relative links) are
+    canonicalized and compared to the target.
+
+    `gone` becomes True if the document declares itself gone with a `<link>` or `<meta>` element
+    with `http-equiv="Status"` and `content="410 Gone"`. Once `done` is True, the rest of the
+    document does not need to be read: either the document is gone, or a link to the target has
+    been found and the parser has reached the <body> of the document, so the whole <head> has been
+    checked for a gone status. A gone status in the <body> is only seen if it appears before the link.
+    """
+
+    def __init__(self, target: str) -> None:
+        super().__init__(convert_charrefs=True)
+
+        self.target = target
+        self.target_domain = url_parse.urlparse(target).netloc
+        self.found = False
+        self.gone = False
+        self.reached_body = False
+
+        # the end of the previous chunk, so the target can be found when it is split between chunks
+        self._tail = ""
+
+    @property
+    def done(self) -> bool:
+        return self.gone or (self.found and self.reached_body)
+
+    def feed(self, data: str) -> None:
+        if not self.found and self.target in self._tail + data:
+            self.found = True
+
+        self._tail = (self._tail + data)[-len(self.target) :]
+
+        super().feed(data)
+
+    def _is_candidate(self, href: str) -> bool:
+        netloc = url_parse.urlparse(href).netloc
+
+        return not netloc or netloc == self.target_domain
+
+    def handle_starttag(self, tag: str, attrs: List) -> None:
+        attributes = dict(attrs)
+
+        if tag not in _HEAD_ELEMENTS:
+            self.reached_body = True
+
+        if _is_gone_status(tag, attributes):
+            self.gone = True
+            return
+
+        if self.found or tag != "a":
+            return
+
+        href = attributes.get("href")
+
+        if href and self._is_candidate(href):
+            if canonicalize_url(href, self.target_domain, self.target) == self.target:
+                self.found = True
+
+    def handle_startendtag(self, tag: str, attrs: List) -> None:
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self.reached_body = True
+
+
+def _is_gone_status(tag: str, attributes: Dict) -> bool:
+    """
+    Return whether an element declares that its document is gone (see https://indieweb.org/meta_http-equiv_status).
+    """
+    return (
+        tag in ("link", "meta") and attributes.get("http-equiv") == "Status" and attributes.get("content") == "410 Gone"
+    )
+
+
+def _get_stream_encoding(response: requests.Response) -> str:
+    # requests assumes ISO-8859-1 for text/* responses without a charset, but most HTML without one is UTF-8
+    if "charset" in response.headers.get("content-type", "").lower() and response.encoding:
+        return response.encoding
+
+    return "utf-8"
+
+
+def _get_incremental_decoder(response: requests.Response) -> codecs.IncrementalDecoder:
+    try:
+        return codecs.getincrementaldecoder(_get_stream_encoding(response))(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def find_head_links(
+    response: requests.Response,
+    rels: Iterable[str],
+    domain: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, str]:
+    """
+    Find the <link rel> elements in the <head> of a streamed response, reading no more of the body than needed.
+
+    The response must have been requested with `stream=True`. The response is closed
+    once the links have been found.
+
+    :param response: The streamed response.
+    :type response: requests.Response
+    :param rels: The rel values to find.
+    :type rels: Iterable[str]
+    :param domain: The domain against which relative links are resolved.
+    :type domain: str
+    :param chunk_size: The number of bytes to read at a time.
+    :type chunk_size: int
+    :return: A dictionary that maps each rel that was found to its URL.
+    :rtype: Dict[str, str]
+    """
+    parser = HeadLinkParser(rels, domain=domain)
+
+    decoder = _get_incremental_decoder(response)
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            parser.feed(decoder.decode(chunk))
+
+            if parser.done:
+                break
+    finally:
+        response.close()
+
+    return parser.links
@@ -1,14 +1,15 @@
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from urllib import parse as url_parse
 
 import mf2py
 import requests
 from bs4 import BeautifulSoup
 
+from ..network.client import HTTPClient, _get_client
+from ..parsing.page import ParsedPage
 from ..parsing.parse import get_parsed_mf2_data, get_soup
 from ..utils.urls import _is_http_url, canonicalize_url
-from ..constants import USER_AGENT
 
 # This regex identifies permashortlink citations in the form of (example.com slug)
 # Permashortlink citations may be used as a link to a post that does not contain a hyperlink
@@ -25,9 +26,11 @@ class PostTypeFormattingError(Exception):
     pass
 
 
-def _process_candidate_url(candidate_url: str, posse_permalink: str, parsed_post: BeautifulSoup) -> str:
+def _process_candidate_url(
+    candidate_url: str, posse_permalink: str, parsed_post: BeautifulSoup, client: Optional[HTTPClient] = None
+) -> str:
     try:
-        request = requests.get(candidate_url, headers={"User-Agent": USER_AGENT}, timeout=5)
+        request = _get_client(client).get(candidate_url, timeout=5)
     except requests.exceptions.RequestException:
         raise PostDiscoveryError("Could not get candidate url")
 
@@ -41,7 +44,7 @@ def _process_candidate_url(candidate_url: str, posse_permalink: str, parsed_post
         if "u-syndication" in link.get("class"):
             url_to_check = link.get("href")
 
-            original_post_url = _syndication_check(url_to_check, posse_permalink, candidate_url, posse_domain)
+            original_post_url = _syndication_check(url_to_check, posse_permalink, candidate_url, posse_domain, client)
 
             if original_post_url:
                 return original_post_url
@@ -52,7 +55,7 @@ def _process_candidate_url(candidate_url: str, posse_permalink: str, parsed_post
         if header.get("href") == posse_permalink:
             url_to_check = header.get("href")
 
-            original_post_url = _syndication_check(url_to_check, posse_permalink, candidate_url, posse_domain)
+            original_post_url = _syndication_check(url_to_check, posse_permalink, candidate_url, posse_domain, client)
 
             if original_post_url:
                 return original_post_url
@@ -87,7 +90,29 @@ def _check_for_link_in_post(last_text: BeautifulSoup) -> str:
     return candidate_url
 
 
-def discover_original_post(posse_permalink: str, soup: BeautifulSoup = None, html: str = "") -> str:
+def _get_post_soup(
+    posse_permalink: str,
+    soup: Optional[BeautifulSoup],
+    html: str,
+    client: Optional[HTTPClient],
+    page: Optional[ParsedPage],
+) -> BeautifulSoup:
+    if page is not None:
+        return page.soup
+
+    if soup is None:
+        return get_soup(html, posse_permalink, client=client)
+
+    return soup
+
+
+def discover_original_post(
+    posse_permalink: str,
+    soup: BeautifulSoup = None,
+    html: str = "",
+    client: Optional[HTTPClient] = None,
+    page: Optional[ParsedPage] = None,
+) -> str:
     """
     Find the original version of a post per the Original Post Discovery algorithm.
 
@@ -95,6 +120,10 @@ def discover_original_post(posse_permalink: str, soup: BeautifulSoup = None, htm
 
     :param posse_permalink: The permalink of the post.
     :type posse_permalink: str
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
+    :param page: The post, if it has already been retrieved or parsed (optional).
+    :type page: ParsedPage
     :return: The original post permalink.
     :rtype: str
 
@@ -112,10 +141,7 @@ def discover_original_post(posse_permalink: str, soup: BeautifulSoup = None, htm
         post is not marked up with h-entry.
     """
 
-    if soup is None:
-        parsed_post = get_soup(html, posse_permalink)
-    else:
-        parsed_post = soup
+    parsed_post = _get_post_soup(posse_permalink, soup, html, client, page)
 
     # Get the post h-entry
 
@@ -155,7 +181,7 @@ def discover_original_post(posse_permalink: str, soup: BeautifulSoup = None, htm
         candidate_url = _check_for_link_in_post(last_text)
 
     if candidate_url and candidate_url != "":
-        post_url = _process_candidate_url(candidate_url, posse_permalink, parsed_post)
+        post_url = _process_candidate_url(candidate_url, posse_permalink, parsed_post, client)
 
         if post_url != "":
             return post_url
@@ -163,8 +189,8 @@ def discover_original_post(posse_permalink: str, soup: BeautifulSoup = None, htm
     return ""
 
 
-def _discover_h_card_from_author_page(author_url: str, rel_author: str) -> dict:
-    new_h_card = mf2py.parse(url=author_url)
+def _discover_h_card_from_author_page(author_url: str, rel_author: str, client: Optional[HTTPClient] = None) -> dict:
+    new_h_card = get_parsed_mf2_data(url=author_url, client=client)
 
     # get rel me values from parsed object
     if new_h_card.get("rels") and new_h_card.get("rels").get("me"):
@@ -196,7 +222,13 @@ def _discover_h_card_from_author_page(author_url: str, rel_author: str) -> dict:
     return {}
 
 
-def discover_author(url: str, html: str = "", parsed_mf2: mf2py.Parser = None) -> dict:
+def discover_author(
+    url: str = "",
+    html: str = "",
+    parsed_mf2: mf2py.Parser = None,
+    client: Optional[HTTPClient] = None,
+    page: Optional[ParsedPage] = None,
+) -> dict:
     """
     Discover the author of a post per the IndieWeb Authorship specification.
 
@@ -207,6 +239,11 @@ def discover_author(url: str, html: str = "", parsed_mf2: mf2py.Parser = None) -
     :param page_contents: The optional page contents to use.
         Specifying this value prevents a HTTP request being made to the URL.
     :type page_contents: str
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
+    :param page: A page that has already been retrieved or parsed (optional).
+        If a page is provided, it is used instead of `url` and `html`.
+    :type page: ParsedPage
     :return: A h-card of the post.
     :rtype: dict
 
@@ -226,7 +263,11 @@ def discover_author(url: str, html: str = "", parsed_mf2: mf2py.Parser = None) -
         print(post_author) # A h-card object representing the post author.
     """
 
-    full_page = get_parsed_mf2_data(parsed_mf2, html, url)
+    if page is not None:
+        url = url or page.url
+        full_page = page.mf2
+    else:
+        full_page = get_parsed_mf2_data(parsed_mf2, html, url, client)
 
     preliminary_author = None
 
@@ -273,14 +314,24 @@ def discover_author(url: str, html: str = "", parsed_mf2: mf2py.Parser = None) -
 
         author_url = canonicalize_url(author_page_url, domain)
 
-        h_card = _discover_h_card_from_author_page(author_url, rel_author)
+        h_card = _discover_h_card_from_author_page(author_url, rel_author, client)
 
         return h_card
 
     return {}
 
 
-def get_post_type(h_entry: dict = {}, custom_properties: List[Tuple[str, str]] = []) -> str:
+def _get_h_entry(h_entry: dict, page: Optional[ParsedPage]) -> dict:
+    if h_entry or page is None:
+        return h_entry
+
+    # items can have more than one type, i.e. ["h-entry", "h-as-note"]
+    return next((item for item in page.mf2["items"] if "h-entry" in item["type"]), {})
+
+
+def get_post_type(
+    h_entry: dict = {}, custom_properties: List[Tuple[str, str]] = [], page: Optional[ParsedPage] = None
+) -> str:
     """
     Return the type of a h-entry per the Post Type Discovery algorithm.
 
@@ -288,6 +339,8 @@ def get_post_type(h_entry: dict = {}, custom_properties: List[Tuple[str, str]] =
     :type h_entry: dict
     :param custom_properties: The optional custom properties to use for the Post Type Discovery algorithm.
     :type custom_properties: list[tuple[str, str]]
+    :param page: A page whose first h-entry to use if no h-entry is provided (optional).
+    :type page: ParsedPage
     :return: The type of the h-entry.
     :rtype: str
 
@@ -313,6 +366,8 @@ def get_post_type(h_entry: dict = {}, custom_properties: List[Tuple[str, str]] =
     :raises PostTypeFormattingError: Raised when you specify a custom_properties tuple in the wrong format.
     """
 
+    h_entry = _get_h_entry(h_entry, page)
+
     post = h_entry.get("properties")
 
     if post is None:
@@ -363,13 +418,13 @@ def get_post_type(h_entry: dict = {}, custom_properties: List[Tuple[str, str]] =
     return post_type
 
 
-def _syndication_check(url_to_check, posse_permalink, candidate_url, posse_domain):
+def _syndication_check(url_to_check, posse_permalink, candidate_url, posse_domain, client=None):
     if url_to_check == posse_permalink:
         return candidate_url
 
     if url_to_check and url_parse.urlsplit(url_to_check).netloc == posse_domain:
         try:
-            r = requests.get(url_to_check, headers={"User-Agent": USER_AGENT}, timeout=10, allow_redirects=True)
+            r = _get_client(client).get(url_to_check, timeout=10, allow_redirects=True)
         except requests.exceptions.RequestException:
             # handler will prevent exception due to timeout, if one occurs
             pass
@@ -1,9 +1,13 @@
-from typing import List
+from typing import List, Optional
 
-import mf2py
+from ..network.client import HTTPClient
+from ..parsing.page import ParsedPage
+from ..parsing.parse import get_parsed_mf2_data
 
 
-def get_reply_urls(url: str, html: str = None) -> List[str]:
+def get_reply_urls(
+    url: str = "", html: str = None, client: Optional[HTTPClient] = None, page: Optional[ParsedPage] = None
+) -> List[str]:
     """
     Retrieve a list of all of the URLs to which a given post is responding using a u-in-reply-to microformat.
 
@@ -13,6 +17,11 @@ def get_reply_urls(url: str, html: str = None) -> List[str]:
     :type url: str
     :param html: The HTML of the page whose replies you want to retrieve.
     :type html: str
+    :param client: The HTTP client to use if the page needs to be retrieved (optional).
+    :type client: HTTPClient
+    :param page: A page that has already been retrieved or parsed (optional).
+        If a page is provided, it is used instead of `url` and `html`.
+    :type page: ParsedPage
     :return: A list of all of the URLs to which the given post responds.
     :rtype: list
 
@@ -27,10 +36,10 @@ def get_reply_urls(url: str, html: str = None) -> List[str]:
         print(reply_urls) # ["https://twitter.com/amandaljudkins/status/1579680989135384576?s=12"]
     """
 
-    if html:
-        parsed_document = mf2py.parse(doc=html)
+    if page is not None:
+        parsed_document = page.mf2
     else:
-        parsed_document = mf2py.parse(url=url)
+        parsed_document = get_parsed_mf2_data(html=html, url=url, client=client)
 
     in_reply_to_urls = []
 
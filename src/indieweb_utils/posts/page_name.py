@@ -1,11 +1,50 @@
+from typing import Optional, Tuple
+
 import mf2py
 import requests
 from bs4 import BeautifulSoup
 
+from ..network.client import HTTPClient, _get_client
+from ..parsing.page import ParsedPage
 from ..parsing.parse import RequestError, get_soup
-from ..constants import USER_AGENT
 
-def get_page_name(url: str, html: str = None, soup: BeautifulSoup = None) -> str:
+
+def _get_page_trees(
+    url: str,
+    html: Optional[str],
+    soup: Optional[BeautifulSoup],
+    client: Optional[HTTPClient],
+    page: Optional[ParsedPage],
+) -> Tuple[BeautifulSoup, dict]:
+    """
+    Return the BeautifulSoup and microformats2 trees of a page, retrieving the page if needed.
+    """
+    if page is not None:
+        return page.soup, page.mf2
+
+    if html:
+        soup = get_soup(html)
+
+    if soup is None:
+        try:
+            contents = _get_client(client).get(url, timeout=10)
+        except requests.exceptions.RequestException:
+            raise RequestError("Request to retrieve URL did not return a valid response.")
+
+        soup = BeautifulSoup(contents.text, "html.parser")
+
+        html = contents.text
+
+    return soup, mf2py.parse(doc=html)
+
+
+def get_page_name(
+    url: str = "",
+    html: str = None,
+    soup: BeautifulSoup = None,
+    client: Optional[HTTPClient] = None,
+    page: Optional[ParsedPage] = None,
+) -> str:
     """
     Retrieve the name of a page using the Page Name Discovery algorithm.
 
@@ -15,6 +54,11 @@ def get_page_name(url: str, html: str = None, soup: BeautifulSoup = None) -> str
     :type url: str
     :param html: The HTML of the page whose title you want to retrieve.
     :type html: str
+    :param client: The HTTP client to use if the page needs to be retrieved (optional).
+    :type client: HTTPClient
+    :param page: A page that has already been retrieved or parsed (optional).
+        If a page is provided, it is used instead of `url` and `html`.
+    :type page: ParsedPage
     :return: A representative "name" for the page.
     :rtype: str
 
@@ -29,22 +73,7 @@ def get_page_name(url: str, html: str = None, soup: BeautifulSoup = None) -> str
         print(page_name) # "Home | James' Coffee Blog"
     """
 
-    parsed_mf2_tree = None
-
-    if html:
-        soup = get_soup(html)
-
-    if soup is None:
-        try:
-            contents = requests.get(url, headers={"User-Agent": USER_AGENT},timeout=10)
-        except requests.exceptions.RequestException:
-            raise RequestError("Request to retrieve URL did not return a valid response.")
-
-        soup = BeautifulSoup(contents.text, "html.parser")
-
-        html = contents.text
-
-    parsed_mf2_tree = mf2py.parse(doc=html)
+    soup, parsed_mf2_tree = _get_page_trees(url, html, soup, client, page)
 
     # only search the top level of the tree
     # representative h-entries, which is what this function looks for, should not be lower down
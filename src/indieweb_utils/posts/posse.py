@@ -1,9 +1,13 @@
-from typing import List
+from typing import List, Optional
 
-import mf2py
+from ..network.client import HTTPClient
+from ..parsing.page import ParsedPage
+from ..parsing.parse import get_parsed_mf2_data
 
 
-def get_syndicated_copies(url: str, html: str = None) -> List[str]:
+def get_syndicated_copies(
+    url: str = "", html: str = None, client: Optional[HTTPClient] = None, page: Optional[ParsedPage] = None
+) -> List[str]:
     """
     Retrieve the URLs for syndicated copies of a post.
 
@@ -13,6 +17,11 @@ def get_syndicated_copies(url: str, html: str = None) -> List[str]:
     :type url: str
     :param html: The HTML of the post whose syndicated copies you want to retrieve.
     :type html: str
+    :param client: The HTTP client to use if the page needs to be retrieved (optional).
+    :type client: HTTPClient
+    :param page: A page that has already been retrieved or parsed (optional).
+        If a page is provided, it is used instead of `url` and `html`.
+    :type page: ParsedPage
     :return: A list of URLs for syndicated copies of the post.
     :rtype list
 
@@ -28,10 +37,10 @@ def get_syndicated_copies(url: str, html: str = None) -> List[str]:
             print(url)
     """
 
-    if html:
-        parsed_web_page = mf2py.parse(doc=html)
+    if page is not None:
+        parsed_web_page = page.mf2
     else:
-        parsed_web_page = mf2py.parse(url=url)
+        parsed_web_page = get_parsed_mf2_data(html=html, url=url, client=client)
 
     syndication_urls = []
 
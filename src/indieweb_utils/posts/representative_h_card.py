@@ -3,6 +3,8 @@ from typing import Any, Dict, Optional
 
 import mf2py
 
+from ..network.client import HTTPClient
+from ..parsing.page import ParsedPage
 from ..parsing.parse import get_parsed_mf2_data
 
 
@@ -16,7 +18,13 @@ class RepresentativeHCard:
     pass
 
 
-def get_representative_h_card(url: str, html: str = "", parsed_mf2: Optional[mf2py.Parser] = None) -> Dict[str, Any]:
+def get_representative_h_card(
+    url: str = "",
+    html: str = "",
+    parsed_mf2: Optional[mf2py.Parser] = None,
+    client: Optional[HTTPClient] = None,
+    page: Optional[ParsedPage] = None,
+) -> Dict[str, Any]:
     """
     Get the representative h-card on a page per the Representative h-card Parsing algorithm.
 
@@ -24,6 +32,11 @@ def get_representative_h_card(url: str, html: str = "", parsed_mf2: Optional[mf2
 
     :url: The url to parse.
     :type url: str
+    :param client: The HTTP client to use if the page needs to be retrieved (optional).
+    :type client: HTTPClient
+    :param page: A page that has already been retrieved or parsed (optional).
+        If a page is provided, it is used instead of `url` and `html`.
+    :type page: ParsedPage
     :return: The representative h-card.
     :rtype: dict
 
@@ -42,7 +55,11 @@ def get_representative_h_card(url: str, html: str = "", parsed_mf2: Optional[mf2
     :raises RepresentativeHCardParsingError: Representative h-card could not be parsed.
     """
 
-    mf2_data = get_parsed_mf2_data(parsed_mf2, html, url)
+    if page is not None:
+        url = url or page.url
+        mf2_data = page.mf2
+    else:
+        mf2_data = get_parsed_mf2_data(parsed_mf2, html, url, client)
 
     if not mf2_data:
         raise RepresentativeHCardParsingError("No mf2 data found.")
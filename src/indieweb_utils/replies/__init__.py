@@ -1,3 +1,5 @@
+from .batch import ReplyContextResult, get_reply_contexts
+from .cache import ReplyContextCache
 from .context import ReplyContext, get_reply_context
 
-__all__ = ["get_reply_context", "ReplyContext"]
+__all__ = ["get_reply_context", "ReplyContext", "get_reply_contexts", "ReplyContextResult", "ReplyContextCache"]
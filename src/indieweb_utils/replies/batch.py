@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from ..network.cache import Cache, MemoryCache
+from ..network.client import HTTPClient
+from ..network.limits import HostLimiter
+from .context import DEFAULT_SUBREQUEST_DEADLINE, ReplyContext, _get_reply_context
+
+
+@dataclass
+class ReplyContextResult:
+    """
+    The result of generating the reply context of one URL with `get_reply_contexts()`.
+
+    If the reply context could not be generated, `error` is the exception that `get_reply_context()`
+    would have raised for the URL and `context` is None.
+    """
+
+    url: str
+    context: Optional[ReplyContext] = None
+    error: Optional[Exception] = None
+
+
+def _get_limited_reply_context(
+    url: str,
+    summary_word_limit: int,
+    limiter: HostLimiter,
+    client: Optional[HTTPClient],
+    deadline: float,
+    cache: Cache,
+    icon_cache: Optional[Cache],
+) -> ReplyContextResult:
+    try:
+        with limiter.limit(url):
+            context = _get_reply_context(url, summary_word_limit, client, deadline, cache, icon_cache)
+    except Exception as e:
+        return ReplyContextResult(url=url, error=e)
+
+    return ReplyContextResult(url=url, context=context)
+
+
+def get_reply_contexts(
+    urls: Iterable[str],
+    summary_word_limit: int = 75,
+    max_workers: int = 8,
+    max_per_host: int = 2,
+    client: Optional[HTTPClient] = None,
+    deadline: float = DEFAULT_SUBREQUEST_DEADLINE,
+    icon_cache: Optional[Cache] = None,
+) -> Iterator[ReplyContextResult]:
+    """
+    Generate the reply context of many URLs at the same time, i.e. for every post in a timeline.
+
+    No more than `max_workers` URLs are processed at once, and no more than `max_per_host`
+    pages on one host are retrieved at once. Author pages and favicons are only retrieved once
+    per batch, so a timeline with many posts by the same author does not retrieve the author's
+    page for every post. Duplicate URLs are only processed once.
+
+    Results are yielded as soon as they are ready, so you can render a timeline while slower
+    pages are still being retrieved. An error for one URL does not stop the other URLs from
+    being processed.
+
+    :param urls: The URLs of the posts to generate reply context for.
+    :type urls: Iterable[str]
+    :param summary_word_limit: The maximum number of words to include in each summary (default 75).
+    :type summary_word_limit: int
+    :param max_workers: The maximum number of URLs to process at once.
+    :type max_workers: int
+    :param max_per_host: The maximum number of pages on one host to retrieve at once.
+    :type max_per_host: int
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
+    :param deadline: The number of seconds in which the author page and favicon of each page must be retrieved.
+    :type deadline: float
+    :param icon_cache: The cache in which to store the icon of each site for a day (optional).
+        If None, icons are stored in memory and shared by every reply context.
+    :type icon_cache: Cache
+    :return: One ReplyContextResult per unique URL, in the order in which they complete.
+    :rtype: Iterator[ReplyContextResult]
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        urls = [
+            "https://jamesg.blog/2022/01/28/integrated-indieweb-services/",
+            "https://aaronparecki.com/2022/01/29/12/raspi-usb-webcam-hdmi",
+        ]
+
+        for result in indieweb_utils.get_reply_contexts(urls):
+            if result.error is None:
+                print(result.url, result.context.name)
+    """
+    unique_urls = list(dict.fromkeys(urls))
+
+    if not unique_urls:
+        return
+
+    limiter = HostLimiter(max_per_host)
+    cache = MemoryCache()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_urls))) as executor:
+        futures = [
+            executor.submit(
+                _get_limited_reply_context, url, summary_word_limit, limiter, client, deadline, cache, icon_cache
+            )
+            for url in unique_urls
+        ]
+
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # if the caller stops early, URLs that have not been started are not processed
+            for future in futures:
+                future.cancel()
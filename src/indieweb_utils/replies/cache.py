@@ -0,0 +1,179 @@
+import dataclasses
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set
+
+import requests
+
+from ..network.cache import Cache
+from ..network.client import HTTPClient
+from .context import (
+    DEFAULT_SUBREQUEST_DEADLINE,
+    PostAuthor,
+    ReplyContext,
+    _fetch_reply_context_page,
+    _generate_reply_context,
+)
+
+DEFAULT_FRESH_TTL = 60 * 60
+DEFAULT_STALE_TTL = 7 * 24 * 60 * 60
+
+
+def _serialize_reply_context(context: ReplyContext) -> Dict[str, Any]:
+    return dataclasses.asdict(context)
+
+
+def _deserialize_reply_context(data: Dict[str, Any]) -> ReplyContext:
+    return ReplyContext(**{**data, "authors": [PostAuthor(**author) for author in data.get("authors", [])]})
+
+
+class ReplyContextCache:
+    """
+    Serve reply contexts from a cache, refreshing them in the background when they get old.
+
+    A reply context is fresh for `ttl` seconds after it was generated, and is returned from the
+    cache without making any request. After that, it is stale: it is still returned straight
+    away, and a background thread checks whether the page has changed. The check is a
+    conditional request (with the ETag and Last-Modified values of the page), so a page that
+    has not changed is not downloaded again. A reply context that has been stale for longer
+    than `stale_ttl` seconds is generated again before it is returned.
+
+    Reply contexts are stored as dictionaries that can be serialized to JSON, so any Cache can be used, including
+    a FileCache that keeps reply contexts between runs.
+
+    :param cache: The cache in which to store reply contexts, and the icon of each site.
+    :type cache: Cache
+    :param ttl: The number of seconds for which a reply context is fresh.
+    :type ttl: float
+    :param stale_ttl: The number of seconds after it stops being fresh for which a reply context may still be used.
+    :type stale_ttl: float
+    :param summary_word_limit: The maximum number of words to include in each summary (default 75).
+    :type summary_word_limit: int
+    :param max_workers: The maximum number of reply contexts to refresh in the background at once.
+    :type max_workers: int
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
+    :param deadline: The number of seconds in which the author page and favicon of a page must be retrieved.
+    :type deadline: float
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+        from indieweb_utils.network import FileCache
+
+        contexts = indieweb_utils.ReplyContextCache(FileCache("reply_contexts.json"))
+
+        context = contexts.get_reply_context("https://jamesg.blog/2022/01/28/integrated-indieweb-services/")
+
+        print(context.name)
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        ttl: float = DEFAULT_FRESH_TTL,
+        stale_ttl: float = DEFAULT_STALE_TTL,
+        summary_word_limit: int = 75,
+        max_workers: int = 4,
+        client: Optional[HTTPClient] = None,
+        deadline: float = DEFAULT_SUBREQUEST_DEADLINE,
+    ) -> None:
+        self.cache = cache
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.summary_word_limit = summary_word_limit
+        self.client = client
+        self.deadline = deadline
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._revalidating: Set[str] = set()
+
+    def _store(self, url: str, response: requests.Response, context: ReplyContext) -> None:
+        entry = {
+            "context": _serialize_reply_context(context),
+            "generated": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+        self.cache.set(f"reply-context:{url}", entry, self.ttl + self.stale_ttl)
+
+    def _generate(
+        self, url: str, headers: Optional[Dict[str, str]] = None, entry: Optional[dict] = None
+    ) -> ReplyContext:
+        response = _fetch_reply_context_page(url, self.client, headers)
+
+        # the page has not changed, so the cached reply context is fresh again
+        if response.status_code == 304 and entry is not None:
+            entry = {**entry, "generated": time.time()}
+            self.cache.set(f"reply-context:{url}", entry, self.ttl + self.stale_ttl)
+
+            return _deserialize_reply_context(entry["context"])
+
+        # the icon of each site is stored in the same cache as reply contexts
+        context = _generate_reply_context(
+            url, response, self.summary_word_limit, self.client, self.deadline, icon_cache=self.cache
+        )
+
+        self._store(url, response, context)
+
+        return context
+
+    def _revalidate(self, url: str, entry: dict) -> None:
+        headers = {}
+
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            self._generate(url, headers, entry)
+        except Exception:
+            # the stale reply context is kept, and is revalidated again the next time it is requested
+            pass
+        finally:
+            with self._lock:
+                self._revalidating.discard(url)
+
+    def get_reply_context(self, url: str) -> ReplyContext:
+        """
+        Return the reply context of a URL, from the cache if possible.
+
+        :param url: The URL of the post to generate reply context for.
+        :type url: str
+        :return: A ReplyContext object with information about the specified web page.
+        :rtype: ReplyContext
+
+        :raises ReplyContextRetrievalError: The reply context is not cached and cannot be retrieved.
+        :raises UnsupportedScheme: The specified URL does not use http:// or https://.
+        """
+        entry = self.cache.get(f"reply-context:{url}")
+
+        if entry is None or time.time() - entry["generated"] > self.ttl + self.stale_ttl:
+            return self._generate(url)
+
+        if time.time() - entry["generated"] > self.ttl:
+            with self._lock:
+                # only one refresh of a URL is made at a time
+                start = url not in self._revalidating
+                self._revalidating.add(url)
+
+            if start:
+                self._executor.submit(self._revalidate, url, entry)
+
+        return _deserialize_reply_context(entry["context"])
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop refreshing reply contexts in the background.
+
+        :param wait: Wait for refreshes that have started to finish.
+        :type wait: bool
+        """
+        self._executor.shutdown(wait=wait)
@@ -1,21 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib import parse as url_parse
 
 import mf2py
 import requests
 from bs4 import BeautifulSoup
 
-from ..parsing.parse import get_soup
+from ..network.cache import Cache, MemoryCache
+from ..network.client import HTTPClient, _get_client
 from ..utils.urls import _is_http_url, canonicalize_url
 from ..webmentions.discovery import (
+    _WEBMENTION,
     LocalhostEndpointFound,
     TargetNotProvided,
     UnacceptableIPAddress,
     WebmentionEndpointNotFound,
-    discover_webmention_endpoint,
+    _parse_endpoints,
+    _process_webmention_endpoint,
+)
+
+# the number of seconds in which the author page and favicon of a page must be retrieved
+DEFAULT_SUBREQUEST_DEADLINE = 10
+
+# icons are shared by every page on a site, so whether an icon exists is only checked once a day
+DEFAULT_ICON_TTL = 24 * 60 * 60
+
+# status codes returned by servers that do not support HEAD requests
+_HEAD_NOT_SUPPORTED = (403, 405, 501)
+
+# the icon of each site, shared by every reply context that is not given an icon cache
+_default_icon_cache = MemoryCache()
+
+_WEBMENTION_ENDPOINT_ERRORS = (
+    TargetNotProvided,
+    WebmentionEndpointNotFound,
+    UnacceptableIPAddress,
+    LocalhostEndpointFound,
 )
-from ..constants import USER_AGENT
 
 
 @dataclass
@@ -69,7 +91,36 @@ def _get_author_properties(author_url: str, h_entry: dict) -> Tuple[str, str, st
     return author_url, author_name, author_image
 
 
-def _process_h_entry_author(h_entry: dict, url: str, domain: str) -> Tuple[str, str, str]:
+def _get_author_page_url(h_entry: dict, url: str, domain: str) -> Optional[str]:
+    """
+    Return the URL of the author page to retrieve for a h-entry whose author is a URL, if any.
+
+    If the author is a name rather than a URL, the page itself is returned.
+    """
+    if not h_entry["properties"].get("author") or not isinstance(h_entry["properties"]["author"][0], str):
+        return None
+
+    author = h_entry["properties"]["author"][0]
+
+    if author.startswith("/"):
+        return url_parse.urlsplit(url).scheme + "://" + domain + author
+
+    if url_parse.urlsplit(author).scheme in ("http", "https"):
+        return author
+
+    return url
+
+
+def _get_author_page(author_url: str, client: Optional[HTTPClient] = None, timeout: float = 10) -> Optional[str]:
+    try:
+        return _get_client(client).get(author_url, timeout=timeout, verify=False).text
+    except requests.exceptions.RequestException:
+        return None
+
+
+def _process_h_entry_author(
+    h_entry: dict, url: str, domain: str, author_page_html: Optional[str] = None
+) -> Tuple[str, str, str]:
     parsed_url = url_parse.urlsplit(url)
 
     author_url = url
@@ -84,16 +135,15 @@ def _process_h_entry_author(h_entry: dict, url: str, domain: str) -> Tuple[str,
         author_url, author_name, author_image = _get_author_properties(author_url, h_card)
 
     elif isinstance(h_entry["properties"]["author"][0], str):
-        if h_entry["properties"]["author"][0].startswith("/"):
-            author_url = parsed_url.scheme + "://" + domain + h_entry["properties"].get("author")[0]
+        author_url = _get_author_page_url(h_entry, url, domain)
 
-        try:
-            author = mf2py.parse(requests.get(author_url, headers={"User-Agent": USER_AGENT}, timeout=10, verify=False).text)
-        except requests.exceptions.RequestException:
-            pass
-        else:
-            h_card = [item for item in author["items"] if item.get("type", []) == ["h-card"]][0]
-            author_url, author_name, author_image = _get_author_properties(author_url, h_card)
+        if author_page_html is not None:
+            author = mf2py.parse(author_page_html)
+
+            h_cards = [item for item in author["items"] if item.get("type", []) == ["h-card"]]
+
+            if h_cards:
+                author_url, author_name, author_image = _get_author_properties(author_url, h_cards[0])
 
     if author_url is not None and author_url.startswith("/"):
         author_url = parsed_url.scheme + "://" + domain + author_url
@@ -104,24 +154,30 @@ def _process_h_entry_author(h_entry: dict, url: str, domain: str) -> Tuple[str,
     return author_url, author_image, author_name
 
 
-def _process_post_contents(h_entry: dict, domain: str, author_image: str, summary_word_limit: int) -> Tuple[str, str]:
-    if h_entry["properties"].get("content") and h_entry["properties"].get("content")[0].get("html"):
-        post_body = h_entry["properties"]["content"][0]["html"]
-        soup = BeautifulSoup(post_body, "html.parser")
-        post_body = soup.text
+def _has_html_content(h_entry: dict) -> bool:
+    return bool(h_entry["properties"].get("content") and h_entry["properties"].get("content")[0].get("html"))
 
-        favicon = soup.find("link", rel="icon")
 
-        if not favicon:
-            favicon = soup.find("link", rel="shortcut icon")
+def _find_post_content_favicon(h_entry: dict) -> Optional[str]:
+    """
+    Return the favicon URL referenced in the HTML content of a h-entry, if any.
+    """
+    if not _has_html_content(h_entry):
+        return None
 
-        new_photo_url = ""
+    return _find_favicon(BeautifulSoup(h_entry["properties"]["content"][0]["html"], "html.parser"))
 
-        if favicon:
-            new_photo_url = _get_favicon(favicon["href"], domain)
 
-        if not author_image and new_photo_url:
-            author_image = new_photo_url
+def _process_post_contents(
+    h_entry: dict, author_image: str, summary_word_limit: int, favicon_url: str = ""
+) -> Tuple[str, str]:
+    if _has_html_content(h_entry):
+        post_body = h_entry["properties"]["content"][0]["html"]
+        soup = BeautifulSoup(post_body, "html.parser")
+        post_body = soup.text
+
+        if not author_image and favicon_url:
+            author_image = favicon_url
 
         post_body = " ".join(post_body.split(" ")[:summary_word_limit]) + " ..."
     elif h_entry["properties"].get("content"):
@@ -140,6 +196,8 @@ def _generate_h_entry_reply_context(
     domain: str,
     webmention_endpoint_url: str,
     summary_word_limit: int,
+    author_page_html: Optional[str] = None,
+    favicon_url: str = "",
 ) -> ReplyContext:
     p_name = ""
     post_body = ""
@@ -148,9 +206,9 @@ def _generate_h_entry_reply_context(
     author_url = ""
 
     if h_entry["properties"].get("author"):
-        author_url, author_image, author_name = _process_h_entry_author(h_entry, url, domain)
+        author_url, author_image, author_name = _process_h_entry_author(h_entry, url, domain, author_page_html)
 
-    author_image, post_body = _process_post_contents(h_entry, domain, author_image, summary_word_limit)
+    author_image, post_body = _process_post_contents(h_entry, author_image, summary_word_limit, favicon_url)
 
     if h_entry["properties"].get("name"):
         p_name = h_entry["properties"]["name"][0]
@@ -274,34 +332,149 @@ def _get_featured_image(soup: BeautifulSoup, domain: str) -> str:
     return post_photo_url
 
 
-def _get_favicon(photo_url: str, domain: str) -> str:
+def _find_favicon(soup: BeautifulSoup) -> Optional[str]:
+    favicon = soup.find("link", rel="icon")
+
+    if not favicon:
+        favicon = soup.find("link", rel="shortcut icon")
+
+    if not favicon:
+        return None
+
+    return favicon["href"]
+
+
+def _get_favicon_url(photo_url: str, domain: str) -> str:
     if not _is_http_url(photo_url):
         photo_url = "https://" + domain + photo_url
 
-    try:
-        r = requests.get(photo_url, headers={"User-Agent": USER_AGENT}, timeout=10, verify=False)
+    return photo_url
 
-        if r.status_code != 200:
-            photo_url = ""
-    except requests.exceptions.RequestException:
-        photo_url = ""
 
-    return photo_url
+def _check_icon(photo_url: str, client: Optional[HTTPClient], timeout: float) -> bool:
+    """
+    Check whether an icon exists without downloading it.
+
+    A HEAD request is made first. If the server does not support HEAD requests, only the first
+    byte of the icon is requested.
+    """
+    http = _get_client(client)
+
+    r = http.head(photo_url, timeout=timeout, verify=False, allow_redirects=True)
+
+    if r.status_code not in _HEAD_NOT_SUPPORTED:
+        return r.status_code == 200
+
+    # the body is never read, so the icon is not downloaded even if the Range header is ignored
+    with http.get(photo_url, headers={"Range": "bytes=0-0"}, timeout=timeout, verify=False, stream=True) as r:
+        return r.status_code in (200, 206)
+
+
+def _get_icon_cache(icon_cache: Optional[Cache]) -> Cache:
+    return _default_icon_cache if icon_cache is None else icon_cache
+
+
+def _get_icon_cache_key(domain: str) -> str:
+    # every page on a site shares an icon, so the icon is stored once per site
+    return f"icon:{domain}"
+
+
+def _get_favicon(
+    photo_url: str,
+    domain: str,
+    client: Optional[HTTPClient] = None,
+    timeout: float = 10,
+    icon_cache: Optional[Cache] = None,
+) -> str:
+    cache = _get_icon_cache(icon_cache)
+    key = _get_icon_cache_key(domain)
+
+    # the URL of the icon, or "" if the site has no icon
+    icon = cache.get(key)
+
+    if icon is None:
+        photo_url = _get_favicon_url(photo_url, domain)
+
+        try:
+            exists = _check_icon(photo_url, client, timeout)
+        except requests.exceptions.RequestException:
+            # the icon may be available next time, so a failed check is not cached
+            return ""
+
+        icon = photo_url if exists else ""
+
+        cache.set(key, icon, DEFAULT_ICON_TTL)
+
+    return icon
+
+
+def _cached_fetch(cache: Optional[Cache], key: str, fetch: Callable) -> Any:
+    if cache is None:
+        return fetch()
+
+    value = cache.get(key)
+
+    if value is None:
+        value = fetch()
+
+        if value is not None:
+            cache.set(key, value)
+
+    return value
+
+
+def _get_author_page_and_favicon(
+    author_page_url: Optional[str],
+    favicon_href: Optional[str],
+    domain: str,
+    client: Optional[HTTPClient],
+    deadline: float,
+    cache: Optional[Cache] = None,
+    icon_cache: Optional[Cache] = None,
+) -> Tuple[Optional[str], str]:
+    """
+    Retrieve the author page and the favicon of a page at the same time.
+
+    A retrieval that has not finished by the deadline is treated as if it had failed. If a cache
+    is provided, author pages are only retrieved once per URL.
+    """
+    fetches: Dict[str, Callable] = {}
+
+    if author_page_url:
+        fetches["author"] = lambda: _cached_fetch(
+            cache,
+            f"reply-context:author:{author_page_url}",
+            lambda: _get_author_page(author_page_url, client, deadline),
+        )
+
+    if favicon_href:
+        # the icon of a site is cached for every reply context, not only for this batch
+        fetches["favicon"] = lambda: _get_favicon(favicon_href, domain, client, deadline, icon_cache)
+
+    if not fetches:
+        return None, ""
+
+    # the timeout of a request applies to each read, so the deadline is enforced here
+    executor = ThreadPoolExecutor(max_workers=len(fetches))
+    futures = {name: executor.submit(fetch) for name, fetch in fetches.items()}
+
+    wait(futures.values(), timeout=deadline)
+
+    # a request that is still running finishes in the background, and its result is discarded
+    executor.shutdown(wait=False)
+
+    results = {name: future.result() for name, future in futures.items() if future.done()}
+
+    return results.get("author"), results.get("favicon") or ""
 
 
 def _generate_reply_context_from_main_page(
-    url: str,
-    http_headers: dict,
+    soup: BeautifulSoup,
     domain: str,
     webmention_endpoint_url: str,
     summary_word_limit: int,
-    html: str = "",
-    soup: BeautifulSoup = None,
+    favicon_url: str = "",
 ) -> ReplyContext:
-
-    if soup is None:
-        soup = get_soup(html, url, headers=http_headers)
-
     page_title = soup.find("title")
 
     meta_description = ""
@@ -330,16 +503,6 @@ def _generate_reply_context_from_main_page(
 
     video_url = _get_featured_video(soup, domain)
 
-    favicon = soup.find("link", rel="icon")
-
-    if not favicon:
-        favicon = soup.find("link", rel="shortcut icon")
-
-    photo_url = ""
-
-    if favicon:
-        photo_url = _get_favicon(favicon["href"], domain)
-
     if not _is_http_url(domain):
         author_url = "https://" + domain
 
@@ -349,7 +512,7 @@ def _generate_reply_context_from_main_page(
         name=page_title,
         post_text=p_tag,
         post_html=p_tag,
-        authors=[PostAuthor(url=author_url, name="", photo=photo_url)],
+        authors=[PostAuthor(url=author_url, name="", photo=favicon_url)],
         photo=post_photo_url,
         video=video_url,
         webmention_endpoint=webmention_endpoint_url,
@@ -357,14 +520,31 @@ def _generate_reply_context_from_main_page(
     )
 
 
-def get_reply_context(url: str, summary_word_limit: int = 75) -> ReplyContext:
+def get_reply_context(
+    url: str,
+    summary_word_limit: int = 75,
+    client: Optional[HTTPClient] = None,
+    deadline: float = DEFAULT_SUBREQUEST_DEADLINE,
+    icon_cache: Optional[Cache] = None,
+) -> ReplyContext:
     """
     Generate reply context for use on your website based on a URL.
 
+    The webmention endpoint is read from the page that is retrieved to generate the reply context,
+    and the author page and favicon of the page are retrieved at the same time.
+
     :param url: The URL of the post to generate reply context for.
     :type url: str
     :param summary_word_limit: The maximum number of words to include in the summary (default 75).
     :type summary_word_limit: int
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
+    :param deadline: The number of seconds in which the author page and favicon must be retrieved
+        (default 10). If they are not retrieved in time, the reply context is generated without them.
+    :type deadline: float
+    :param icon_cache: The cache in which to store the icon of each site for a day (optional).
+        If None, icons are stored in memory and shared by every reply context.
+    :type icon_cache: Cache
     :return: A ReplyContext object with information about the specified web page.
     :rtype: ReplyContext
 
@@ -385,46 +565,109 @@ def get_reply_context(url: str, summary_word_limit: int = 75) -> ReplyContext:
     :raises ReplyContextRetrievalError: Reply context cannot be retrieved.
     :raises UnsupportedScheme: The specified URL does not use http:// or https://.
     """
+    return _get_reply_context(url, summary_word_limit, client, deadline, icon_cache=icon_cache)
 
+
+def _fetch_reply_context_page(
+    url: str, client: Optional[HTTPClient], headers: Optional[Dict[str, str]] = None
+) -> requests.Response:
     parsed_url = url_parse.urlsplit(url)
-    http_headers = {"Accept": "text/html", "User-Agent": USER_AGENT}
+    http_headers = {"Accept": "text/html", **(headers or {})}
 
     if parsed_url.scheme not in ["http", "https"]:
         raise UnsupportedScheme(f"{parsed_url.scheme} is not supported.")
 
     try:
-        page_content = requests.get(url, timeout=10, verify=False, headers=http_headers)
+        return _get_client(client).get(url, timeout=10, verify=False, headers=http_headers)
     except requests.exceptions.RequestException:
         raise ReplyContextRetrievalError("Could not retrieve page content.")
 
+
+def _get_reply_context(
+    url: str,
+    summary_word_limit: int,
+    client: Optional[HTTPClient],
+    deadline: float,
+    cache: Optional[Cache] = None,
+    icon_cache: Optional[Cache] = None,
+) -> ReplyContext:
+    page_content = _fetch_reply_context_page(url, client)
+
+    return _generate_reply_context(url, page_content, summary_word_limit, client, deadline, cache, icon_cache)
+
+
+def _generate_reply_context(
+    url: str,
+    page_content: requests.Response,
+    summary_word_limit: int,
+    client: Optional[HTTPClient],
+    deadline: float,
+    cache: Optional[Cache] = None,
+    icon_cache: Optional[Cache] = None,
+) -> ReplyContext:
+    """
+    Generate the reply context of a page that has been retrieved.
+    """
     if page_content.status_code != 200:
         raise ReplyContextRetrievalError(f"Page returned a {page_content.status_code} response.")
 
+    parsed_url = url_parse.urlsplit(url)
+    html = page_content.text
+
+    # the page has already been retrieved, so it is not retrieved again to discover its endpoint
     try:
-        webmention_endpoint_url_response = discover_webmention_endpoint(url)
-
-        webmention_endpoint_url = webmention_endpoint_url_response.endpoint
-    except (
-        TargetNotProvided,
-        WebmentionEndpointNotFound,
-        UnacceptableIPAddress,
-        LocalhostEndpointFound,
-    ):
+        endpoints = _parse_endpoints(url, page_content.headers, html, [_WEBMENTION])
+        webmention_endpoint_url = _process_webmention_endpoint(url, endpoints).endpoint
+    except _WEBMENTION_ENDPOINT_ERRORS:
         webmention_endpoint_url = ""
 
-    parsed = mf2py.parse(doc=page_content.text)
-
     domain = parsed_url.netloc
 
+    h_entry = _get_reply_context_h_entry(html)
+
+    if h_entry:
+        author_page_url = _get_author_page_url(h_entry, url, domain)
+
+        # the page itself has already been retrieved, so it is not retrieved again as the author page
+        author_page_html, favicon_url = _get_author_page_and_favicon(
+            author_page_url if author_page_url != url else None,
+            _find_post_content_favicon(h_entry),
+            domain,
+            client,
+            deadline,
+            cache,
+            icon_cache,
+        )
+
+        if author_page_url == url:
+            author_page_html = html
+
+        return _generate_h_entry_reply_context(
+            h_entry, url, domain, webmention_endpoint_url, summary_word_limit, author_page_html, favicon_url
+        )
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    _, favicon_url = _get_author_page_and_favicon(
+        None, _find_favicon(soup), domain, client, deadline, cache, icon_cache
+    )
+
+    return _generate_reply_context_from_main_page(
+        soup, domain, webmention_endpoint_url, summary_word_limit, favicon_url
+    )
+
+
+def _get_reply_context_h_entry(html: str) -> Optional[dict]:
+    """
+    Return the h-entry to use for a reply context, if the page is marked up with a named h-entry.
+    """
+    parsed = mf2py.parse(doc=html)
+
     if (
         parsed["items"]
         and parsed["items"][0]["type"] == ["h-entry"]
         and "name" in parsed["items"][0].get("properties", {})
     ):
-        h_entry = parsed["items"][0]
-
-        return _generate_h_entry_reply_context(h_entry, url, domain, webmention_endpoint_url, summary_word_limit)
+        return parsed["items"][0]
 
-    return _generate_reply_context_from_main_page(
-        url, http_headers, domain, webmention_endpoint_url, summary_word_limit
-    )
+    return None
@@ -1,10 +1,10 @@
+from typing import Optional
 from urllib.parse import urlparse
 
-import requests
 from bs4 import BeautifulSoup
 
+from ..network.client import HTTPClient, _get_client
 from ..utils.urls import canonicalize_url
-from ..constants import USER_AGENT
 
 class InvalidStatusCodeError(Exception):
     """Raised when the server returns an invalid status code."""
@@ -12,11 +12,12 @@ class InvalidStatusCodeError(Exception):
     pass
 
 
-def rsd_discovery(url: str, attribute: str):
+def rsd_discovery(url: str, attribute: str, client: Optional[HTTPClient] = None):
     """Discover an RSD attribute from a URL.
 
     :param url: The URL to discover the RSD attribute from.
     :param attribute: The attribute to discover.
+    :param client: The HTTP client to use for requests (optional).
     :returns: The value of the attribute.
 
     Example:
@@ -29,7 +30,9 @@ def rsd_discovery(url: str, attribute: str):
         rsd_discovery('http://example.com', 'trackback:ping')
     """
 
-    get_rsd_request = requests.get(url, headers={"User-Agent": USER_AGENT})
+    client = _get_client(client)
+
+    get_rsd_request = client.get(url)
 
     if get_rsd_request.status_code != 200:
         raise InvalidStatusCodeError("The server returned a status code of {}.".format(get_rsd_request.status_code))
@@ -41,7 +44,7 @@ def rsd_discovery(url: str, attribute: str):
     if not rsd:
         return ""
 
-    get_rsd_request = requests.get(rsd.get("href"), headers={"User-Agent": USER_AGENT})
+    get_rsd_request = client.get(rsd.get("href"))
 
     if get_rsd_request.status_code != 200:
         raise InvalidStatusCodeError("The server returned a status code of {}.".format(get_rsd_request.status_code))
@@ -1,11 +1,12 @@
+from typing import Optional
 from urllib.parse import urlparse
 
 import requests
 from bs4 import BeautifulSoup, Comment
 
+from ..network.client import HTTPClient, _get_client
 from ..rsd.discover import rsd_discovery
 from ..utils.urls import canonicalize_url
-from ..constants import USER_AGENT
 
 class TrackbackError(Exception):
     """Base class for trackback errors."""
@@ -25,11 +26,12 @@ class InvalidStatusCodeError(TrackbackError):
     pass
 
 
-def rsd_trackback_discovery(url: str) -> str:
+def rsd_trackback_discovery(url: str, client: Optional[HTTPClient] = None) -> str:
     """
     Discover the trackback URL from a URL using RSD.
 
     :param url: The URL to discover the trackback URL from.
+    :param client: The HTTP client to use for requests (optional).
     :returns: The trackback URL.
 
     Example:
@@ -40,14 +42,15 @@ def rsd_trackback_discovery(url: str) -> str:
 
         rsd_trackback_discovery('http://example.com/post/123')
     """
-    return rsd_discovery(url, "trackback:ping")
+    return rsd_discovery(url, "trackback:ping", client=client)
 
 
-def discover_trackback_url(url: str) -> str:
+def discover_trackback_url(url: str, client: Optional[HTTPClient] = None) -> str:
     """
     Discover the trackback URL from a URL.
 
     :param url: The URL to discover the trackback URL from.
+    :param client: The HTTP client to use for requests (optional).
     :returns: The trackback URL.
 
     Example:
@@ -59,7 +62,7 @@ def discover_trackback_url(url: str) -> str:
         discover_trackback_url('http://example.com/post/123')
     """
 
-    get_trackback_url_request = requests.get(url, headers={"User-Agent": USER_AGENT})
+    get_trackback_url_request = _get_client(client).get(url)
 
     if get_trackback_url_request.status_code != 200:
         raise InvalidStatusCodeError(
@@ -88,7 +91,7 @@ def discover_trackback_url(url: str) -> str:
 
         return canonicalize_url(trackback_url, domain)
 
-    trackback_url = rsd_trackback_discovery(url)
+    trackback_url = rsd_trackback_discovery(url, client=client)
 
     if trackback_url:
         return trackback_url
@@ -96,7 +99,14 @@ def discover_trackback_url(url: str) -> str:
     return ""
 
 
-def send_trackback(target_url, source_url, title: str = None, excerpt: str = None, blog_name: str = None) -> None:
+def send_trackback(
+    target_url,
+    source_url,
+    title: str = None,
+    excerpt: str = None,
+    blog_name: str = None,
+    client: Optional[HTTPClient] = None,
+) -> None:
     """
     Send a trackback to a URL.
 
@@ -105,6 +115,7 @@ def send_trackback(target_url, source_url, title: str = None, excerpt: str = Non
     :param title: The title of your post.
     :param excerpt: An excerpt of your post.
     :param blog_name: The name of your blog.
+    :param client: The HTTP client to use for requests (optional).
     :returns: The status code and message from the server.
 
     :raises ConnectionError: Raised when a connection error occurs.
@@ -126,10 +137,10 @@ def send_trackback(target_url, source_url, title: str = None, excerpt: str = Non
         )
     """
 
-    endpoint_url = discover_trackback_url(target_url)
+    endpoint_url = discover_trackback_url(target_url, client=client)
 
     try:
-        send_trackback_request = requests.post(
+        send_trackback_request = _get_client(client).post(
             endpoint_url,
             data={"url": source_url, "title": title, "excerpt": excerpt, "blog_name": blog_name},
             headers={
@@ -2,13 +2,13 @@ from indieweb_utils.webmentions.discovery import discover_endpoints, _find_links
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-from ..constants import USER_AGENT
+from ..network.client import _get_client
 
 
-def discover_edit_links(url: str, request: requests.Response = None):
+def discover_edit_links(url: str, request: requests.Response = None, client=None):
     if not request:
         try:
-            request = requests.get(url, headers={"User-Agent": USER_AGENT, "timeout": "5"})
+            request = _get_client(client).get(url, timeout=5)
         except requests.exceptions.RequestException:
             raise Exception("Could not connect to the specified URL.")
 
@@ -8,6 +8,9 @@ import requests
 import base64
 import random
 import datetime
+from typing import Optional
+
+from ..network.client import HTTPClient, _get_client
 
 
 class HTTPSignatureKeyResolver(HTTPSignatureKeyResolver):
@@ -25,7 +28,11 @@ class HTTPSignatureKeyResolver(HTTPSignatureKeyResolver):
 
 
 def signed_web_bot_auth_request(
-    url: str, signature_agent: str, key_id: str, signature_key_resolver: HTTPSignatureKeyResolver
+    url: str,
+    signature_agent: str,
+    key_id: str,
+    signature_key_resolver: HTTPSignatureKeyResolver,
+    client: Optional[HTTPClient] = None,
 ) -> requests.Response:
     """
     Make a signed request using the Web Bot Auth protocol.
@@ -36,6 +43,7 @@ def signed_web_bot_auth_request(
     :param signature_agent: The signature agent to use.
     :param key_id: The key ID to use for signing.
     :param key_resolver: The key resolver to use for signing.
+    :param client: The HTTP client to send the request with (optional).
     :return: The response from the request.
 
     .. code-block:: python
@@ -66,6 +74,7 @@ def signed_web_bot_auth_request(
 
     verifier = HTTPMessageVerifier(signature_algorithm=algorithms.ED25519, key_resolver=signature_key_resolver)
     if verifier.verify(request):
-        response = requests.Session().send(request)
+        client = _get_client(client)
+        response = client.session.send(request, timeout=client.timeout)
 
     return response
@@ -1,11 +1,36 @@
-from .discovery import discover_endpoints, discover_webmention_endpoint
-from .send import SendWebmentionResponse, send_webmention
-from .validate import validate_webmention
+from .coalesce import WebmentionCoalescer
+from .discovery import (
+    WebmentionTargetUnavailable,
+    discover_endpoints,
+    discover_webmention_endpoint,
+)
+from .outbox import OutgoingWebmention, WebmentionOutbox, WebmentionOutboxResult
+from .queue import QueuedWebmention, WebmentionQueue, WebmentionQueueResult
+from .send import (
+    BulkWebmentionResult,
+    SendWebmentionResponse,
+    WebmentionEndpointUnavailable,
+    send_webmention,
+    send_webmentions,
+)
+from .validate import WebmentionSourceUnavailable, validate_webmention
 
 __all__ = [
     "send_webmention",
+    "send_webmentions",
+    "BulkWebmentionResult",
     "validate_webmention",
     "discover_webmention_endpoint",
     "SendWebmentionResponse",
     "discover_endpoints",
+    "WebmentionQueue",
+    "WebmentionQueueResult",
+    "QueuedWebmention",
+    "WebmentionSourceUnavailable",
+    "WebmentionOutbox",
+    "WebmentionOutboxResult",
+    "OutgoingWebmention",
+    "WebmentionEndpointUnavailable",
+    "WebmentionTargetUnavailable",
+    "WebmentionCoalescer",
 ]
@@ -0,0 +1,177 @@
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..network.cache import DEFAULT_MAX_ENTRIES, MemoryCache
+from .validate import (
+    WebmentionCheckResponse,
+    WebmentionSourceUnavailable,
+    validate_webmention,
+)
+
+DEFAULT_COALESCE_WINDOW = 60
+
+
+def _copy_error(error: Exception) -> Exception:
+    # each caller raises its own copy, so the frames of other callers and threads are not added
+    # to the traceback of the shared exception
+    try:
+        return copy.copy(error)
+    except Exception:
+        return error
+
+
+def _get_argument_key(value: Any) -> str:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_get_argument_key(item) for item in value) + "]"
+
+    # other objects, such as clients, are compared by identity
+    return f"<{type(value).__name__} {id(value)}>"
+
+
+def _get_key(source: str, target: str, kwargs: Dict[str, Any]) -> Optional[str]:
+    """
+    Return the key under which the result of a validation is shared, or None if it cannot be shared.
+
+    Every argument can change the outcome of a validation, so only calls with the same arguments share a result.
+    """
+    # a source that was retrieved by the caller is specific to that call
+    if kwargs.get("target_request") is not None:
+        return None
+
+    arguments = " ".join(f"{name}={_get_argument_key(value)}" for name, value in sorted(kwargs.items()))
+
+    return f"webmention-validation:{source} {target} {arguments}"
+
+
+def _get_recent_result(
+    recent: Tuple[Optional[WebmentionCheckResponse], Optional[Exception]]
+) -> Optional[WebmentionCheckResponse]:
+    response, error = recent
+
+    if error is not None:
+        raise _copy_error(error) from error
+
+    return response
+
+
+def _wait_for_result(future: Future) -> WebmentionCheckResponse:
+    try:
+        return future.result()
+    except Exception as e:
+        raise _copy_error(e) from e
+
+
+class WebmentionCoalescer:
+    """
+    Validate each (source, target) pair at most once at a time, and reuse recent results.
+
+    If a webmention is validated while the same webmention is already being validated in
+    another thread, the second call waits for the first one and returns its result, so the
+    source is only retrieved once. A result is then reused for `window` seconds, so a sender
+    that sends the same webmention on every edit of a post does not cause the source to be
+    retrieved on every edit.
+
+    Invalid webmentions are remembered too, except when the source could not be retrieved for
+    a reason that may be temporary (see `WebmentionSourceUnavailable`).
+
+    A coalescer can be passed to a WebmentionQueue as its `validator`.
+
+    :param window: The number of seconds for which a result is reused. If 0, results are
+        only shared between calls that are made at the same time.
+    :type window: float
+    :param validator: The function used to validate webmentions (default: `validate_webmention()`).
+    :type validator: Callable
+    :param max_entries: The maximum number of results to remember.
+    :type max_entries: int
+
+    Example:
+
+    .. code-block:: python
+
+        from indieweb_utils.webmentions.coalesce import WebmentionCoalescer
+
+        coalescer = WebmentionCoalescer(window=300)
+
+        # the source is only retrieved once
+        coalescer.validate_webmention("https://example.com/reply", "https://jamesg.blog/post")
+        coalescer.validate_webmention("https://example.com/reply", "https://jamesg.blog/post")
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_COALESCE_WINDOW,
+        validator: Callable[..., WebmentionCheckResponse] = validate_webmention,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.window = window
+        self.validator = validator
+
+        self._results = MemoryCache(max_entries=max_entries)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def validate_webmention(self, source: str, target: str, **kwargs: Any) -> WebmentionCheckResponse:
+        """
+        Validate a webmention, or return the result of a recent or in-progress validation of the same webmention.
+
+        Accepts the same arguments as `validate_webmention()`. Only validations with the same arguments
+        share a result. Calls with a `target_request` are never shared.
+
+        :param source: The source URL of the webmention.
+        :type source: str
+        :param target: The target URL of the webmention.
+        :type target: str
+        :return: The result of the validation.
+        :rtype: WebmentionCheckResponse
+
+        :raises WebmentionValidationError: Webmention is invalid.
+        :raises WebmentionIsGone: Webmention source returns a 410 Gone code.
+        """
+        key = _get_key(source, target, kwargs)
+
+        if key is None:
+            return self.validator(source, target, **kwargs)
+
+        with self._lock:
+            recent: Optional[Tuple[Optional[WebmentionCheckResponse], Optional[Exception]]] = self._results.get(key)
+
+            if recent is None:
+                future = self._in_flight.get(key)
+                is_leader = future is None
+
+                if is_leader:
+                    future = Future()
+                    self._in_flight[key] = future
+
+        if recent is not None:
+            return _get_recent_result(recent)
+
+        if not is_leader:
+            return _wait_for_result(future)
+
+        try:
+            response = self.validator(source, target, **kwargs)
+        except Exception as e:
+            with self._lock:
+                if self.window and not isinstance(e, WebmentionSourceUnavailable):
+                    self._results.set(key, (None, e), self.window)
+
+                del self._in_flight[key]
+
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if self.window:
+                self._results.set(key, (response, None), self.window)
+
+            del self._in_flight[key]
+
+        future.set_result(response)
+
+        return response
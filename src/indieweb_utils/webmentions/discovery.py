@@ -1,16 +1,24 @@
-import ipaddress
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from urllib import parse as url_parse
-from ..constants import USER_AGENT
 
 import requests
 from bs4 import BeautifulSoup
 
+from ..network.cache import Cache, get_cache_ttl
+from ..network.client import HTTPClient, _get_client, _get_retry_after
+from ..network.resolver import (
+    UnacceptableIPAddress,
+    _is_public_address,
+    _parse_ip_address,
+)
+from ..parsing.stream import find_head_links
 from ..utils.urls import _is_http_url, canonicalize_url
 
 _WEBMENTION = "webmention"  # TODO: Move this to a constants file
 
+DEFAULT_ENDPOINT_CACHE_TTL = 60 * 60 * 24
+
 
 @dataclass
 class WebmentionDiscoveryResponse:
@@ -25,24 +33,46 @@ class WebmentionEndpointNotFound(Exception):
     pass
 
 
-class UnacceptableIPAddress(Exception):
+class LocalhostEndpointFound(Exception):
+    pass
+
+
+class WebmentionTargetUnavailable(requests.exceptions.RequestException):
     """
-    Raised if an IP address for a webmention endpoint does not resolve on the public internet.
+    Raised when the target of a webmention returns a 5xx or 429 status code during discovery,
+    so discovery may succeed later.
 
-    Local, loopback, private, reserved, and multicast IP addresses are not acceptable.
+    `retry_after` is the number of seconds the target asked to wait before retrying
+    (from the Retry-After header), or None.
     """
 
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
 
-class LocalhostEndpointFound(Exception):
-    pass
+        self.status_code = status_code
+        self.retry_after = retry_after
 
 
-def discover_webmention_endpoint(target: str) -> WebmentionDiscoveryResponse:
+def discover_webmention_endpoint(
+    target: str, client: Optional[HTTPClient] = None, cache: Optional[Cache] = None, stream: bool = False
+) -> WebmentionDiscoveryResponse:
     """
     Return the webmention endpoint for the given target.
 
+    If a cache is provided, discovered endpoints are cached by target URL and by origin,
+    so discovery on other pages of a site does not make a request. Targets without an
+    endpoint are cached too. Values are cached for as long as the Cache-Control header
+    of the target allows, or for a day if the target does not specify a max-age. Only
+    targets that return a 2xx status code are cached.
+
     :param target: The target to discover the webmention endpoint for.
     :type target: str
+    :param client: The HTTP client to use for the request (optional).
+    :type client: HTTPClient
+    :param cache: The cache in which to store discovered endpoints (optional).
+    :type cache: Cache
+    :param stream: Only read the target until its <head> has been parsed. See `discover_endpoints()`.
+    :type stream: bool
     :return: The discovered webmention endpoint.
     :rtype: str
 
@@ -60,37 +90,107 @@ def discover_webmention_endpoint(target: str) -> WebmentionDiscoveryResponse:
 
     :raises TargetNotProvided: Target is not provided.
     :raises WebmentionEndpointNotFound: Webmention endpoint is not found.
+    :raises WebmentionTargetUnavailable: Target returned a 5xx or 429 status code.
     :raises UnacceptableIPAddress: Endpoint does not connect to an accepted IP.
     :raises LocalhostEndpointFound: Discovered endpoint is equal to localhost.
     """
     if not target:
         raise TargetNotProvided("No target provided.")
 
-    endpoints = discover_endpoints(target, [_WEBMENTION])
+    if cache is not None:
+        cached_endpoint = _get_cached_webmention_endpoint(target, cache)
+
+        if cached_endpoint is not None:
+            return cached_endpoint
+
+    endpoint_request = _get_page(target, client, stream)
+
+    try:
+        _check_target_status(endpoint_request.status_code, endpoint_request.headers)
+    except WebmentionTargetUnavailable:
+        endpoint_request.close()
+        raise
+
+    endpoints = _read_endpoints(target, endpoint_request, [_WEBMENTION], stream)
 
-    endpoint = endpoints.get("webmention", None)
+    if cache is None:
+        return _process_webmention_endpoint(target, endpoints)
+
+    return _cache_webmention_endpoint(target, endpoints, endpoint_request.status_code, endpoint_request.headers, cache)
+
+
+def _get_origin(url: str) -> str:
+    parsed_url = url_parse.urlsplit(url)
+
+    return f"{parsed_url.scheme}://{parsed_url.netloc.lower()}"
+
+
+def _get_cached_webmention_endpoint(target: str, cache: Cache) -> Optional[WebmentionDiscoveryResponse]:
+    """
+    Return the cached webmention endpoint for a target, or None if discovery is needed.
+    """
+    endpoint = cache.get(f"webmention:url:{target}")
+
+    if endpoint is None:
+        endpoint = cache.get(f"webmention:origin:{_get_origin(target)}")
 
     if endpoint is None:
+        return None
+
+    # an empty value records that the target has no endpoint
+    if endpoint == "":
         raise WebmentionEndpointNotFound("No webmention endpoint could be found for this resource.")
 
-    # verify if IP address is not allowed
+    return WebmentionDiscoveryResponse(endpoint=endpoint)
+
+
+def _check_target_status(status_code: int, headers) -> None:
+    """
+    Raise WebmentionTargetUnavailable if a target returned a status code that means it may be available later.
+    """
+    if status_code == 429 or status_code >= 500:
+        raise WebmentionTargetUnavailable(
+            f"The target returned a {status_code} status code.", status_code, _get_retry_after(headers)
+        )
+
+
+def _cache_webmention_endpoint(
+    target: str, endpoints: Dict[str, str], status_code: int, headers, cache: Cache
+) -> WebmentionDiscoveryResponse:
+    """
+    Validate the webmention endpoint discovered for a target and save the result in a cache.
+
+    Nothing is cached if the target returned a status code other than 2xx.
+    """
+    ttl = get_cache_ttl(headers, DEFAULT_ENDPOINT_CACHE_TTL) if 200 <= status_code < 300 else 0
+
     try:
-        endpoint_as_ip = ipaddress.ip_address(endpoint)
-
-        if (
-            endpoint.is_private is True
-            or endpoint.is_multicast is True
-            or endpoint_as_ip.is_loopback is True
-            or endpoint_as_ip.is_unspecified is True
-            or endpoint_as_ip.is_reserved is True
-            or endpoint_as_ip.is_link_local is True
-        ):
-            raise UnacceptableIPAddress("The endpoint does not connect to an accepted IP address.")
-    except ValueError:
-        pass
-
-    if endpoint == "localhost":
-        raise LocalhostEndpointFound("The endpoint is localhost.")
+        response = _process_webmention_endpoint(target, endpoints)
+    except WebmentionEndpointNotFound:
+        if ttl:
+            cache.set(f"webmention:url:{target}", "", ttl)
+        raise
+
+    if ttl:
+        cache.set(f"webmention:url:{target}", response.endpoint, ttl)
+
+        # a page that is its own endpoint says nothing about the rest of the site
+        if response.endpoint != target:
+            cache.set(f"webmention:origin:{_get_origin(target)}", response.endpoint, ttl)
+
+    return response
+
+
+def _process_webmention_endpoint(target: str, endpoints: Dict[str, str]) -> WebmentionDiscoveryResponse:
+    """
+    Validate the webmention endpoint found in a dictionary of discovered endpoints and make it absolute.
+    """
+    endpoint = endpoints.get(_WEBMENTION, None)
+
+    if endpoint is None:
+        raise WebmentionEndpointNotFound("No webmention endpoint could be found for this resource.")
+
+    _check_endpoint_host(endpoint)
 
     if endpoint == "":
         endpoint = target
@@ -103,21 +203,53 @@ def discover_webmention_endpoint(target: str) -> WebmentionDiscoveryResponse:
     if endpoint.startswith("/"):
         endpoint = "https://" + url_parse.urlsplit(target).scheme + endpoint
 
+    _check_endpoint_host(url_parse.urlsplit(endpoint).hostname or "")
+
     return WebmentionDiscoveryResponse(endpoint=endpoint)
 
 
+def _check_endpoint_host(host: str) -> None:
+    """
+    Check that an endpoint host is not localhost or an IP address that is not on the public internet.
+
+    Host names are not resolved here. Use a HTTPClient with a Resolver to check the addresses they resolve to.
+    """
+    if host == "localhost":
+        raise LocalhostEndpointFound("The endpoint is localhost.")
+
+    address = _parse_ip_address(host)
+
+    if address is not None and not _is_public_address(address):
+        raise UnacceptableIPAddress("The endpoint does not connect to an accepted IP address.")
+
+
 def discover_endpoints(
-    url: str, headers_to_find: List[str], request: requests.Response = None, bs4_html: str = None
+    url: str,
+    headers_to_find: List[str],
+    request: requests.Response = None,
+    bs4_html: str = None,
+    client: Optional[HTTPClient] = None,
+    stream: bool = False,
 ) -> Dict[str, str]:
     """
     Return a dictionary of specified endpoint locations for the given URL, if available.
 
+    In streaming mode, the page is read in chunks and parsed as it arrives. Reading stops
+    as soon as every endpoint has been found, or when the <body> of the page is reached,
+    so only <link> elements in the <head> are found. If the HTTP Link header contains every
+    endpoint, the page is not read at all. Endpoints in the Link header take precedence over
+    those in the page, and the first <link> for an endpoint is used.
+
     :param url: The URL to discover endpoints for.
     :type url: str
     :param headers_to_find: The headers to find.
         Values you may want to use include: microsub, micropub, token_endpoint,
         authorization_endpoint, subscribe.
     :type headers_to_find: dict[str, str]
+    :param client: The HTTP client to use for the request (optional).
+    :type client: HTTPClient
+    :param stream: Only read the page until its <head> has been parsed (optional).
+    :type stream: bool
     :return: The discovered endpoints.
     :rtype: dict[str, str]
 
@@ -139,18 +271,72 @@ def discover_endpoints(
 
     :raises requests.exceptions.RequestException: Error raised while making the network request to discover endpoints.
     """
-    response: Dict[str, str] = {}
-
     if request:
-        endpoint_request = request
-    else:
-        try:
-            endpoint_request = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=5)
-        except requests.exceptions.RequestException:
-            raise Exception("Could not connect to the specified URL.")
+        return _parse_endpoints(url, request.headers, request.text, headers_to_find)
+
+    endpoints, _ = _fetch_endpoints(url, headers_to_find, client, stream)
+
+    return endpoints
+
+
+def _fetch_endpoints(
+    url: str, headers_to_find: List[str], client: Optional[HTTPClient], stream: bool = False
+) -> Tuple[Dict[str, str], requests.structures.CaseInsensitiveDict]:
+    """
+    Retrieve a URL and return the specified endpoints found in the response, and the response headers.
+    """
+    endpoint_request = _get_page(url, client, stream)
+
+    return _read_endpoints(url, endpoint_request, headers_to_find, stream), endpoint_request.headers
+
+
+def _get_page(url: str, client: Optional[HTTPClient], stream: bool = False) -> requests.Response:
+    """
+    Retrieve a URL in which to discover endpoints.
+    """
+    try:
+        return _get_client(client).get(url, timeout=5, stream=stream)
+    except UnacceptableIPAddress:
+        raise
+    except requests.exceptions.RequestException:
+        raise requests.exceptions.RequestException("Could not connect to the specified URL.")
+
+
+def _read_endpoints(
+    url: str, endpoint_request: requests.Response, headers_to_find: List[str], stream: bool = False
+) -> Dict[str, str]:
+    """
+    Return the specified endpoints found in a response, reading a streamed response only as far as needed.
+    """
+    if not stream:
+        return _parse_endpoints(url, endpoint_request.headers, endpoint_request.text, headers_to_find)
 
     link_headers = _find_links_in_headers(headers=endpoint_request.headers, target_headers=headers_to_find)
 
+    endpoints = {rel: link["url"] for rel, link in link_headers.items()}
+
+    missing_rels = [rel for rel in headers_to_find if rel not in endpoints]
+
+    # the body is only read if the Link header did not contain every endpoint
+    if missing_rels:
+        endpoints.update(find_head_links(endpoint_request, missing_rels, domain=url_parse.urlsplit(url).netloc))
+    else:
+        endpoint_request.close()
+
+    return endpoints
+
+
+def _parse_endpoints(url: str, headers, body: str, headers_to_find: List[str]) -> Dict[str, str]:
+    """
+    Return the specified endpoints found in the HTTP Link headers and HTML of a response.
+
+    As the Webmention specification requires, the first Link header for a rel takes precedence,
+    followed by the first element with the rel in document order.
+    """
+    response: Dict[str, str] = {}
+
+    link_headers = _find_links_in_headers(headers=headers, target_headers=headers_to_find)
+
     for header in link_headers:
         response[header] = link_headers[header]["url"]
 
@@ -159,7 +345,9 @@ def discover_endpoints(
     except:
         domain = None
 
-    response.update(_find_links_html(body=endpoint_request.text, target_headers=headers_to_find, domain=domain))
+    for rel, href in _find_links_html(body=body, target_headers=headers_to_find, domain=domain).items():
+        response.setdefault(rel, href)
+
     return response
 
 
@@ -175,13 +363,18 @@ def _find_links_in_headers(*, headers, target_headers: List[str]) -> Dict[str, D
 
     for header in parsed_link_headers:
         url = header.get("url", "")
-        rel = header.get("rel", "")
         mime_type = header.get("type", "")
-        if _is_http_url(url) and rel in target_headers:
-            found[rel] = {
-                "url": url,
-                "mime_type": mime_type,
-            }
+
+        if not _is_http_url(url):
+            continue
+
+        # only the first Link header for a rel is used
+        for rel in header.get("rel", "").split():
+            if rel in target_headers and rel not in found:
+                found[rel] = {
+                    "url": url,
+                    "mime_type": mime_type,
+                }
 
     # Add check for x-pingback header
     if "x-pingback" in target_headers:
@@ -207,12 +400,13 @@ def _find_links_html(
 
     found: Dict[str, str] = {}
 
+    # only the first element in document order with a rel is used
     for link in soup.find_all(html_tag):
-        try:
-            rel = link.get("rel", [])[0]
-            href = canonicalize_url(url=link.get("href", ""), domain=domain)
-        except IndexError:
+        if link.get("href") is None:
             continue
-        if rel in target_headers:
-            found[rel] = href
+
+        for rel in link.get("rel", []):
+            if rel in target_headers and rel not in found:
+                found[rel] = canonicalize_url(url=link.get("href", ""), domain=domain)
+
     return found
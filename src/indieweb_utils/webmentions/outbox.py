@@ -0,0 +1,194 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from ..network.cache import Cache
+from ..network.client import HTTPClient
+from ..network.resolver import UnacceptableIPAddress
+from . import discovery
+from .send import (
+    CouldNotConnectToWebmentionEndpoint,
+    SendWebmentionResponse,
+    WebmentionEndpointUnavailable,
+    _post_webmention,
+    _validate_approved_domain,
+    _validate_webmention,
+)
+from .store import DEFAULT_MAX_RETRY_DELAY, DEFAULT_RETRY_DELAY, _WebmentionStore
+
+SENT = "sent"
+FAILED = "failed"
+
+
+@dataclass
+class OutgoingWebmention:
+    """
+    A webmention stored in a WebmentionOutbox.
+    """
+
+    id: int
+    source: str
+    target: str
+    code: Optional[str] = None
+    realm: Optional[str] = None
+    attempts: int = 0
+
+
+@dataclass
+class WebmentionOutboxResult:
+    """
+    The outcome of sending a webmention from a WebmentionOutbox.
+
+    If the webmention could not be sent, `error` is the last exception raised while sending it and `response` is None.
+    """
+
+    webmention: OutgoingWebmention
+    response: Optional[SendWebmentionResponse] = None
+    error: Optional[Exception] = None
+
+    @property
+    def sent(self) -> bool:
+        return self.error is None
+
+
+class WebmentionOutbox(_WebmentionStore):
+    """
+    Send webmentions in the background, retrying those that fail for reasons that may be temporary.
+
+    Webmentions are stored in a SQLite database until they have been sent, so they are not lost
+    if your program stops. Each (source, target) pair is only stored once: if a webmention is
+    added again while it is waiting to be sent, it is not sent twice. If it is added again after
+    it has been sent, it is sent again, i.e. to tell the target that the source has been updated.
+
+    Webmentions are sent by a pool of worker threads, with no more than `max_per_host` requests to
+    one host at once, so one slow receiver does not hold up webmentions to other sites. Sending is
+    retried with exponential backoff and jitter, up to `max_attempts` times, if the target or its
+    endpoint cannot be reached, times out, or returns a 5xx or 429 status code. If the endpoint
+    sends a Retry-After header, the retry waits at least that long. Other errors, i.e. a target
+    with no webmention endpoint, are not retried. `on_result` is called with the final outcome
+    of every webmention.
+
+    The status of a webmention is "pending", "processing", "sent", or "failed".
+
+    :param path: The path to the SQLite database. Use ":memory:" for an outbox that is not saved.
+    :type path: str
+    :param on_result: A function called with a WebmentionOutboxResult for every webmention that
+        has been sent, or that has failed for the last time.
+    :type on_result: Callable[[WebmentionOutboxResult], None]
+    :param me: The URL of the user. If provided, only webmentions to targets on this domain are sent.
+    :type me: str
+    :param max_workers: The maximum number of webmentions to send at once.
+    :type max_workers: int
+    :param max_per_host: The maximum number of simultaneous requests to one host.
+    :type max_per_host: int
+    :param max_attempts: The number of times to try to send a webmention.
+    :type max_attempts: int
+    :param retry_delay: The number of seconds to wait before the first retry. The delay doubles after every retry.
+    :type retry_delay: float
+    :param max_retry_delay: The longest number of seconds to wait between retries.
+    :type max_retry_delay: float
+    :param client: The HTTP client to use (optional).
+    :type client: HTTPClient
+    :param cache: The cache in which to store discovered webmention endpoints (optional).
+    :type cache: Cache
+
+    Example:
+
+    .. code-block:: python
+
+        import threading
+
+        from indieweb_utils.webmentions.outbox import WebmentionOutbox
+
+        def on_result(result):
+            if not result.sent:
+                print("Could not send a webmention to", result.webmention.target, result.error)
+
+        outbox = WebmentionOutbox("outbox.db", on_result=on_result)
+
+        threading.Thread(target=outbox.run, daemon=True).start()
+
+        # returns straight away
+        outbox.add("https://jamesg.blog/post", "https://aaronparecki.com/2024/01/01/1/")
+    """
+
+    _table = "outgoing_webmentions"
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        on_result: Optional[Callable[[WebmentionOutboxResult], None]] = None,
+        me: Optional[str] = None,
+        max_workers: int = 8,
+        max_per_host: int = 2,
+        max_attempts: int = 8,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY,
+        client: Optional[HTTPClient] = None,
+        cache: Optional[Cache] = None,
+    ) -> None:
+        super().__init__(path, on_result, max_workers, max_per_host, max_attempts, retry_delay, max_retry_delay)
+
+        self.me = me
+        self.client = client
+        self.cache = cache
+
+    def add(self, source: str, target: str, code: Optional[str] = None, realm: Optional[str] = None) -> bool:
+        """
+        Add a webmention to the outbox.
+
+        :param source: The source URL of the webmention.
+        :type source: str
+        :param target: The target URL of the webmention.
+        :type target: str
+        :param code: An authorization code that grants access to the source of a private webmention (optional).
+        :type code: str
+        :param realm: A unique value for the intended recipient of a private webmention (optional).
+        :type realm: str
+        :return: True if the webmention was added, False if it was already waiting to be sent.
+        :rtype: bool
+        """
+        return self._add(source, target, {"code": code, "realm": realm})
+
+    def _make_job(
+        self, id: int, source: str, target: str, options: Dict[str, Any], attempts: int
+    ) -> OutgoingWebmention:
+        return OutgoingWebmention(id, source, target, options.get("code"), options.get("realm"), attempts)
+
+    def _process(self, webmention: OutgoingWebmention) -> WebmentionOutboxResult:
+        try:
+            _validate_webmention(webmention.source, webmention.target)
+            _validate_approved_domain(webmention.target, self.me)
+
+            with self._limiter.limit(webmention.target):
+                endpoint = discovery.discover_webmention_endpoint(
+                    webmention.target, client=self.client, cache=self.cache
+                ).endpoint
+
+            with self._limiter.limit(endpoint):
+                response = _post_webmention(
+                    webmention.source, webmention.target, endpoint, webmention.code, webmention.realm, self.client
+                )
+        except Exception as e:
+            return WebmentionOutboxResult(webmention=webmention, error=e)
+
+        return WebmentionOutboxResult(webmention=webmention, response=response)
+
+    def _get_retry_delay(self, result: WebmentionOutboxResult) -> Optional[float]:
+        # the target or endpoint resolves to an address that is never accepted
+        if isinstance(result.error, UnacceptableIPAddress):
+            return None
+
+        # the target (during discovery) or the endpoint returned a 5xx or 429 status code
+        if isinstance(result.error, (discovery.WebmentionTargetUnavailable, WebmentionEndpointUnavailable)):
+            return result.error.retry_after or 0
+
+        # the target (during discovery) or the endpoint could not be reached, or timed out
+        if isinstance(result.error, (CouldNotConnectToWebmentionEndpoint, requests.exceptions.RequestException)):
+            return 0
+
+        return None
+
+    def _get_final_status(self, result: WebmentionOutboxResult) -> str:
+        return SENT if result.sent else FAILED
@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from ..network.client import HTTPClient
+from .store import DEFAULT_MAX_RETRY_DELAY, DEFAULT_RETRY_DELAY, _WebmentionStore
+from .validate import (
+    WebmentionCheckResponse,
+    WebmentionSourceUnavailable,
+    validate_webmention,
+)
+
+VALID = "valid"
+INVALID = "invalid"
+
+
+@dataclass
+class QueuedWebmention:
+    """
+    A webmention stored in a WebmentionQueue.
+    """
+
+    id: int
+    source: str
+    target: str
+    vouch: str = ""
+    code: Optional[str] = None
+    attempts: int = 0
+
+
+@dataclass
+class WebmentionQueueResult:
+    """
+    The outcome of validating a queued webmention.
+
+    If the webmention is invalid, `error` is the exception raised by the validator and `response` is None.
+    """
+
+    webmention: QueuedWebmention
+    response: Optional[WebmentionCheckResponse] = None
+    error: Optional[Exception] = None
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None
+
+
+class WebmentionQueue(_WebmentionStore):
+    """
+    Receive webmentions now and validate them later.
+
+    Received webmentions are stored in a SQLite database, so they are not lost if your program
+    stops. Each (source, target) pair is only queued once: if a webmention is received again while
+    it is waiting to be validated, it is not queued twice. If it is received again after it has been
+    validated, it is validated again, because the source may have changed.
+
+    Webmentions are validated with `validate_webmention()` by a pool of worker threads, with no more
+    than `max_per_host` validations of sources on one host at once. A source that could not be
+    retrieved for a reason that may be temporary (see `WebmentionSourceUnavailable`) is retried with
+    exponential backoff, up to `max_attempts` times. `on_result` is called with the final outcome of
+    every webmention.
+
+    The status of a webmention is "pending", "processing", "valid", or "invalid".
+
+    :param path: The path to the SQLite database. Use ":memory:" for a queue that is not saved.
+    :type path: str
+    :param on_result: A function called with a WebmentionQueueResult for every validated webmention.
+    :type on_result: Callable[[WebmentionQueueResult], None]
+    :param validator: The function used to validate webmentions (default: `validate_webmention()`).
+    :type validator: Callable
+    :param validator_kwargs: Keyword arguments passed to the validator, i.e. `vouch_list` or `max_bytes`.
+    :type validator_kwargs: dict
+    :param max_workers: The maximum number of webmentions to validate at once.
+    :type max_workers: int
+    :param max_per_host: The maximum number of webmentions from one source host to validate at once.
+    :type max_per_host: int
+    :param max_attempts: The number of times to try to validate a webmention.
+    :type max_attempts: int
+    :param retry_delay: The number of seconds to wait before the first retry. The delay doubles after every retry.
+    :type retry_delay: float
+    :param max_retry_delay: The longest number of seconds to wait between retries.
+    :type max_retry_delay: float
+    :param client: The HTTP client to use (optional).
+    :type client: HTTPClient
+
+    Example:
+
+    .. code-block:: python
+
+        import threading
+
+        from flask import Flask, request
+
+        from indieweb_utils.webmentions.queue import WebmentionQueue
+
+        app = Flask(__name__)
+
+        def on_result(result):
+            if result.valid:
+                print("Received a valid webmention from", result.webmention.source)
+
+        queue = WebmentionQueue("webmentions.db", on_result=on_result)
+
+        threading.Thread(target=queue.run, daemon=True).start()
+
+        @app.route("/webmention", methods=["POST"])
+        def webmention():
+            queue.enqueue(request.form["source"], request.form["target"])
+
+            return "", 202
+    """
+
+    _table = "received_webmentions"
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        on_result: Optional[Callable[[WebmentionQueueResult], None]] = None,
+        validator: Callable[..., WebmentionCheckResponse] = validate_webmention,
+        validator_kwargs: Optional[Dict[str, Any]] = None,
+        max_workers: int = 4,
+        max_per_host: int = 2,
+        max_attempts: int = 3,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY,
+        client: Optional[HTTPClient] = None,
+    ) -> None:
+        super().__init__(path, on_result, max_workers, max_per_host, max_attempts, retry_delay, max_retry_delay)
+
+        self.validator = validator
+        self.validator_kwargs = validator_kwargs or {}
+        self.client = client
+
+    def enqueue(self, source: str, target: str, vouch: str = "", code: Optional[str] = None) -> bool:
+        """
+        Add a webmention to the queue.
+
+        :param source: The source URL of the webmention.
+        :type source: str
+        :param target: The target URL of the webmention.
+        :type target: str
+        :param vouch: The vouch URL of the webmention (optional).
+        :type vouch: str
+        :param code: The code of a private webmention (optional).
+        :type code: str
+        :return: True if the webmention was queued, False if it was already waiting to be validated.
+        :rtype: bool
+        """
+        return self._add(source, target, {"vouch": vouch, "code": code})
+
+    def _make_job(self, id: int, source: str, target: str, options: Dict[str, Any], attempts: int) -> QueuedWebmention:
+        return QueuedWebmention(id, source, target, options.get("vouch", ""), options.get("code"), attempts)
+
+    def _process(self, webmention: QueuedWebmention) -> WebmentionQueueResult:
+        try:
+            with self._limiter.limit(webmention.source):
+                response = self.validator(
+                    webmention.source,
+                    webmention.target,
+                    code=webmention.code,
+                    vouch=webmention.vouch,
+                    client=self.client,
+                    **self.validator_kwargs,
+                )
+        except Exception as e:
+            return WebmentionQueueResult(webmention=webmention, error=e)
+
+        return WebmentionQueueResult(webmention=webmention, response=response)
+
+    def _get_retry_delay(self, result: WebmentionQueueResult) -> Optional[float]:
+        return 0 if isinstance(result.error, WebmentionSourceUnavailable) else None
+
+    def _get_final_status(self, result: WebmentionQueueResult) -> str:
+        return VALID if result.valid else INVALID
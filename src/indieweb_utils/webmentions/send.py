@@ -1,9 +1,15 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from urllib import parse as url_parse
 
 import requests
 
+from ..network.cache import Cache
+from ..network.client import HTTPClient, _get_client, _get_retry_after
+from ..network.limits import HostLimiter
+from ..network.resolver import UnacceptableIPAddress
 from ..utils.urls import _is_http_url
 from . import discovery
 
@@ -38,6 +44,21 @@ class GenericWebmentionError(Exception):
     pass
 
 
+class WebmentionEndpointUnavailable(GenericWebmentionError):
+    """
+    Raised when a webmention endpoint returns a 5xx or 429 status code, so sending may succeed later.
+
+    `retry_after` is the number of seconds the endpoint asked to wait before retrying
+    (from the Retry-After header), or None.
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
 class CouldNotConnectToWebmentionEndpoint(Exception):
     pass
 
@@ -51,6 +72,24 @@ class SendWebmentionResponse:
     headers: List[Header]
 
 
+@dataclass
+class BulkWebmentionResult:
+    """
+    The result of sending a webmention to one target with `send_webmentions()`.
+
+    If the webmention was sent, `response` is set. Otherwise, `error` is the exception
+    that `send_webmention()` would have raised for the target.
+    """
+
+    target: str
+    response: Optional[SendWebmentionResponse] = None
+    error: Optional[Exception] = None
+
+    @property
+    def sent(self) -> bool:
+        return self.error is None
+
+
 def _validate_webmention(source: str, target: str):
     """
     Check if a webmention has a provided source, target, and valid protocol.
@@ -65,6 +104,74 @@ def _validate_webmention(source: str, target: str):
         raise UnsupportedProtocolError("Only HTTP/HTTPS URLs are supported.")
 
 
+def _validate_approved_domain(target: str, me: str = None) -> None:
+    """
+    Check if a webmention target is on the domain of the sender, if a sender is provided.
+    """
+    if me is None:
+        return
+
+    target_domain = url_parse.urlsplit(target).scheme
+
+    raw_domain = me
+
+    if "/" in me.strip("/"):
+        raw_domain = url_parse.urlsplit(me).scheme
+
+    if not target_domain.endswith(raw_domain):
+        raise TargetIsNotApprovedDomain("Target must be a {me} post.")
+
+
+def _get_webmention_request_data(source: str, target: str, code: str = None, realm: str = None) -> Dict[str, str]:
+    request_data = {
+        "source": source,
+        "target": target,
+    }
+
+    if code and realm:
+        request_data["code"] = code
+        request_data["realm"] = realm
+
+    return request_data
+
+
+def _process_webmention_response(target: str, status_code: int, headers, body: str) -> SendWebmentionResponse:
+    """
+    Turn the response from a webmention endpoint into a SendWebmentionResponse, or raise an error.
+    """
+    # if response is a JSON document
+    if headers.get("Content-Type", "").split(";")[0].strip() == "application/json":
+        try:
+            message = str(json.loads(body).get("summary", ""))
+        except (ValueError, AttributeError):
+            message = ""
+    else:
+        message = ""
+
+    valid_status_codes = (200, 201, 202)
+
+    response_headers = [Header(name=str(k), value=str(v)) for k, v in headers.items()]
+
+    if status_code == 429 or status_code >= 500:
+        raise WebmentionEndpointUnavailable(
+            message or f"Target Webmention endpoint returned a {status_code} status code.",
+            status_code,
+            _get_retry_after(headers),
+        )
+
+    if status_code not in valid_status_codes:
+        if message == "":
+            raise GenericWebmentionError(
+                "Target Webmention endpoint returned a status code that was not 200, 201, or 202."
+            )
+
+        raise GenericWebmentionError(message)
+
+    return SendWebmentionResponse(
+        title=message, description=message, url=target, status_code=status_code, headers=response_headers
+    )
+
+
 def send_webmention(
     source: str,
     target: str,
@@ -72,6 +179,8 @@ def send_webmention(
     code: str = None,
     realm: str = None,
     target_webmention_endpoint: str = None,
+    client: Optional[HTTPClient] = None,
+    cache: Optional[Cache] = None,
 ) -> SendWebmentionResponse:
     """
     Send a webmention to a target URL.
@@ -90,6 +199,10 @@ def send_webmention(
     :type realm: str
     :param target_webmention_endpoint: The webmention endpoint of the target URL.
         If this value is provided, Webmention endpoint discovery on the target will be skipped.
+    :param client: The HTTP client to use for discovery and sending (optional).
+    :type client: HTTPClient
+    :param cache: The cache in which to store discovered webmention endpoints (optional).
+    :type cache: Cache
     :return: The response from the webmention endpoint.
     :rtype: SendWebmentionResponse
 
@@ -107,65 +220,142 @@ def send_webmention(
 
     :raises TargetIsNotApprovedDomain: Target is not in list of approved domains.
     :raises GenericWebmentionError: Generic webmention error.
+    :raises WebmentionEndpointUnavailable: The receiver's webmention endpoint returned a 5xx or 429 status code.
     :raises CouldNotConnectToWebmentionEndpoint: Could not connect to the receiver's webmention endpoint.
     """
 
     _validate_webmention(source, target)
 
     # if domain is not approved, don't allow access
-    if me is not None:
-        target_domain = url_parse.urlsplit(target).scheme
-
-        raw_domain = me
-
-        if "/" in me.strip("/"):
-            raw_domain = url_parse.urlsplit(me).scheme
-
-        if not target_domain.endswith(raw_domain):
-            raise TargetIsNotApprovedDomain("Target must be a {me} post.")
+    _validate_approved_domain(target, me)
 
     if not target_webmention_endpoint:
-        response = discovery.discover_webmention_endpoint(target)
+        response = discovery.discover_webmention_endpoint(target, client=client, cache=cache)
 
         target_webmention_endpoint = response.endpoint
 
-    request_data = {
-        "source": source,
-        "target": target,
-    }
+    return _post_webmention(source, target, target_webmention_endpoint, code, realm, client)
 
-    if code and realm:
-        request_data["code"] = code
-        request_data["realm"] = realm
+
+def _post_webmention(
+    source: str,
+    target: str,
+    target_webmention_endpoint: str,
+    code: str = None,
+    realm: str = None,
+    client: Optional[HTTPClient] = None,
+) -> SendWebmentionResponse:
+    request_data = _get_webmention_request_data(source, target, code, realm)
 
     # make post request to endpoint with source and target as values
     try:
-        r = requests.post(
+        r = _get_client(client).post(
             target_webmention_endpoint,
             data=request_data,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
         )
+    except UnacceptableIPAddress:
+        raise
     except requests.exceptions.RequestException:
         raise CouldNotConnectToWebmentionEndpoint("Could not connect to the receiver's webmention endpoint.")
 
-    # if response is a JSON document
-    if r.headers.get("Content-Type") == "application/json":
-        message = str(r.json().get("summary", ""))
-    else:
-        message = ""
+    return _process_webmention_response(target, r.status_code, r.headers, r.text)
 
-    valid_status_codes = (200, 201, 202)
 
-    headers = [Header(name=str(k), value=str(v)) for k, v in r.headers.items()]
+def _send_limited_webmention(
+    source: str,
+    target: str,
+    me: Optional[str],
+    code: Optional[str],
+    realm: Optional[str],
+    limiter: HostLimiter,
+    client: Optional[HTTPClient],
+    cache: Optional[Cache],
+) -> BulkWebmentionResult:
+    try:
+        _validate_webmention(source, target)
+        _validate_approved_domain(target, me)
 
-    if r.status_code not in valid_status_codes:
-        if message == "":
-            raise GenericWebmentionError(
-                "Target Webmention endpoint returned a status code that was not 200, 201, or 202."
-            )
+        # discovery requests go to the target host, and the webmention is sent to the endpoint host.
+        # Many sites share an endpoint host (i.e. webmention.io), so both are limited.
+        with limiter.limit(target):
+            endpoint = discovery.discover_webmention_endpoint(target, client=client, cache=cache).endpoint
 
-        raise GenericWebmentionError(message)
+        with limiter.limit(endpoint):
+            response = _post_webmention(source, target, endpoint, code, realm, client)
+    except Exception as e:
+        return BulkWebmentionResult(target=target, error=e)
 
-    return SendWebmentionResponse(
-        title=message, description=message, url=target, status_code=r.status_code, headers=headers
-    )
+    return BulkWebmentionResult(target=target, response=response)
+
+
+def send_webmentions(
+    source: str,
+    targets: Iterable[str],
+    me: str = None,
+    code: str = None,
+    realm: str = None,
+    max_workers: int = 8,
+    max_per_host: int = 2,
+    client: Optional[HTTPClient] = None,
+    cache: Optional[Cache] = None,
+) -> List[BulkWebmentionResult]:
+    """
+    Send a webmention from one source to many targets at the same time.
+
+    Endpoint discovery and sending run concurrently for all targets. No more than `max_workers`
+    targets are processed at once, and no more than `max_per_host` requests are made to one host at once.
+    Duplicate targets are only sent one webmention.
+
+    An error for one target does not stop webmentions from being sent to the other targets.
+
+    :param source: The source URL of the webmentions.
+    :type source: str
+    :param targets: The target URLs to which you want to send webmentions.
+    :type targets: Iterable[str]
+    :param me: The URL of the user.
+    :type me: str
+    :param code: An authorization code that grants access to the Webmention source (optional).
+    :type code: str
+    :param realm: A unique value for the intended recipient or audience (optional).
+    :type realm: str
+    :param max_workers: The maximum number of targets to process at once.
+    :type max_workers: int
+    :param max_per_host: The maximum number of simultaneous requests to one host.
+    :type max_per_host: int
+    :param client: The HTTP client to use for discovery and sending (optional).
+    :type client: HTTPClient
+    :param cache: The cache in which to store discovered webmention endpoints (optional).
+    :type cache: Cache
+    :return: One result per unique target, in the order the targets were given.
+    :rtype: List[BulkWebmentionResult]
+
+    Example:
+
+    .. code-block:: python
+
+        import indieweb_utils
+
+        results = indieweb_utils.send_webmentions(
+            source="https://jamesg.blog/post",
+            targets=["https://example.com/1", "https://example.com/2"],
+        )
+
+        for result in results:
+            if not result.sent:
+                print(result.target, result.error)
+    """
+    unique_targets = list(dict.fromkeys(targets))
+
+    if not unique_targets:
+        return []
+
+    limiter = HostLimiter(max_per_host)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_targets))) as executor:
+        return list(
+            executor.map(
+                lambda target: _send_limited_webmention(source, target, me, code, realm, limiter, client, cache),
+                unique_targets,
+            )
+        )
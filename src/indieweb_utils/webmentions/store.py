@@ -0,0 +1,323 @@
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..network.limits import HostLimiter
+
+PENDING = "pending"
+PROCESSING = "processing"
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_DELAY = 60
+DEFAULT_MAX_RETRY_DELAY = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{{}}',
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    added REAL NOT NULL,
+    error TEXT,
+    UNIQUE (source, target)
+)
+"""
+
+
+class _WebmentionStore(ABC):
+    """
+    A SQLite table of (source, target) pairs that are processed by a pool of worker threads.
+
+    Subclasses set `_table`, and implement `_make_job()`, `_process()`, `_get_retry_delay()`,
+    and `_get_final_status()`.
+    """
+
+    _table: str
+
+    def __init__(
+        self,
+        path: str,
+        on_result: Optional[Callable[[Any], None]],
+        max_workers: int,
+        max_per_host: int,
+        max_attempts: int,
+        retry_delay: float,
+        max_retry_delay: float,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+
+        self.on_result = on_result
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self._limiter = HostLimiter(max_per_host)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+        # one connection is shared by every thread, and is only used while holding the lock
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+        with self._lock:
+            self._db.execute(_SCHEMA.format(table=self._table))
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {self._table}_due ON {self._table} (status, next_attempt)")
+            # webmentions that were being processed when the program stopped are processed again
+            self._db.execute(f"UPDATE {self._table} SET status = ? WHERE status = ?", (PENDING, PROCESSING))
+
+    def _add(self, source: str, target: str, options: Dict[str, Any]) -> bool:
+        now = time.time()
+
+        # a webmention that is waiting is not added twice. One that has been processed is
+        # processed again, because the source may have changed since.
+        with self._lock:
+            cursor = self._db.execute(
+                f"""
+                INSERT INTO {self._table} (source, target, options, status, next_attempt, added)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, target) DO UPDATE SET
+                    options = excluded.options,
+                    status = excluded.status,
+                    attempts = 0,
+                    next_attempt = excluded.next_attempt,
+                    added = excluded.added,
+                    error = NULL
+                WHERE status NOT IN (?, ?)
+                """,
+                (source, target, json.dumps(options), PENDING, now, now, PENDING, PROCESSING),
+            )
+
+        added = cursor.rowcount > 0
+
+        if added:
+            self._wakeup.set()
+
+        return added
+
+    def pending_count(self) -> int:
+        """
+        Return the number of webmentions that are waiting to be processed.
+        """
+        with self._lock:
+            return self._db.execute(
+                f"SELECT COUNT(*) FROM {self._table} WHERE status IN (?, ?)", (PENDING, PROCESSING)
+            ).fetchone()[0]
+
+    def status(self, source: str, target: str) -> Optional[str]:
+        """
+        Return the status of a webmention, or None if it was never added.
+
+        :param source: The source URL of the webmention.
+        :type source: str
+        :param target: The target URL of the webmention.
+        :type target: str
+        """
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT status FROM {self._table} WHERE source = ? AND target = ?", (source, target)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def next_attempt_time(self) -> Optional[float]:
+        """
+        Return the time (as a UNIX timestamp) at which the next webmention is due, or None if none are waiting.
+        """
+        with self._lock:
+            return self._db.execute(
+                f"SELECT MIN(next_attempt) FROM {self._table} WHERE status = ?", (PENDING,)
+            ).fetchone()[0]
+
+    def _claim_due(self, now: float, limit: Optional[int] = None) -> List[Tuple[int, str, str, Dict[str, Any], int]]:
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT id, source, target, options, attempts FROM {self._table}
+                WHERE status = ? AND next_attempt <= ? ORDER BY next_attempt LIMIT ?
+                """,
+                (PENDING, now, -1 if limit is None else limit),
+            ).fetchall()
+
+            self._db.executemany(
+                f"UPDATE {self._table} SET status = ? WHERE id = ?", [(PROCESSING, row[0]) for row in rows]
+            )
+
+        return [(id, source, target, json.loads(options), attempts) for id, source, target, options, attempts in rows]
+
+    def _release(self, ids: List[int]) -> None:
+        # webmentions that were claimed but not processed are processed again later
+        with self._lock:
+            self._db.executemany(
+                f"UPDATE {self._table} SET status = ? WHERE id = ? AND status = ?",
+                [(PENDING, id, PROCESSING) for id in ids],
+            )
+
+    @abstractmethod
+    def _make_job(self, id: int, source: str, target: str, options: Dict[str, Any], attempts: int) -> Any:
+        """
+        Return the job for a stored webmention.
+        """
+
+    @abstractmethod
+    def _process(self, job: Any) -> Any:
+        """
+        Process a job, and return a result with `webmention` and `error` attributes. This never raises.
+        """
+
+    @abstractmethod
+    def _get_retry_delay(self, result: Any) -> Optional[float]:
+        """
+        Return None if the error cannot be retried, otherwise the shortest delay before a retry.
+        """
+
+    @abstractmethod
+    def _get_final_status(self, result: Any) -> str:
+        """
+        Return the status of a webmention that will not be retried.
+        """
+
+    def _record(self, result: Any, now: float) -> bool:
+        # returns whether the outcome is final
+        job = result.webmention
+        job.attempts += 1
+
+        min_delay = self._get_retry_delay(result) if result.error is not None else None
+
+        if min_delay is not None and job.attempts < self.max_attempts:
+            # exponential backoff with jitter, so webmentions to one host are not retried in lockstep
+            backoff = min(self.retry_delay * 2 ** (job.attempts - 1), self.max_retry_delay)
+            status, next_attempt = PENDING, now + max(backoff * random.uniform(0.9, 1.1), min_delay)
+        else:
+            status, next_attempt = self._get_final_status(result), now
+
+        with self._lock:
+            self._db.execute(
+                f"UPDATE {self._table} SET status = ?, attempts = ?, next_attempt = ?, error = ? WHERE id = ?",
+                (status, job.attempts, next_attempt, None if result.error is None else str(result.error), job.id),
+            )
+
+        return status != PENDING
+
+    def _complete(self, result: Any) -> bool:
+        # returns whether the outcome is final
+        if not self._record(result, time.time()):
+            return False
+
+        if self.on_result is None:
+            return True
+
+        # the outcome has already been saved, so a failing callback does not leave the webmention processing
+        try:
+            self.on_result(result)
+        except Exception:
+            logger.exception("on_result raised an exception for the webmention from %s", result.webmention.source)
+
+        return True
+
+    def run_pending(self, now: Optional[float] = None) -> List[Any]:
+        """
+        Process every webmention that is due.
+
+        :param now: The current time, as a UNIX timestamp (optional).
+        :type now: float
+        :return: The final outcome of each webmention that was processed. Webmentions that
+            will be retried are not included.
+        :rtype: list
+        """
+        if now is None:
+            now = time.time()
+
+        due = [self._make_job(*row) for row in self._claim_due(now)]
+
+        if not due:
+            return []
+
+        results = []
+        unfinished = {job.id for job in due}
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(due))) as executor:
+                for future in as_completed([executor.submit(self._process, job) for job in due]):
+                    result = future.result()
+                    unfinished.discard(result.webmention.id)
+
+                    if self._complete(result):
+                        results.append(result)
+        finally:
+            self._release(list(unfinished))
+
+        return results
+
+    def run(self, poll_interval: float = 60) -> None:
+        """
+        Process webmentions as they are added until `stop()` is called.
+
+        A webmention is started as soon as it is due and a worker is free, so a slow webmention
+        only holds up its own worker.
+
+        :param poll_interval: The longest time, in seconds, to wait between checks for due webmentions.
+        :type poll_interval: float
+        """
+        self._stopped.clear()
+
+        running: Dict[Future, int] = {}
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while not self._stopped.is_set():
+                    self._wakeup.clear()
+
+                    for future in [future for future in running if future.done()]:
+                        running.pop(future)
+                        self._complete(future.result())
+
+                    due = self._claim_due(time.time(), self.max_workers - len(running))
+
+                    for job in [self._make_job(*row) for row in due]:
+                        future = executor.submit(self._process, job)
+                        running[future] = job.id
+                        # a finished webmention wakes the loop, so its worker is given the next one
+                        future.add_done_callback(lambda future: self._wakeup.set())
+
+                    next_attempt = self.next_attempt_time()
+
+                    if next_attempt is None or len(running) == self.max_workers:
+                        wait = poll_interval
+                    else:
+                        wait = min(next_attempt - time.time(), poll_interval)
+
+                    if wait > 0:
+                        self._wakeup.wait(wait)
+
+            # the executor has waited for the webmentions that were being processed
+            for future in list(running):
+                running.pop(future)
+                self._complete(future.result())
+        finally:
+            self._release(list(running.values()))
+
+    def stop(self) -> None:
+        """
+        Stop processing webmentions after `run()` was called.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        with self._lock:
+            self._db.close()
@@ -1,14 +1,30 @@
+import time
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 from urllib import parse as url_parse
-from ..constants import USER_AGENT
 
 import requests
 from bs4 import BeautifulSoup
+
 from indieweb_utils.webmentions.discovery import discover_endpoints
 
+from ..network.client import HTTPClient, _get_client
+from ..network.limits import (
+    ResponseTooLarge,
+    _get_content_length,
+    iter_limited_content,
+    read_limited_content,
+)
+from ..network.resolver import UnacceptableIPAddress
+from ..parsing.stream import TargetLinkParser, _get_incremental_decoder
 from ..utils.urls import canonicalize_url
 
+# the largest source, in bytes, that is downloaded to validate a webmention
+DEFAULT_MAX_SOURCE_SIZE = 10000000
+
+# the number of seconds in which a source must be downloaded
+DEFAULT_SOURCE_DEADLINE = 30
+
 
 class WebmentionValidationError(Exception):
     pass
@@ -18,6 +34,15 @@ class WebmentionIsGone(Exception):
     pass
 
 
+class WebmentionSourceUnavailable(WebmentionValidationError):
+    """
+    Raised when a source could not be retrieved for a reason that may be temporary, i.e. a
+    timeout, a connection error, or a 5xx or 429 status code. Validation can be retried later.
+    """
+
+    pass
+
+
 class NoTokenEndpointForPrivateWebmention(Exception):
     pass
 
@@ -27,10 +52,10 @@ class WebmentionCheckResponse:
     webmention_is_valid: bool
     vouch_check_has_passed: bool
     source_text: str
-    source_tree: BeautifulSoup
+    source_tree: Optional[BeautifulSoup]
 
 
-def _process_vouch(vouch: str, source: str, vouch_list: List[str]) -> bool:
+def _process_vouch(vouch: str, source: str, vouch_list: List[str], client: Optional[HTTPClient] = None) -> bool:
     """
     use vouch to flag webmentions for moderation
     see Vouch spec for more: https://indieweb.org/Vouch
@@ -40,41 +65,79 @@ def _process_vouch(vouch: str, source: str, vouch_list: List[str]) -> bool:
 
     moderate = True
 
-    if vouch:
-        vouch_domain = url_parse.urlparse(vouch).netloc
+    if _vouch_is_candidate(vouch, vouch_list):
+        try:
+            r = _get_client(client).get(vouch, timeout=5)
+        except requests.exceptions.RequestException:
+            return moderate
+
+        moderate = not _vouch_links_to_source(r.text, source)
 
-        if vouch_domain in vouch_list:
-            try:
-                r = requests.get(vouch, headers={"User-Agent": USER_AGENT}, timeout=5)
-            except requests.exceptions.RequestException:
-                return moderate
+    return moderate
 
-            soup = BeautifulSoup(r.text, "html.parser")
 
-            # find hyperlink with source
-            # required for a vouch to be valid
-            for anchor in soup.find_all("a"):
-                if anchor.get("href"):
-                    if anchor["href"] == source:
-                        moderate = False
+def _vouch_is_candidate(vouch: str, vouch_list: List[str]) -> bool:
+    return bool(vouch) and url_parse.urlparse(vouch).netloc in vouch_list
+
+
+def _vouch_links_to_source(vouch_html: str, source: str) -> bool:
+    soup = BeautifulSoup(vouch_html, "html.parser")
+
+    # find hyperlink with source
+    # required for a vouch to be valid
+    for anchor in soup.find_all("a"):
+        if anchor.get("href") and anchor["href"] == source:
+            return True
+
+    return False
+
+
+def _validate_source_and_target(source: str, target: str) -> None:
+    if source.strip("/") == target.strip("/"):
+        raise WebmentionValidationError("Source and target cannot be the same URL.")
+
+    source_protocol = url_parse.urlparse(source).scheme
+    target_protocol = url_parse.urlparse(target).scheme
+
+    if source_protocol not in ["http", "https"]:
+        raise WebmentionValidationError("Source must use either a http:// or https:// URL scheme.")
+
+    if target_protocol not in ["http", "https"]:
+        raise WebmentionValidationError("Target must use either a http:// or https:// URL scheme.")
 
-    return moderate
 
+def _check_source_document(parsed_page_html_tree: BeautifulSoup, page_html: str, target: str) -> None:
+    """
+    Check that a retrieved source is not gone and contains a link to the target.
+    """
+    # get all <link> and <meta> tags
+    meta_links = parsed_page_html_tree.find_all(["link", "meta"])
+
+    for link in meta_links:
+        # use meta http-equiv status spec to detect 410s https://indieweb.org/meta_http-equiv_status
+        # detecting http-equiv status 410s is required by the webmention spec
+        if link.get("http-equiv", "") == "Status" and link.get("content", "") == "410 Gone":
+            raise WebmentionIsGone("Webmention source returned 410 Gone code.")
 
-def _validate_headers(request_item):
-    if request_item.headers.get("Content-Length"):
-        if int(request_item.headers["Content-Length"]) > 10000000:
-            raise WebmentionValidationError("Source is too large.")
+    contains_valid_link_to_target = _check_for_link_to_target(parsed_page_html_tree, page_html, target)
 
-    if "text/html" not in request_item.headers["Content-Type"]:
+    # Might want to comment out this if statement for testing
+    if not contains_valid_link_to_target:
+        raise WebmentionValidationError("Source does not contain a link to target.")
+
+
+def _validate_headers(request_item, max_bytes: Optional[int] = DEFAULT_MAX_SOURCE_SIZE):
+    # a Content-Length header that is not a number is ignored, as the byte limit is also applied while reading
+    if max_bytes is not None and _get_content_length(request_item.headers) > max_bytes:
+        raise WebmentionValidationError("Source is too large.")
+
+    if "text/html" not in request_item.headers.get("Content-Type", ""):
         raise WebmentionValidationError("This endpoint only supports HTML webmentions.")
 
     return True
 
 
-def _check_for_link_to_target(validation_source: requests.Response, target) -> bool:
-    soup = BeautifulSoup(validation_source.text, "html.parser")
-
+def _check_for_link_to_target(soup: BeautifulSoup, source_html: str, target: str) -> bool:
     all_anchors = soup.find_all("a")
     contains_valid_link_to_target = False
 
@@ -86,30 +149,14 @@ def _check_for_link_to_target(validation_source: requests.Response, target) -> b
             if canoncalized == target:
                 contains_valid_link_to_target = True
 
-    if target in validation_source.text:
+    if target in source_html:
         contains_valid_link_to_target = True
 
     return contains_valid_link_to_target
 
 
-def _webmention_head_request(session: requests.Session, source: str = "") -> Tuple[requests.Response, bool]:
-    try:
-        check_source_size = session.head(source, timeout=5)
-
-        validated_headers = _validate_headers(check_source_size)
-    except requests.exceptions.TooManyRedirects:
-        raise WebmentionValidationError("Source redirected too many times.")
-    except requests.exceptions.Timeout:
-        raise WebmentionValidationError("Source timed out.")
-    except requests.exceptions.RequestException:
-        # pass because HEAD request might not be recognised / processed by the client
-        pass
-
-    return check_source_size, validated_headers
-
-
-def _validate_private_webmention(source: str, session: requests.Session, code: str) -> str:
-    source_token_endpoint = discover_endpoints(source, ["token_endpoint"])
+def _validate_private_webmention(source: str, client: HTTPClient, code: str) -> str:
+    source_token_endpoint = discover_endpoints(source, ["token_endpoint"], client=client)
 
     if source_token_endpoint.get("token_endpoint") is None:
         raise NoTokenEndpointForPrivateWebmention(
@@ -119,7 +166,7 @@ def _validate_private_webmention(source: str, session: requests.Session, code: s
     token_endpoint = source_token_endpoint["token_endpoint"]
 
     try:
-        token_request = session.post(token_endpoint, data={"grant_type": "authorization_code", "code": code})
+        token_request = client.post(token_endpoint, data={"grant_type": "authorization_code", "code": code})
     except requests.exceptions.RequestException:
         raise WebmentionValidationError(
             "Token endpoint of source could not be accessed while trying to validate private webmention."
@@ -133,47 +180,136 @@ def _validate_private_webmention(source: str, session: requests.Session, code: s
     return token_request.json().get("access_token")
 
 
-def _retrieve_webmention_target(
-    source: str, code: str = None, target_request: Optional[requests.Response] = None
-) -> Tuple[BeautifulSoup, str]:
+def _check_source_status(status_code: int) -> None:
+    if status_code == 410:
+        raise WebmentionIsGone("Webmention source returned 410 Gone code.")
+
+    if status_code == 429 or status_code >= 500:
+        raise WebmentionSourceUnavailable(f"Webmention source returned {status_code} code.")
+
+    if status_code != 200:
+        raise WebmentionValidationError(f"Webmention source returned {status_code} code.")
+
+
+def _open_webmention_source(
+    source: str, code: str = None, client: Optional[HTTPClient] = None, max_bytes: Optional[int] = None
+) -> requests.Response:
+    client = _get_client(client)
+
+    request_headers = {}
+
+    if code:
+        access_token = _validate_private_webmention(source, client, code)
+
+        request_headers = {"Authorization": f"Bearer {access_token}"}
+
     # Only allow 3 redirects before raising an error
+    try:
+        source_request = client.get(source, headers=request_headers, max_redirects=3, stream=True)
+    except requests.exceptions.TooManyRedirects:
+        raise WebmentionValidationError("Source redirected too many times.")
+    except requests.exceptions.Timeout:
+        raise WebmentionSourceUnavailable("Source timed out.")
+    except UnacceptableIPAddress:
+        raise WebmentionValidationError("Source does not connect to an accepted IP address.")
+    except requests.exceptions.RequestException:
+        raise WebmentionSourceUnavailable("Source could not be retrieved.")
+
+    # the headers are checked before any of the body is downloaded
+    try:
+        _check_source_status(source_request.status_code)
+        _validate_headers(source_request, max_bytes)
+    except Exception:
+        source_request.close()
+        raise
+
+    return source_request
 
+
+def _retrieve_webmention_target(
+    source: str,
+    code: str = None,
+    target_request: Optional[requests.Response] = None,
+    client: Optional[HTTPClient] = None,
+    max_bytes: Optional[int] = DEFAULT_MAX_SOURCE_SIZE,
+    deadline: Optional[float] = DEFAULT_SOURCE_DEADLINE,
+) -> Tuple[BeautifulSoup, str]:
     if target_request:
-        validated_headers = _validate_headers(target_request)
+        _validate_headers(target_request, max_bytes)
+        _check_source_status(target_request.status_code)
 
-        get_source_for_validation = target_request
-    else:
-        session = requests.Session()
-        session.max_redirects = 3
+        return BeautifulSoup(target_request.text, "html.parser"), target_request.text
 
-        validated_headers = False
+    deadline_at = time.monotonic() + deadline if deadline is not None else None
 
-        request_headers = {}
+    source_request = _open_webmention_source(source, code, client, max_bytes)
 
-        if code:
-            access_token = _validate_private_webmention(source, session, code)
+    try:
+        content = read_limited_content(source_request, max_bytes=max_bytes, deadline=deadline_at)
+    except ResponseTooLarge:
+        raise WebmentionValidationError("Source is too large.")
+    except requests.exceptions.Timeout:
+        raise WebmentionSourceUnavailable("Source timed out.")
+    except UnacceptableIPAddress:
+        raise WebmentionValidationError("Source does not connect to an accepted IP address.")
+    except requests.exceptions.RequestException:
+        raise WebmentionSourceUnavailable("Source could not be retrieved.")
 
-            request_headers = {"Authorization": f"Bearer {access_token}"}
+    page_html = content.decode(source_request.encoding or "utf-8", errors="replace")
 
-        try:
-            get_source_for_validation = session.get(source, headers=request_headers)
-        except requests.exceptions.RequestException:
-            raise WebmentionValidationError("Source could not be retrieved.")
+    return BeautifulSoup(page_html, "html.parser"), page_html
 
-        check_source_size, validated_headers = _webmention_head_request(session, source)
 
-    if validated_headers is False:
-        validated_headers = _validate_headers(check_source_size)
+def _scan_webmention_source(
+    source: str,
+    target: str,
+    code: str = None,
+    client: Optional[HTTPClient] = None,
+    max_bytes: Optional[int] = DEFAULT_MAX_SOURCE_SIZE,
+    deadline: Optional[float] = DEFAULT_SOURCE_DEADLINE,
+) -> str:
+    """
+    Stream a source and stop reading once a link to the target has been found and the <head> has been read.
 
-    if get_source_for_validation.status_code == 410:
-        raise WebmentionIsGone("Webmention source returned 410 Gone code.")
+    Returns the part of the source that was read.
+    """
+    deadline_at = time.monotonic() + deadline if deadline is not None else None
 
-    if check_source_size.status_code != 200:
-        raise WebmentionValidationError(f"Webmention source returned {check_source_size.status_code} code.")
+    source_request = _open_webmention_source(source, code, client, max_bytes)
 
-    parse_page = BeautifulSoup(get_source_for_validation.text, "html.parser")
+    parser = TargetLinkParser(target)
+    decoder = _get_incremental_decoder(source_request)
+    chunks = iter_limited_content(source_request, max_bytes=max_bytes, deadline=deadline_at)
+    page_html = []
 
-    return parse_page, get_source_for_validation.text
+    try:
+        for chunk in chunks:
+            text = decoder.decode(chunk)
+            page_html.append(text)
+            parser.feed(text)
+
+            if parser.gone:
+                raise WebmentionIsGone("Webmention source returned 410 Gone code.")
+
+            # the rest of the <head> is read after a link to the target, in case the source is gone
+            if parser.done:
+                break
+    except ResponseTooLarge:
+        raise WebmentionValidationError("Source is too large.")
+    except requests.exceptions.Timeout:
+        raise WebmentionSourceUnavailable("Source timed out.")
+    except UnacceptableIPAddress:
+        raise WebmentionValidationError("Source does not connect to an accepted IP address.")
+    except requests.exceptions.RequestException:
+        raise WebmentionSourceUnavailable("Source could not be retrieved.")
+    finally:
+        # closes the response without reading the rest of the body
+        chunks.close()
+
+    if not parser.found:
+        raise WebmentionValidationError("Source does not contain a link to target.")
+
+    return "".join(page_html)
 
 
 def validate_webmention(
@@ -183,10 +319,24 @@ def validate_webmention(
     vouch: str = "",
     vouch_list: List[str] = [],
     target_request: requests.Response = None,
+    client: Optional[HTTPClient] = None,
+    max_bytes: Optional[int] = DEFAULT_MAX_SOURCE_SIZE,
+    deadline: Optional[float] = DEFAULT_SOURCE_DEADLINE,
+    stream: bool = False,
 ) -> WebmentionCheckResponse:
     """
     Check if a webmention is valid.
 
+    The source is downloaded in chunks. If the source is larger than `max_bytes`, or is not
+    downloaded within `deadline` seconds, the download stops and the webmention is invalid.
+
+    If `stream` is True, the source is scanned for a link to the target as it is downloaded,
+    and the download stops once a link has been found and the whole <head> has been checked for
+    a 410 Gone status. Most sources link to their target near the top of the page, so most of
+    the source is never downloaded or parsed. A 410 Gone status in the <body> is only seen if it
+    appears before the link. In this mode, `source_text` is the part of the source that was read
+    and `source_tree` is None.
+
     :refs: https://indieweb.org/Webmention
     :refs: https://indieweb.org/Private-Webmention
     :refs: https://indieweb.org/Vouch
@@ -201,6 +351,15 @@ def validate_webmention(
     :type vouch: str
     :param vouch_list: A list of vouch domains.
     :type vouch_list: list
+    :param client: The HTTP client to use for requests (optional).
+    :type client: HTTPClient
+    :param max_bytes: The largest source to accept, in bytes (default: 10MB). If None, there is no limit.
+    :type max_bytes: int
+    :param deadline: The number of seconds in which the source must be downloaded (default: 30).
+        If None, there is no deadline.
+    :type deadline: float
+    :param stream: Stop downloading the source once a link to the target is found and the <head> has been read.
+    :type stream: bool
     :return: Boolean to indicate webmention is valid, boolean
         stating whether the vouch check has passed.
     :rtype: bool, bool
@@ -222,39 +381,23 @@ def validate_webmention(
 
     :raises WebmentionValidationError: Webmention is invalid.
     :raises WebmentionIsGone: Webmention source returns a 410 Gone code.
+    :raises WebmentionSourceUnavailable: Webmention source could not be retrieved, but may be later.
     :raises NoTokenEndpointForPrivateWebmention: Webmention is private but source has no token endpoint.
     """
 
-    if source.strip("/") == target.strip("/"):
-        raise WebmentionValidationError("Source and target cannot be the same URL.")
-
-    source_protocol = url_parse.urlparse(source).scheme
-    target_protocol = url_parse.urlparse(target).scheme
-
-    if source_protocol not in ["http", "https"]:
-        raise WebmentionValidationError("Source must use either a http:// or https:// URL scheme.")
-
-    if target_protocol not in ["http", "https"]:
-        raise WebmentionValidationError("Target must use either a http:// or https:// URL scheme.")
-
-    parsed_page_html_tree, page_html = _retrieve_webmention_target(source, code, target_request)
-
-    # get all <link> tags
-    meta_links = parsed_page_html_tree.find_all("link")
+    _validate_source_and_target(source, target)
 
-    for link in meta_links:
-        # use meta http-equiv status spec to detect 410s https://indieweb.org/meta_http-equiv_status
-        # detecting http-equiv status 410s is required by the webmention spec
-        if link.get("http-equiv", "") == "Status" and link.get("content", "") == "410 Gone":
-            raise WebmentionIsGone("Webmention source returned 410 Gone code.")
-
-    contains_valid_link_to_target = _check_for_link_to_target(parsed_page_html_tree, target)
+    if stream and target_request is None:
+        parsed_page_html_tree = None
+        page_html = _scan_webmention_source(source, target, code, client, max_bytes, deadline)
+    else:
+        parsed_page_html_tree, page_html = _retrieve_webmention_target(
+            source, code, target_request, client, max_bytes, deadline
+        )
 
-    # Might want to comment out this if statement for testing
-    if not contains_valid_link_to_target:
-        raise WebmentionValidationError("Source does not contain a link to target.")
+        _check_source_document(parsed_page_html_tree, page_html, target)
 
-    moderate = _process_vouch(vouch, source, vouch_list)
+    moderate = _process_vouch(vouch, source, vouch_list, client)
 
     return WebmentionCheckResponse(
         webmention_is_valid=True,
@@ -0,0 +1,238 @@
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+
+def _run(app: web.Application, test):
+    """Serve app on a local port and run test(base_url, client) against it."""
+    from indieweb_utils import aio
+
+    async def main():
+        async with TestServer(app) as server:
+            async with aio.AsyncHTTPClient(timeout=5) as client:
+                return await test(str(server.make_url("")).rstrip("/"), client)
+
+    return asyncio.run(main())
+
+
+class TestAsyncWebmentions:
+    def test_discover_webmention_endpoint(self):
+        from indieweb_utils import aio
+
+        async def page(request):
+            return web.Response(
+                text="<html><head></head></html>",
+                content_type="text/html",
+                headers={"Link": '</webmention>; rel="webmention"'},
+            )
+
+        app = web.Application()
+        app.router.add_get("/post", page)
+
+        async def test(base_url, client):
+            return await aio.discover_webmention_endpoint(base_url + "/post", client=client)
+
+        response = _run(app, test)
+
+        assert response.endpoint.endswith("/webmention")
+
+    def test_send_webmention(self):
+        from indieweb_utils import aio
+
+        received = {}
+
+        async def endpoint(request):
+            received.update(await request.post())
+            return web.json_response({"summary": "Accepted"}, status=202)
+
+        app = web.Application()
+        app.router.add_post("/webmention", endpoint)
+
+        async def test(base_url, client):
+            return await aio.send_webmention(
+                "https://example.com/reply",
+                "https://example.com/post",
+                target_webmention_endpoint=base_url + "/webmention",
+                client=client,
+            )
+
+        response = _run(app, test)
+
+        assert response.status_code == 202
+        assert response.title == "Accepted"
+        assert received["source"] == "https://example.com/reply"
+
+    def test_validate_webmention(self):
+        from indieweb_utils import aio
+        from indieweb_utils.webmentions.validate import WebmentionValidationError
+
+        target = "https://jamesg.blog/post"
+
+        async def source(request):
+            return web.Response(text=f'<p><a href="{target}">A post</a></p>', content_type="text/html")
+
+        async def unrelated(request):
+            return web.Response(text="<p>Nothing here</p>", content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/source", source)
+        app.router.add_get("/unrelated", unrelated)
+
+        async def test(base_url, client):
+            valid = await aio.validate_webmention(base_url + "/source", target, client=client)
+
+            with pytest.raises(WebmentionValidationError):
+                await aio.validate_webmention(base_url + "/unrelated", target, client=client)
+
+            return valid
+
+        assert _run(app, test).webmention_is_valid is True
+
+
+class TestAsyncReplyContext:
+    def test_reply_context(self, reply5):
+        from indieweb_utils import aio
+
+        async def page(request):
+            return web.Response(text=reply5, content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/", page)
+
+        async def test(base_url, client):
+            return await aio.get_reply_context(base_url + "/", client=client)
+
+        reply_context = _run(app, test)
+
+        assert reply_context.name == "Beaker Browser"
+        assert reply_context.webmention_endpoint == ""
+
+    def test_icon_is_not_downloaded_when_range_is_ignored(self):
+        """The icon of a server that ignores the Range header is found without reading the whole icon."""
+        from indieweb_utils import aio
+        from indieweb_utils.network import MemoryCache
+
+        async def page(request):
+            icon_url = str(request.url.with_path("/icon.ico"))
+            return web.Response(
+                text=f'<html><head><title>A page</title><link rel="icon" href="{icon_url}"></head></html>',
+                content_type="text/html",
+            )
+
+        async def head_icon(request):
+            return web.Response(status=405)
+
+        async def get_icon(request):
+            # the rest of the icon never arrives, so reading the whole icon would miss the deadline
+            response = web.StreamResponse(headers={"Content-Type": "image/x-icon"})
+            await response.prepare(request)
+            await response.write(b"x" * 1024)
+            await asyncio.sleep(5)
+            return response
+
+        app = web.Application()
+        app.router.add_get("/", page)
+        app.router.add_route("HEAD", "/icon.ico", head_icon)
+        app.router.add_route("GET", "/icon.ico", get_icon)
+
+        icon_cache = MemoryCache()
+
+        async def test(base_url, client):
+            reply_context = await aio.get_reply_context(
+                base_url + "/", client=client, deadline=1, icon_cache=icon_cache
+            )
+
+            return reply_context, icon_cache.get("icon:" + base_url.split("://")[1])
+
+        reply_context, icon = _run(app, test)
+
+        assert reply_context.authors[0].photo.endswith("/icon.ico")
+        assert icon == reply_context.authors[0].photo
+
+
+class TestAsyncFeedDiscovery:
+    def test_discover_web_page_feeds(self, index):
+        from indieweb_utils import aio
+
+        async def page(request):
+            return web.Response(text=index, content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/", page)
+
+        async def test(base_url, client):
+            return await aio.discover_web_page_feeds(base_url + "/", client=client)
+
+        feeds = _run(app, test)
+
+        assert any(feed.url.endswith("/feeds/posts.xml") for feed in feeds)
+
+
+class TestAsyncDefaultClient:
+    def test_default_client_is_shared(self):
+        """Functions that are not given a client share the default client of the event loop."""
+        from indieweb_utils import aio
+
+        async def page(request):
+            return web.Response(
+                text="<html><head></head></html>",
+                content_type="text/html",
+                headers={"Link": '</webmention>; rel="webmention"'},
+            )
+
+        app = web.Application()
+        app.router.add_get("/post", page)
+
+        async def main():
+            async with TestServer(app) as server:
+                client = aio.get_default_client()
+
+                try:
+                    await aio.discover_webmention_endpoint(str(server.make_url("/post")))
+                    session = client._session
+
+                    await aio.discover_webmention_endpoint(str(server.make_url("/post")))
+
+                    return aio.get_default_client() is client and client._session is session
+                finally:
+                    await client.close()
+
+        assert asyncio.run(main()) is True
+
+    def test_headers_are_checked_before_body(self):
+        """A source that is not HTML is rejected without reading its body."""
+        from indieweb_utils import aio
+        from indieweb_utils.webmentions.validate import WebmentionValidationError
+
+        async def image(request):
+            # the response has no Content-Length, so only reading the body could show its size
+            response = web.StreamResponse(headers={"Content-Type": "image/png"})
+            await response.prepare(request)
+            await response.write(b"x" * 1024)
+            return response
+
+        app = web.Application()
+        app.router.add_get("/image", image)
+
+        async def test(base_url, client):
+            with pytest.raises(WebmentionValidationError, match="HTML"):
+                # the body is larger than max_bytes, so reading it would raise a different error
+                await aio.validate_webmention(
+                    base_url + "/image", "https://jamesg.blog/post", client=client, max_bytes=10
+                )
+
+            responses = []
+            await client.get(base_url + "/image", on_headers=responses.append)
+
+            return responses
+
+        responses = _run(app, test)
+
+        assert responses[0].status_code == 200
+        assert responses[0].headers["Content-Type"] == "image/png"
+        assert responses[0].content == b""
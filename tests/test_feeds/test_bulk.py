@@ -0,0 +1,44 @@
+import responses
+
+
+class TestDiscoverFeedsForSites:
+    @responses.activate
+    def test_feeds_and_errors_are_returned(self, index, index_url):
+        """Test that a result is returned for every site, including sites that could not be retrieved."""
+        from indieweb_utils import discover_feeds_for_sites
+
+        missing_url = "https://example.com/"
+
+        responses.add(responses.GET, index_url, body=index)
+
+        results = {result.url: result for result in discover_feeds_for_sites([index_url, missing_url, index_url])}
+
+        assert len(results) == 2
+        assert "https://jamesg.blog/feeds/posts.xml" in [feed.url for feed in results[index_url].feeds]
+        assert results[missing_url].feeds == []
+        assert results[missing_url].error is not None
+
+    @responses.activate
+    def test_known_feed_urls_are_not_retrieved(self):
+        """Test that sites whose feed URL follows a known pattern are resolved without any request."""
+        from indieweb_utils import discover_feeds_for_sites
+
+        results = list(discover_feeds_for_sites(["https://github.com/capjamesg"]))
+
+        assert [feed.url for feed in results[0].feeds] == ["https://github.com/capjamesg.atom"]
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_large_home_page_is_cut_off(self):
+        """Test that feeds are found in the part of a home page that is read when the page is too large."""
+        from indieweb_utils import discover_feeds_for_sites
+
+        url = "https://example.com/"
+        head = '<html><head><link rel="alternate" type="application/rss+xml" href="/feed.xml"></head><body>'
+
+        responses.add(responses.GET, url, body=head + "<p>Hello</p>" * 10000, content_type="text/html")
+
+        results = list(discover_feeds_for_sites([url], max_bytes=1024))
+
+        assert results[0].error is None
+        assert [feed.url for feed in results[0].feeds] == ["https://example.com/feed.xml"]
@@ -25,6 +25,34 @@ class TestWebPageFeedDiscovery:
         for feed in actual_feeds:
             assert feed.url in expected_feeds
 
+    def test_feeds_are_found_in_document_order(self, target):
+        html = """
+        <html>
+        <head>
+            <title>Feeds</title>
+            <link rel="alternate" type="Application/RSS+XML; charset=utf-8" href="/feed.xml" title="RSS">
+            <link rel="alternate feed" type="application/feed+json" href="/feed.json" title="JSON">
+            <link rel="alternate" type="text/plain" href="/feed.txt">
+            <link rel="stylesheet" type="application/xml" href="/styles.xml">
+            <link rel="feed" type="text/calendar" href="/events.ics">
+        </head>
+        <body><div class="h-feed"></div></body>
+        </html>
+        """
+
+        with responses.RequestsMock() as mock:
+            mock.add(responses.Response(method="HEAD", url="https://example.com/"))
+
+            actual_feeds = target("https://example.com/", user_mime_types=["text/calendar"], html=html)
+
+        assert [(feed.url, feed.mime_type) for feed in actual_feeds] == [
+            ("https://example.com/feed.xml", "application/rss+xml"),
+            ("https://example.com/feed.json", "application/feed+json"),
+            ("https://example.com/events.ics", "text/calendar"),
+            ("https://example.com/", "text/html"),
+        ]
+        assert actual_feeds[-1].title == "Feeds"
+
 
 class TestHFeedDiscovery:
     @pytest.fixture
@@ -0,0 +1,66 @@
+class TestIterNewFeedItems:
+    def test_only_new_and_changed_items_are_yielded(self):
+        """Test that items are only yielded again if they have changed."""
+        from indieweb_utils import SeenFeedItems, iter_new_feed_items
+
+        feed = "https://jamesg.blog/feeds/posts.json"
+        seen = SeenFeedItems()
+
+        first_poll = {
+            "items": [
+                {"id": "1", "content_text": "Hello"},
+                {"id": "2", "content_text": "World"},
+            ]
+        }
+
+        second_poll = {
+            "items": [
+                {"id": "3", "content_text": "New"},
+                {"id": "1", "content_text": "Hello, edited"},
+                {"id": "2", "content_text": "World"},
+            ]
+        }
+
+        assert [item["id"] for item in iter_new_feed_items(first_poll, seen, feed)] == ["1", "2"]
+        assert [item["id"] for item in iter_new_feed_items(first_poll, seen, feed)] == []
+        assert [item["id"] for item in iter_new_feed_items(second_poll, seen, feed)] == ["3", "1"]
+
+    def test_unfinished_items_are_yielded_again(self):
+        """Test that an item is only recorded as seen once the next item is requested."""
+        from indieweb_utils import SeenFeedItems, iter_new_feed_items
+
+        seen = SeenFeedItems()
+        contents = {"items": [{"id": "1"}, {"id": "2"}]}
+
+        items = iter_new_feed_items(contents, seen)
+        next(items)
+        items.close()
+
+        assert [item["id"] for item in iter_new_feed_items(contents, seen)] == ["1", "2"]
+
+    def test_seen_items_are_not_evicted(self, tmp_path):
+        """Test that no item is yielded again when more items are seen than a cache would hold."""
+        from indieweb_utils import SeenFeedItems, iter_new_feed_items
+        from indieweb_utils.network.cache import DEFAULT_MAX_ENTRIES
+
+        path = str(tmp_path / "seen.db")
+        contents = {"items": [{"id": str(i)} for i in range(DEFAULT_MAX_ENTRIES * 2)]}
+
+        seen = SeenFeedItems(path)
+
+        assert len(list(iter_new_feed_items(contents, seen, "https://example.com/feed.json"))) == len(contents["items"])
+
+        seen.close()
+
+        # fingerprints are saved between runs
+        seen = SeenFeedItems(path)
+
+        assert list(iter_new_feed_items(contents, seen, "https://example.com/feed.json")) == []
+        assert len(list(iter_new_feed_items(contents, seen, "https://example.com/other.json"))) == len(
+            contents["items"]
+        )
+
+        seen.forget("https://example.com/other.json")
+
+        assert seen.get("https://example.com/other.json", "1") is None
+        assert seen.get("https://example.com/feed.json", "1") is not None
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+import responses
+
+FEED_URL = "https://jamesg.blog/feeds/posts.json"
+
+JSON_FEED = {
+    "version": "https://jsonfeed.org/version/1.1",
+    "title": "James' Coffee Blog",
+    "items": [{"id": "1", "url": "https://jamesg.blog/1", "content_text": "Hello, world!"}],
+}
+
+
+class TestPollFeed:
+    @pytest.fixture
+    def target(self):
+        from indieweb_utils import poll_feed
+
+        return poll_feed
+
+    @responses.activate
+    def test_poll_feed_returns_validators(self, target):
+        """Test that polling a feed returns its contents and validators."""
+        responses.add(
+            responses.GET,
+            FEED_URL,
+            body=json.dumps(JSON_FEED),
+            content_type="application/feed+json",
+            headers={"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+        )
+
+        response = target(FEED_URL)
+
+        assert response.modified is True
+        assert response.etag == '"abc"'
+        assert response.last_modified == "Wed, 21 Oct 2015 07:28:00 GMT"
+        assert response.contents["items"][0]["url"] == "https://jamesg.blog/1"
+
+    @responses.activate
+    def test_poll_feed_not_modified(self, target):
+        """Test that a 304 Not Modified response is not converted."""
+        responses.add(responses.GET, FEED_URL, status=304)
+
+        response = target(FEED_URL, etag='"abc"', last_modified="Wed, 21 Oct 2015 07:28:00 GMT")
+
+        assert response.modified is False
+        assert response.contents is None
+        assert response.etag == '"abc"'
+        assert responses.calls[0].request.headers["If-None-Match"] == '"abc"'
+        assert responses.calls[0].request.headers["If-Modified-Since"] == "Wed, 21 Oct 2015 07:28:00 GMT"
@@ -0,0 +1,193 @@
+import json
+import time
+
+import responses
+
+FEED_URL = "https://jamesg.blog/feeds/posts.json"
+BROKEN_FEED_URL = "https://example.com/feed.json"
+
+JSON_FEED = {
+    "version": "https://jsonfeed.org/version/1.1",
+    "title": "James' Coffee Blog",
+    "items": [{"id": "1", "url": "https://jamesg.blog/1", "content_text": "Hello, world!"}],
+}
+
+
+class TestFeedScheduler:
+    @responses.activate
+    def test_feed_scheduler_adapts_intervals(self):
+        """Test that changed feeds are polled more often, and unchanged and failing feeds less often."""
+        from indieweb_utils import FeedScheduler
+
+        responses.add(
+            responses.GET,
+            FEED_URL,
+            body=json.dumps(JSON_FEED),
+            content_type="application/feed+json",
+            headers={"ETag": '"abc"'},
+        )
+        responses.add(responses.GET, FEED_URL, status=304)
+        responses.add(responses.GET, BROKEN_FEED_URL, status=404)
+
+        updates = []
+        errors = []
+
+        scheduler = FeedScheduler(
+            on_update=lambda state, response: updates.append(state.url),
+            on_error=lambda state, error: errors.append(state.url),
+            default_interval=1000,
+            min_interval=100,
+            max_interval=10000,
+        )
+
+        feed = scheduler.add_feed(FEED_URL)
+        broken_feed = scheduler.add_feed(BROKEN_FEED_URL)
+
+        assert len(scheduler.run_pending(now=0)) == 2
+        assert updates == [FEED_URL]
+        assert errors == [BROKEN_FEED_URL]
+        assert feed.interval == 500
+        assert feed.next_poll == 500
+        assert broken_feed.errors == 1
+        assert broken_feed.next_poll >= 1800
+
+        # nothing is due yet
+        assert scheduler.run_pending(now=100) == []
+        assert scheduler.next_poll_time() == 500
+
+        results = scheduler.run_pending(now=500)
+
+        assert [result.state.url for result in results] == [FEED_URL]
+        assert results[0].response.modified is False
+        assert feed.interval == 750
+        assert responses.calls[-1].request.headers["If-None-Match"] == '"abc"'
+        assert updates == [FEED_URL]
+
+    def test_removed_feeds_are_not_polled(self):
+        from indieweb_utils import FeedScheduler
+
+        scheduler = FeedScheduler()
+
+        scheduler.add_feed(FEED_URL)
+        scheduler.remove_feed(FEED_URL)
+
+        assert scheduler.next_poll_time() is None
+        assert scheduler.run_pending(now=0) == []
+
+    @responses.activate
+    def test_failing_callback_does_not_stop_polling(self):
+        """Test that every feed is rescheduled when on_update raises, and the error is passed to on_error."""
+        from indieweb_utils import FeedScheduler
+
+        urls = [f"https://example{i}.com/feed.json" for i in range(3)]
+
+        for url in urls:
+            responses.add(responses.GET, url, body=json.dumps(JSON_FEED), content_type="application/feed+json")
+
+        def on_update(state, response):
+            raise ValueError(state.url)
+
+        errors = []
+
+        scheduler = FeedScheduler(
+            on_update=on_update,
+            on_error=lambda state, error: errors.append(str(error)),
+            default_interval=1000,
+            min_interval=100,
+            max_interval=10000,
+        )
+
+        for url in urls:
+            scheduler.add_feed(url)
+
+        assert len(scheduler.run_pending(now=0)) == 3
+        assert sorted(errors) == urls
+        assert len(scheduler.run_pending(now=10000)) == 3
+
+    @responses.activate
+    def test_slow_feed_does_not_block_other_feeds(self):
+        """Test that run() keeps polling other feeds while one poll is slow."""
+        import threading
+
+        from indieweb_utils import FeedScheduler
+
+        slow_url = "https://slow.example.com/feed.json"
+        release = threading.Event()
+        fast_polls = []
+
+        def slow(request):
+            release.wait(5)
+            return (200, {"Content-Type": "application/feed+json"}, json.dumps(JSON_FEED))
+
+        def fast(request):
+            fast_polls.append(request.url)
+            return (200, {"Content-Type": "application/feed+json"}, json.dumps(JSON_FEED))
+
+        responses.add_callback(responses.GET, slow_url, callback=slow)
+        responses.add_callback(responses.GET, FEED_URL, callback=fast)
+
+        scheduler = FeedScheduler(default_interval=0.01, min_interval=0.01, max_interval=0.01)
+
+        scheduler.add_feed(slow_url)
+        scheduler.add_feed(FEED_URL)
+
+        thread = threading.Thread(target=scheduler.run)
+        thread.start()
+
+        try:
+            deadline = time.time() + 2
+
+            while len(fast_polls) < 3 and time.time() < deadline:
+                time.sleep(0.01)
+
+            assert len(fast_polls) >= 3
+        finally:
+            release.set()
+            scheduler.stop()
+            thread.join(5)
+
+        assert not thread.is_alive()
+        assert scheduler.feeds[slow_url].last_polled is not None
+
+    @responses.activate
+    def test_feed_added_during_its_poll_is_polled_again(self):
+        """Test that a feed that is added again while it is being polled is polled once the first poll completes."""
+        import threading
+
+        from indieweb_utils import FeedScheduler
+
+        polling = threading.Event()
+        release = threading.Event()
+        polls = []
+
+        def callback(request):
+            polls.append(request.url)
+            polling.set()
+            release.wait(5)
+            return (200, {"Content-Type": "application/feed+json"}, json.dumps(JSON_FEED))
+
+        responses.add_callback(responses.GET, FEED_URL, callback=callback)
+
+        scheduler = FeedScheduler(default_interval=1000, min_interval=1000, max_interval=1000)
+        scheduler.add_feed(FEED_URL)
+
+        thread = threading.Thread(target=scheduler.run)
+        thread.start()
+
+        try:
+            assert polling.wait(2)
+
+            state = scheduler.add_feed(FEED_URL)
+            release.set()
+
+            deadline = time.time() + 2
+
+            while state.last_polled is None and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            release.set()
+            scheduler.stop()
+            thread.join(5)
+
+        assert len(polls) == 2
+        assert state.last_polled is not None
@@ -0,0 +1,138 @@
+import pytest
+import responses
+
+RSS_FEED_URL = "https://jamesg.blog/feeds/posts.xml"
+ATOM_FEED_URL = "https://jamesg.blog/feeds/posts.atom"
+
+RSS_FEED = """<?xml version="1.0"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel>
+    <title>James' Coffee Blog</title>
+    <link>https://jamesg.blog/</link>
+    <item>
+        <title>One</title>
+        <link>https://jamesg.blog/1</link>
+        <content:encoded><![CDATA[<p>Hello, world!</p>]]></content:encoded>
+    </item>
+    <item><title>Two</title><link>https://jamesg.blog/2</link></item>
+    <item><title>Three</title><link>https://jamesg.blog/3</link></item>
+</channel>
+</rss>"""
+
+ATOM_FEED = """<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <title>James' Coffee Blog</title>
+    <entry><id>https://jamesg.blog/1</id><title>One</title><link href="https://jamesg.blog/1"/></entry>
+    <entry><id>https://jamesg.blog/2</id><title>Two</title><link href="https://jamesg.blog/2"/></entry>
+</feed>"""
+
+
+RDF_FEED = """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/">
+    <channel rdf:about="https://jamesg.blog/">
+        <title>James' Coffee Blog</title>
+        <link>https://jamesg.blog/</link>
+        <items>
+            <rdf:Seq>
+                <rdf:li rdf:resource="https://jamesg.blog/1"/>
+                <rdf:li rdf:resource="https://jamesg.blog/2"/>
+            </rdf:Seq>
+        </items>
+    </channel>
+    <item rdf:about="https://jamesg.blog/1"><title>One</title><link>https://jamesg.blog/1</link></item>
+    <item rdf:about="https://jamesg.blog/2"><title>Two</title><link>https://jamesg.blog/2</link></item>
+</rdf:RDF>"""
+
+# &nbsp; is not defined in XML, but is accepted by the converter used by retrieve_feed_contents()
+MALFORMED_RSS_FEED = RSS_FEED.replace("<title>Two</title>", "<title>Two&nbsp;items</title>")
+
+
+class TestIterFeedItems:
+    @pytest.fixture
+    def target(self):
+        from indieweb_utils import iter_feed_items
+
+        return iter_feed_items
+
+    @responses.activate
+    def test_rss_items_are_converted(self, target):
+        """Test that RSS items are converted with the feed-level values that come before them."""
+        responses.add(responses.GET, RSS_FEED_URL, body=RSS_FEED, content_type="application/rss+xml")
+
+        items = list(target(RSS_FEED_URL))
+
+        assert [item["url"] for item in items] == [
+            "https://jamesg.blog/1",
+            "https://jamesg.blog/2",
+            "https://jamesg.blog/3",
+        ]
+        assert items[0]["content_html"] == "<p>Hello, world!</p>"
+        assert items[2]["authors"][0]["name"] == "James' Coffee Blog"
+
+    @responses.activate
+    def test_atom_items_are_limited(self, target):
+        """Test that no more than `limit` items are returned."""
+        responses.add(responses.GET, ATOM_FEED_URL, body=ATOM_FEED, content_type="application/atom+xml")
+
+        items = list(target(ATOM_FEED_URL, limit=1))
+
+        assert [item["title"] for item in items] == ["One"]
+
+    @responses.activate
+    def test_json_feed_is_not_streamed(self, target):
+        """Test that a feed that is not an RSS or Atom feed is rejected."""
+        from indieweb_utils.feeds.poll import UnsupportedFeedFormat
+
+        responses.add(responses.GET, RSS_FEED_URL, body="{}", content_type="application/feed+json")
+
+        with pytest.raises(UnsupportedFeedFormat):
+            list(target(RSS_FEED_URL))
+
+    @responses.activate
+    def test_rdf_items_are_converted(self, target):
+        """Test that RSS 1.0 items are converted without the list of items in the channel."""
+        responses.add(responses.GET, RSS_FEED_URL, body=RDF_FEED, content_type="application/rdf+xml")
+
+        items = list(target(RSS_FEED_URL))
+
+        assert [item["url"] for item in items] == ["https://jamesg.blog/1", "https://jamesg.blog/2"]
+
+    def test_single_item_feed_leaves_out_other_items(self):
+        """Test that the feed used to convert an item does not contain other items or lists of items."""
+        from lxml import etree
+
+        from indieweb_utils.feeds.stream import _get_single_item_feed
+
+        root = etree.fromstring(RDF_FEED.encode("utf-8"))
+        second_item = root[-1]
+
+        single_item_feed = _get_single_item_feed(second_item)
+
+        assert "James' Coffee Blog" in single_item_feed
+        assert "Seq" not in single_item_feed
+        assert "https://jamesg.blog/1" not in single_item_feed
+        assert "https://jamesg.blog/2" in single_item_feed
+
+    @responses.activate
+    def test_malformed_feed_is_converted_as_a_whole(self, target):
+        """Test that a feed that is not well-formed XML is retrieved again, and no item is yielded twice."""
+        responses.add(responses.GET, RSS_FEED_URL, body=MALFORMED_RSS_FEED, content_type="application/rss+xml")
+
+        items = list(target(RSS_FEED_URL))
+
+        assert [item["url"] for item in items] == [
+            "https://jamesg.blog/1",
+            "https://jamesg.blog/2",
+            "https://jamesg.blog/3",
+        ]
+        assert items[1]["title"] == "Two\xa0items"
+
+    @responses.activate
+    def test_invalid_feed_is_rejected(self, target):
+        """Test that a feed that is not XML is rejected."""
+        from indieweb_utils.feeds.poll import FailedToFetchFeed
+
+        responses.add(responses.GET, RSS_FEED_URL, body="not a feed", content_type="application/rss+xml")
+
+        with pytest.raises(FailedToFetchFeed):
+            list(target(RSS_FEED_URL))
@@ -0,0 +1,33 @@
+import pytest
+
+from indieweb_utils.feeds import urls
+
+
+class TestGetWebFeedUrl:
+    @pytest.mark.parametrize(
+        "url, feed_url",
+        [
+            ("https://www.reddit.com/r/indieweb/", "https://www.reddit.com/r/indieweb.rss"),
+            ("https://github.com/capjamesg", "https://github.com/capjamesg.atom"),
+            ("https://github.com/capjamesg/indieweb-utils", "https://github.com/capjamesg.atom"),
+            ("https://medium.com/@capjamesg", "https://medium.com/@capjamesg/feed"),
+            ("https://www.tumblr.com/capjamesg", "https://capjamesg.tumblr.com/rss"),
+            ("https://arxiv.org/list/cs.AI/recent", "https://rss.arxiv.org/rss/cs.AI"),
+        ],
+    )
+    def test_known_feed_urls(self, url, feed_url):
+        assert urls.get_web_feed_url(url) == (feed_url, "")
+
+    @pytest.mark.parametrize(
+        "url", ["https://jamesg.blog/", "https://www.example.com/recent", "mailto:james@jamesg.blog"]
+    )
+    def test_unknown_feed_urls(self, url):
+        assert urls.get_web_feed_url(url) == (None, None)
+
+    def test_registered_rule(self, monkeypatch):
+        monkeypatch.setattr(urls, "_feed_url_rules", {})
+
+        urls.register_feed_url_rule("codeberg.org", r"/([^/]+)/?$", r"https://codeberg.org/\1.rss")
+
+        assert urls.get_web_feed_url("https://www.codeberg.org/capjamesg") == ("https://codeberg.org/capjamesg.rss", "")
+        assert urls.get_web_feed_url("https://codeberg.org/capjamesg/repo") == (None, None)
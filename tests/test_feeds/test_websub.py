@@ -0,0 +1,140 @@
+import hashlib
+import hmac
+import json
+from urllib import parse as url_parse
+
+import pytest
+import responses
+
+FEED_URL = "https://jamesg.blog/feeds/posts.xml"
+TOPIC_URL = "https://jamesg.blog/feeds/posts.rss"
+HUB_URL = "https://hub.example.com/"
+
+RSS_FEED = f"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+<channel>
+    <title>James' Coffee Blog</title>
+    <atom:link rel="hub" href="{HUB_URL}"/>
+    <atom:link rel="self" href="{TOPIC_URL}"/>
+</channel>
+</rss>"""
+
+JSON_FEED = {
+    "version": "https://jsonfeed.org/version/1.1",
+    "title": "James' Coffee Blog",
+    "items": [{"id": "1", "url": "https://jamesg.blog/1", "content_text": "Hello, world!"}],
+}
+
+
+class TestWebSubSubscriber:
+    @pytest.fixture
+    def updates(self):
+        return []
+
+    @pytest.fixture
+    def subscriber(self, updates):
+        from indieweb_utils import FeedScheduler, WebSubSubscriber
+
+        scheduler = FeedScheduler(on_update=lambda state, response: updates.append(response.contents))
+
+        return WebSubSubscriber(scheduler, "https://example.com/websub/", lease_seconds=1000, renew_before=100)
+
+    def _subscribe(self, subscriber, now=0):
+        responses.add(responses.GET, FEED_URL, body=RSS_FEED, content_type="application/rss+xml")
+        responses.add(responses.POST, HUB_URL, status=202)
+
+        subscription = subscriber.subscribe(FEED_URL, now=now)
+
+        params = {"hub.mode": "subscribe", "hub.topic": TOPIC_URL, "hub.challenge": "abc", "hub.lease_seconds": "1000"}
+
+        assert subscriber.verify_intent(subscription.id, params, now=now) == ("abc", 200)
+
+        return subscription
+
+    @responses.activate
+    def test_subscription_is_verified(self, subscriber):
+        """Test that a hub is asked to push a feed, and that polling slows down once the hub verifies it."""
+        subscription = self._subscribe(subscriber)
+
+        request = url_parse.parse_qs(responses.calls[1].request.body)
+
+        assert request["hub.mode"] == ["subscribe"]
+        assert request["hub.topic"] == [TOPIC_URL]
+        assert request["hub.callback"] == [f"https://example.com/websub/{subscription.id}"]
+        assert request["hub.secret"] == [subscription.secret]
+
+        state = subscriber.scheduler.feeds[FEED_URL]
+
+        assert subscription.status == "active"
+        assert state.push_expires == 1000
+        assert state.next_poll >= subscriber.scheduler.max_interval
+
+    @responses.activate
+    def test_verification_of_unknown_topic_is_refused(self, subscriber):
+        responses.add(responses.GET, FEED_URL, body=RSS_FEED, content_type="application/rss+xml")
+        responses.add(responses.POST, HUB_URL, status=202)
+
+        subscription = subscriber.subscribe(FEED_URL)
+
+        params = {"hub.mode": "subscribe", "hub.topic": "https://example.com/feed", "hub.challenge": "abc"}
+
+        assert subscriber.verify_intent(subscription.id, params) == ("", 404)
+        assert subscription.status == "pending"
+
+    @responses.activate
+    def test_signed_content_is_accepted(self, subscriber, updates):
+        """Test that pushed content is only converted and passed on if it is signed with the secret."""
+        subscription = self._subscribe(subscriber)
+
+        body = json.dumps(JSON_FEED).encode("utf-8")
+        signature = hmac.new(subscription.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+        unsigned_status = subscriber.receive_content(
+            subscription.id, body, {"Content-Type": "application/feed+json", "X-Hub-Signature": "sha256=0000"}
+        )
+
+        assert 200 <= unsigned_status < 300
+        assert updates == []
+
+        signed_status = subscriber.receive_content(
+            subscription.id, body, {"content-type": "application/feed+json", "x-hub-signature": f"sha256={signature}"}
+        )
+
+        assert 200 <= signed_status < 300
+        assert updates[0]["items"][0]["url"] == "https://jamesg.blog/1"
+
+    @responses.activate
+    def test_lease_is_renewed(self, subscriber):
+        """Test that a subscription is renewed before its lease expires."""
+        self._subscribe(subscriber)
+
+        assert subscriber.run_pending(now=800) == []
+        assert len(subscriber.run_pending(now=950)) == 1
+        assert len([call for call in responses.calls if call.request.url == HUB_URL]) == 2
+
+    @responses.activate
+    def test_failing_update_is_reported(self):
+        """Test that an exception raised by on_update is passed to on_error, and the hub still gets a 2xx code."""
+        from indieweb_utils import FeedScheduler, WebSubSubscriber
+
+        def on_update(state, response):
+            raise ValueError("Could not save the update.")
+
+        errors = []
+
+        scheduler = FeedScheduler(on_update=on_update)
+        subscriber = WebSubSubscriber(
+            scheduler, "https://example.com/websub/", on_error=lambda subscription, error: errors.append(error)
+        )
+
+        subscription = self._subscribe(subscriber)
+
+        body = json.dumps(JSON_FEED).encode("utf-8")
+        signature = hmac.new(subscription.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+        status = subscriber.receive_content(
+            subscription.id, body, {"Content-Type": "application/feed+json", "X-Hub-Signature": f"sha256={signature}"}
+        )
+
+        assert 200 <= status < 300
+        assert [str(error) for error in errors] == ["Could not save the update."]
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+
+class TestCache:
+    def test_cache_is_abstract(self):
+        from indieweb_utils.network import Cache
+
+        with pytest.raises(TypeError):
+            Cache()
+
+
+class TestMemoryCache:
+    def test_lru_eviction(self):
+        from indieweb_utils.network import MemoryCache
+
+        cache = MemoryCache(max_entries=2)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_ttl(self):
+        from indieweb_utils.network import MemoryCache
+
+        cache = MemoryCache()
+
+        cache.set("a", 1, ttl=0.01)
+        cache.set("b", 2, ttl=60)
+
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+
+class TestFileCache:
+    def test_persists_between_instances(self, tmp_path):
+        from indieweb_utils.network import FileCache
+
+        path = str(tmp_path / "cache.json")
+
+        FileCache(path).set("a", "https://example.com/webmention", ttl=60)
+
+        assert FileCache(path).get("a") == "https://example.com/webmention"
+
+    def test_changes_are_appended(self, tmp_path):
+        from indieweb_utils.network import FileCache
+
+        path = tmp_path / "cache.json"
+
+        cache = FileCache(str(path))
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.delete("a")
+
+        assert len(path.read_text().splitlines()) == 3
+
+        reloaded = FileCache(str(path))
+
+        assert reloaded.get("a") is None
+        assert reloaded.get("b") == 2
+        # the file is rewritten with only the current keys when it is loaded
+        assert len(path.read_text().splitlines()) == 1
+
+    def test_file_is_compacted(self, tmp_path):
+        from indieweb_utils.network import FileCache
+
+        path = tmp_path / "cache.json"
+
+        cache = FileCache(str(path), max_entries=10)
+
+        for i in range(5000):
+            cache.set(str(i), i)
+
+        assert len(path.read_text().splitlines()) <= 1024 + 1
+        assert {key: FileCache(str(path)).get(key) for key in ("4989", "4990", "4999")} == {
+            "4989": None,
+            "4990": 4990,
+            "4999": 4999,
+        }
+
+    def test_incomplete_line_is_ignored(self, tmp_path):
+        from indieweb_utils.network import FileCache
+
+        path = tmp_path / "cache.json"
+
+        FileCache(str(path)).set("a", 1)
+
+        with open(path, "a") as f:
+            f.write('["b", 2')
+
+        cache = FileCache(str(path))
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+        cache.set("c", 3)
+
+        assert FileCache(str(path)).get("c") == 3
+
+
+class TestGetCacheTTL:
+    def test_get_cache_ttl(self):
+        from indieweb_utils.network import get_cache_ttl
+
+        assert get_cache_ttl({"Cache-Control": "public, max-age=300"}, 60) == 300
+        assert get_cache_ttl({"Cache-Control": "no-store"}, 60) == 0
+        assert get_cache_ttl({"Cache-Control": "max-age=300, no-cache"}, 60) == 0
+        assert get_cache_ttl({}, 60) == 60
@@ -0,0 +1,86 @@
+import pytest
+import responses
+
+
+class TestHTTPClient:
+    @pytest.fixture
+    def client(self):
+        from indieweb_utils import HTTPClient
+
+        return HTTPClient(timeout=3, user_agent="test-agent")
+
+    @responses.activate
+    def test_client_sets_defaults(self, client):
+        """Requests made through a client carry its User-Agent."""
+        responses.add(responses.Response(responses.GET, url="https://jamesg.blog/", body="ok"))
+
+        response = client.get("https://jamesg.blog/")
+
+        assert response.text == "ok"
+        assert responses.calls[0].request.headers["User-Agent"] == "test-agent"
+
+    @responses.activate
+    def test_client_is_used_by_discovery(self, client, article, article_url):
+        """Library functions accept a client argument."""
+        from indieweb_utils import discover_webmention_endpoint
+
+        responses.add(responses.Response(responses.GET, url=article_url, body=article))
+
+        endpoint = discover_webmention_endpoint(article_url, client=client)
+
+        assert endpoint.endpoint == "https://webmention.jamesg.blog/endpoint"
+        assert responses.calls[0].request.headers["User-Agent"] == "test-agent"
+
+    def test_redirect_limited_session_shares_adapter(self, client):
+        """A per-request redirect limit reuses the client's connection pools."""
+        session = client._session_for(3)
+
+        assert session is not client.session
+        assert session.max_redirects == 3
+        assert session.get_adapter("https://jamesg.blog/") is client.adapter
+        assert client._session_for(3) is session
+
+    def test_default_client(self):
+        import indieweb_utils
+
+        original = indieweb_utils.get_default_client()
+        replacement = indieweb_utils.HTTPClient()
+
+        try:
+            indieweb_utils.set_default_client(replacement)
+
+            assert indieweb_utils.get_default_client() is replacement
+        finally:
+            indieweb_utils.set_default_client(original)
+
+
+class TestHostLimiter:
+    def test_host_limiter(self):
+        import threading
+        import time
+
+        from indieweb_utils.network import HostLimiter
+
+        limiter = HostLimiter(max_per_host=2)
+        active = {"example.com": 0, "example.org": 0}
+        peak = {"example.com": 0, "example.org": 0}
+        lock = threading.Lock()
+
+        def work(host):
+            with limiter.limit(f"https://{host}/page"):
+                with lock:
+                    active[host] += 1
+                    peak[host] = max(peak[host], active[host])
+                time.sleep(0.01)
+                with lock:
+                    active[host] -= 1
+
+        threads = [threading.Thread(target=work, args=(host,)) for host in ["example.com", "example.org"] * 5]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        assert max(peak.values()) <= 2
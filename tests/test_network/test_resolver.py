@@ -0,0 +1,107 @@
+import socket
+
+import pytest
+import requests
+import responses
+
+
+def _answers(*addresses):
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, 443)) for address in addresses]
+
+
+class TestResolver:
+    @pytest.fixture
+    def lookups(self, monkeypatch):
+        lookups = []
+        records = {"example.com": ["93.184.215.14"], "internal.example.com": ["93.184.215.14", "10.0.0.1"]}
+
+        def getaddrinfo(host, port, *args, **kwargs):
+            lookups.append(host)
+            return _answers(*records[host])
+
+        monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+        return lookups
+
+    def test_answers_are_cached(self, lookups):
+        """Test that a host is only looked up once while its answer is cached."""
+        from indieweb_utils.network import Resolver
+
+        resolver = Resolver()
+
+        assert resolver.resolve("example.com") == ["93.184.215.14"]
+        assert resolver.resolve("example.com") == ["93.184.215.14"]
+        assert lookups == ["example.com"]
+
+    def test_host_with_a_private_address_is_rejected(self, lookups):
+        """Test that a host is rejected if any of its addresses is private."""
+        from indieweb_utils.network import Resolver, UnacceptableIPAddress
+
+        with pytest.raises(UnacceptableIPAddress):
+            Resolver().resolve("internal.example.com")
+
+    @pytest.mark.parametrize("host", ["127.0.0.1", "169.254.169.254", "::1", "::ffff:10.0.0.1"])
+    def test_private_ip_literals_are_rejected(self, host):
+        """Test that loopback, link-local, private, and IPv4-mapped private addresses are rejected."""
+        from indieweb_utils.network import Resolver, UnacceptableIPAddress
+
+        with pytest.raises(UnacceptableIPAddress):
+            Resolver().resolve(host)
+
+    def test_client_with_resolver_does_not_connect_to_private_address(self):
+        """Test that a HTTPClient with a resolver refuses to connect to a private address."""
+        from indieweb_utils import HTTPClient
+        from indieweb_utils.network import Resolver, UnacceptableIPAddress
+
+        client = HTTPClient(resolver=Resolver(), max_retries=0)
+
+        with pytest.raises(UnacceptableIPAddress):
+            client.get("http://127.0.0.1/")
+
+    @responses.activate
+    def test_private_endpoint_is_rejected_by_discovery(self):
+        """Test that a webmention endpoint on a private IP address is rejected."""
+        from indieweb_utils import discover_webmention_endpoint
+        from indieweb_utils.network import UnacceptableIPAddress
+
+        responses.add(
+            responses.GET,
+            "https://example.com/post",
+            headers={"Link": '<http://192.168.0.1/webmention>; rel="webmention"'},
+        )
+
+        with pytest.raises(UnacceptableIPAddress):
+            discover_webmention_endpoint("https://example.com/post")
+
+    def test_unacceptable_address_is_a_connection_error(self):
+        """Test that code that handles requests that could not connect also handles rejected addresses."""
+        from indieweb_utils import HTTPClient
+        from indieweb_utils.network import Resolver
+
+        client = HTTPClient(resolver=Resolver(), max_retries=0)
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.get("http://127.0.0.1/")
+
+    @responses.activate
+    def test_private_endpoint_is_not_retried_by_outbox(self):
+        """Test that a webmention to a private endpoint fails without a retry."""
+        from indieweb_utils import WebmentionOutbox
+        from indieweb_utils.network import UnacceptableIPAddress
+
+        responses.add(
+            responses.GET,
+            "https://example.com/post",
+            headers={"Link": '<http://192.168.0.1/webmention>; rel="webmention"'},
+        )
+
+        results = []
+        outbox = WebmentionOutbox(on_result=results.append)
+
+        outbox.add("https://jamesg.blog/post", "https://example.com/post")
+        outbox.run_pending()
+
+        assert isinstance(results[0].error, UnacceptableIPAddress)
+        assert outbox.status("https://jamesg.blog/post", "https://example.com/post") == "failed"
+
+        outbox.close()
@@ -0,0 +1,21 @@
+class TestParseMF2Documents:
+    def test_parse_mf2_documents(self, reply1, post):
+        """Test that documents parsed in worker processes match documents parsed in-process."""
+        import mf2py
+
+        from indieweb_utils import parse_mf2_documents
+
+        documents = [
+            ("https://jamesg.blog/2022/01/28/integrated-indieweb-services/", reply1),
+            ("https://aaronparecki.com/2022/09/26/18/eyefi", post),
+        ] * 3
+
+        results = list(parse_mf2_documents(documents, max_workers=2, chunksize=2))
+
+        assert [result.url for result in results] == [url for url, _ in documents]
+        assert results[0].data["items"] == mf2py.parse(doc=reply1, url=documents[0][0])["items"]
+
+        unordered_results = list(parse_mf2_documents(documents, max_workers=2, chunksize=1, ordered=False))
+
+        assert sorted(result.url for result in unordered_results) == sorted(url for url, _ in documents)
+        assert all(result.error is None for result in unordered_results)
@@ -0,0 +1,53 @@
+import responses
+
+
+class TestParsedPage:
+    @responses.activate
+    def test_parsed_page_is_shared_by_helpers(self, post):
+        """Test that a ParsedPage retrieves a page once and gives the same results as parsing the HTML."""
+        from indieweb_utils import (
+            ParsedPage,
+            get_page_name,
+            get_post_type,
+            get_reply_urls,
+            get_representative_h_card,
+            get_syndicated_copies,
+        )
+
+        url = "https://aaronparecki.com/2022/09/26/18/eyefi"
+
+        responses.add(responses.Response(responses.GET, url=url, body=post))
+
+        page = ParsedPage.from_url(url)
+
+        assert sorted(get_syndicated_copies(page=page)) == sorted(get_syndicated_copies(url, html=post))
+        assert get_reply_urls(page=page) == get_reply_urls(url, html=post)
+        assert get_page_name(page=page) == get_page_name(url, html=post)
+        assert get_representative_h_card(page=page)["properties"]["url"] == ["https://aaronparecki.com/"]
+        assert get_post_type(page=page) == "note"
+
+        assert len(responses.calls) == 1
+
+    def test_parsed_page_detects_encoding(self):
+        """Test that the encoding of a page without a declared encoding is detected."""
+        from indieweb_utils import ParsedPage
+
+        html = '<html><head><meta charset="utf-8"><title>Café</title></head></html>'.encode("utf-8")
+
+        page = ParsedPage(url="https://example.com/", html=html)
+
+        assert page.soup.title.text == "Café"
+
+    def test_post_type_of_item_with_several_types(self):
+        """Test that the first h-entry of a page is found when it has more than one type."""
+        from indieweb_utils import ParsedPage, get_page_name, get_post_type
+
+        html = (
+            '<div class="h-card"><span class="p-name">James</span></div>'
+            '<div class="h-entry h-as-note"><a class="u-like-of" href="https://example.com/">Liked</a></div>'
+        )
+
+        page = ParsedPage(url="https://example.com/", html=html)
+
+        assert get_post_type(page=page) == "like"
+        assert get_page_name(page=page) == get_page_name(html=html)
@@ -0,0 +1,39 @@
+import responses
+
+
+class TestGetReplyContexts:
+    @responses.activate
+    def test_reply_contexts_and_errors_are_returned(self, reply1):
+        """Test that a result is returned for every URL, including URLs that could not be retrieved."""
+        from indieweb_utils import get_reply_contexts
+
+        url = "https://jamesg.blog/2022/01/28/integrated-indieweb-services/"
+        missing_url = "https://jamesg.blog/missing/"
+
+        responses.add(responses.GET, url, body=reply1)
+        responses.add(responses.GET, missing_url, status=404)
+
+        results = {result.url: result for result in get_reply_contexts([url, missing_url, url])}
+
+        assert len(results) == 2
+        assert results[url].context.name == "Integrated IndieWeb Services"
+        assert results[missing_url].context is None
+        assert results[missing_url].error is not None
+
+    @responses.activate
+    def test_author_page_is_retrieved_once(self, reply2, author2):
+        """Test that an author page shared by several posts is only retrieved once per batch."""
+        from indieweb_utils import get_reply_contexts
+
+        urls = [f"https://aaronparecki.com/2022/01/29/{i}/raspi-usb-webcam-hdmi" for i in range(3)]
+
+        for url in urls:
+            responses.add(responses.GET, url, body=reply2)
+
+        responses.add(responses.GET, "https://aaronparecki.com/", body=author2)
+
+        # one worker, so the posts are processed one after another
+        results = list(get_reply_contexts(urls, max_workers=1))
+
+        assert all(result.context.authors[0].name == "Aaron Parecki" for result in results)
+        assert len([call for call in responses.calls if call.request.url == "https://aaronparecki.com/"]) == 1
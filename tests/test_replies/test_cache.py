@@ -0,0 +1,49 @@
+import pytest
+import responses
+
+URL = "https://jamesg.blog/2022/01/28/integrated-indieweb-services/"
+
+
+class TestReplyContextCache:
+    @pytest.fixture
+    def contexts(self, tmp_path):
+        from indieweb_utils import ReplyContextCache
+        from indieweb_utils.network import FileCache
+
+        contexts = ReplyContextCache(FileCache(str(tmp_path / "contexts.json")), ttl=60)
+
+        yield contexts
+
+        contexts.close()
+
+    @responses.activate
+    def test_fresh_reply_context_is_served_from_cache(self, contexts, reply1):
+        """Test that a fresh reply context is returned without a request."""
+        responses.add(responses.GET, URL, body=reply1)
+
+        first = contexts.get_reply_context(URL)
+        second = contexts.get_reply_context(URL)
+
+        assert second == first
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_stale_reply_context_is_revalidated(self, contexts, reply1, monkeypatch):
+        """Test that a stale reply context is returned straight away and revalidated with a conditional request."""
+        import time
+
+        responses.add(responses.GET, URL, body=reply1, headers={"ETag": '"v1"'})
+        responses.add(responses.GET, URL, status=304)
+
+        first = contexts.get_reply_context(URL)
+
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 120)
+
+        assert contexts.get_reply_context(URL) == first
+
+        # wait for the background revalidation
+        contexts.close()
+
+        assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+        assert contexts.cache.get(f"reply-context:{URL}")["generated"] == now + 120
@@ -1,4 +1,5 @@
 import responses
+
 from indieweb_utils.replies import context
 
 
@@ -141,3 +142,121 @@ class TestReplyContext:
             reply_context.description
             == "A community group dedicated to creating sustainable websites. This group will not publish specifications."  # noqa
         )
+
+    @responses.activate
+    def test_page_is_retrieved_once(self, reply1):
+        """Test that the webmention endpoint is discovered without retrieving the page again."""
+        url = "https://jamesg.blog/2022/01/28/integrated-indieweb-services/"
+        responses.add(responses.Response(responses.GET, url=url, body=reply1))
+
+        reply_context = context.get_reply_context(url=url)
+
+        assert reply_context.webmention_endpoint == "https://webmention.jamesg.blog/endpoint"
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_author_url_is_retrieved_instead_of_the_page(self):
+        """Test that the author page of a h-entry whose author is a URL is retrieved instead of the page itself."""
+        url = "https://example.com/post"
+        author_url = "https://example.com/about"
+
+        responses.add(
+            responses.GET,
+            url,
+            body=(
+                '<div class="h-entry"><h1 class="p-name">A post</h1>'
+                f'<span class="p-author">{author_url}</span><p class="e-content">Hello, world!</p></div>'
+            ),
+        )
+        responses.add(
+            responses.GET,
+            author_url,
+            body=f'<div class="h-card"><a class="u-url p-name" href="{author_url}">Jane</a></div>',
+        )
+
+        reply_context = context.get_reply_context(url=url)
+
+        assert reply_context.authors[0].name == "Jane"
+        assert reply_context.authors[0].url == author_url
+        assert [call.request.url for call in responses.calls] == [url, author_url]
+
+    @responses.activate
+    def test_author_name_does_not_retrieve_the_page_again(self):
+        """Test that a h-entry whose author is a name uses the page that has already been retrieved."""
+        url = "https://example.com/post"
+
+        responses.add(
+            responses.GET,
+            url,
+            body=(
+                '<div class="h-entry"><h1 class="p-name">A post</h1>'
+                '<span class="p-author">Jane</span><p class="e-content">Hello, world!</p></div>'
+            ),
+        )
+
+        reply_context = context.get_reply_context(url=url)
+
+        assert reply_context.authors[0].url == url
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_slow_author_page_is_skipped(self, reply2, author2):
+        """Test that an author page that is not retrieved before the deadline is not used."""
+        import time
+
+        url = "https://aaronparecki.com/2022/01/29/12/raspi-usb-webcam-hdmi"
+
+        def slow_author_page(request):
+            time.sleep(1)
+            return (200, {}, author2)
+
+        responses.add(responses.Response(responses.GET, url=url, body=reply2))
+        responses.add_callback(responses.GET, "https://aaronparecki.com/", callback=slow_author_page)
+
+        reply_context = context.get_reply_context(url=url, deadline=0.1)
+
+        assert reply_context.name is not None
+        assert reply_context.authors[0].name != "Aaron Parecki"
+
+    @responses.activate
+    def test_favicon_is_checked_once(self, reply3):
+        """Test that a favicon is checked with a HEAD request, and only once for every page on a site."""
+        from indieweb_utils.network import MemoryCache
+
+        url = "https://www.theguardian.com/technology/2022/jan/31/beats-fit-pro-review"
+        other_url = "https://www.theguardian.com/technology/2022/feb/01/another-review"
+        favicon_url = "https://static.guim.co.uk/images/favicon-32x32.ico"
+        icon_cache = MemoryCache()
+
+        responses.add(responses.Response(responses.GET, url=url, body=reply3))
+        responses.add(responses.Response(responses.GET, url=other_url, body=reply3))
+        responses.add(responses.Response(responses.HEAD, url=favicon_url))
+
+        assert context.get_reply_context(url=url, icon_cache=icon_cache).authors[0].photo == favicon_url
+        assert context.get_reply_context(url=other_url, icon_cache=icon_cache).authors[0].photo == favicon_url
+
+        assert len([call for call in responses.calls if call.request.url == favicon_url]) == 1
+        # the icon is stored once for the site
+        assert icon_cache.get("icon:www.theguardian.com") == favicon_url
+
+    @responses.activate
+    def test_favicon_is_checked_with_range_request(self, reply3):
+        """Test that only the first byte of a favicon is requested if the server does not support HEAD requests."""
+        from indieweb_utils.network import MemoryCache
+
+        url = "https://www.theguardian.com/technology/2022/jan/31/beats-fit-pro-review"
+        favicon_url = "https://static.guim.co.uk/images/favicon-32x32.ico"
+
+        responses.add(responses.Response(responses.GET, url=url, body=reply3))
+        responses.add(responses.Response(responses.HEAD, url=favicon_url, status=405))
+        responses.add(
+            responses.Response(
+                responses.GET,
+                url=favicon_url,
+                status=206,
+                body=b"\x00",
+                match=[responses.matchers.header_matcher({"Range": "bytes=0-0"})],
+            )
+        )
+
+        assert context.get_reply_context(url=url, icon_cache=MemoryCache()).authors[0].photo == favicon_url
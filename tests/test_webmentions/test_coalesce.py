@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+SOURCE = "https://example.com/reply"
+TARGET = "https://jamesg.blog/post"
+
+
+class TestWebmentionCoalescer:
+    @pytest.fixture
+    def calls(self):
+        return []
+
+    def test_recent_result_is_reused(self, calls):
+        """Test that a webmention validated within the window is not validated again."""
+        from indieweb_utils import WebmentionCoalescer
+
+        coalescer = WebmentionCoalescer(window=60, validator=lambda source, target, **kwargs: calls.append(1) or "ok")
+
+        assert coalescer.validate_webmention(SOURCE, TARGET) == "ok"
+        assert coalescer.validate_webmention(SOURCE, TARGET) == "ok"
+        assert len(calls) == 1
+
+    def test_validations_with_other_arguments_are_not_shared(self, calls):
+        """Test that a result is only reused for calls with the same arguments."""
+        from indieweb_utils import WebmentionCoalescer
+
+        coalescer = WebmentionCoalescer(window=60, validator=lambda source, target, **kwargs: calls.append(kwargs))
+
+        coalescer.validate_webmention(SOURCE, TARGET)
+        coalescer.validate_webmention(SOURCE, TARGET, stream=True)
+        coalescer.validate_webmention(SOURCE, TARGET, stream=True)
+        coalescer.validate_webmention(SOURCE, TARGET, vouch_list=["example.org"])
+        coalescer.validate_webmention(SOURCE, TARGET, vouch_list=["example.net"])
+        coalescer.validate_webmention(SOURCE, TARGET, max_bytes=100)
+
+        assert calls == [
+            {},
+            {"stream": True},
+            {"vouch_list": ["example.org"]},
+            {"vouch_list": ["example.net"]},
+            {"max_bytes": 100},
+        ]
+
+    def test_concurrent_validations_are_coalesced(self, calls):
+        """Test that a webmention that is already being validated is not validated again at the same time."""
+        from indieweb_utils import WebmentionCoalescer
+
+        release = threading.Event()
+
+        def validator(source, target, **kwargs):
+            calls.append(1)
+            release.wait(5)
+            return "ok"
+
+        coalescer = WebmentionCoalescer(window=0, validator=validator)
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(coalescer.validate_webmention(SOURCE, TARGET)))
+            for _ in range(4)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        # give every thread time to start waiting for the first validation
+        time.sleep(0.2)
+        release.set()
+
+        for thread in threads:
+            thread.join()
+
+        assert results == ["ok"] * 4
+        assert len(calls) == 1
+
+    def test_unavailable_source_is_not_remembered(self, calls):
+        """Test that a webmention whose source was temporarily unavailable is validated again."""
+        from indieweb_utils import WebmentionCoalescer
+        from indieweb_utils.webmentions.validate import WebmentionSourceUnavailable
+
+        def validator(source, target, **kwargs):
+            calls.append(1)
+            raise WebmentionSourceUnavailable("Source timed out.")
+
+        coalescer = WebmentionCoalescer(window=60, validator=validator)
+
+        for _ in range(2):
+            with pytest.raises(WebmentionSourceUnavailable):
+                coalescer.validate_webmention(SOURCE, TARGET)
+
+        assert len(calls) == 2
+
+    def test_remembered_error_is_raised_as_a_copy(self, calls):
+        """Test that every caller gets its own exception when an invalid webmention is remembered."""
+        from indieweb_utils import WebmentionCoalescer
+        from indieweb_utils.webmentions.validate import WebmentionValidationError
+
+        def validator(source, target, **kwargs):
+            calls.append(1)
+            raise WebmentionValidationError("Source does not link to target.")
+
+        coalescer = WebmentionCoalescer(window=60, validator=validator)
+        errors = []
+
+        for _ in range(3):
+            with pytest.raises(WebmentionValidationError, match="does not link") as error:
+                coalescer.validate_webmention(SOURCE, TARGET)
+
+            errors.append(error.value)
+
+        assert len(calls) == 1
+        assert len({id(error) for error in errors}) == 3
+        assert errors[1].__cause__ is errors[0]
+        assert errors[2].__cause__ is errors[0]
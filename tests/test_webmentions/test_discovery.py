@@ -36,3 +36,141 @@ class TestWebmentionEndpointDiscovery:
         get_endpoint = target(article_url)
 
         assert get_endpoint.endpoint == "https://webmention.jamesg.blog/endpoint"
+
+    @responses.activate
+    def test_webmention_endpoint_is_cached(self, target):
+        """Test that discovered endpoints are reused for other pages on the same site."""
+        from indieweb_utils.network import MemoryCache
+        from indieweb_utils.webmentions.discovery import WebmentionEndpointNotFound
+
+        responses.add(
+            responses.GET,
+            "https://example.com/1",
+            body="",
+            headers={"Link": '<https://webmention.example.com/endpoint>; rel="webmention"'},
+        )
+        responses.add(responses.GET, "https://example.org/", body="<html></html>")
+        responses.add(
+            responses.GET,
+            "https://example.net/",
+            body="",
+            headers={"Link": '<https://example.net/endpoint>; rel="webmention"', "Cache-Control": "no-store"},
+        )
+
+        cache = MemoryCache()
+
+        for url in ["https://example.com/1", "https://example.com/1", "https://example.com/2"]:
+            assert target(url, cache=cache).endpoint == "https://webmention.example.com/endpoint"
+
+        for _ in range(2):
+            with pytest.raises(WebmentionEndpointNotFound):
+                target("https://example.org/", cache=cache)
+
+            target("https://example.net/", cache=cache)
+
+        assert [call.request.url for call in responses.calls] == [
+            "https://example.com/1",
+            "https://example.org/",
+            "https://example.net/",
+            "https://example.net/",
+        ]
+
+    @pytest.mark.parametrize("stream", [False, True])
+    @responses.activate
+    def test_unavailable_target_is_not_cached(self, target, stream):
+        """Test that a target that returns an error is not cached, and that 5xx and 429 codes are transient errors."""
+        from indieweb_utils import HTTPClient
+        from indieweb_utils.network import MemoryCache
+        from indieweb_utils.webmentions import WebmentionTargetUnavailable
+        from indieweb_utils.webmentions.discovery import WebmentionEndpointNotFound
+
+        # the client does not retry, so each status code is returned to discovery
+        client = HTTPClient(max_retries=0)
+        url = "https://example.com/post"
+        link = {"Link": '<https://example.com/webmention>; rel="webmention"'}
+
+        responses.add(responses.GET, url, status=503, headers={"Retry-After": "120"})
+        responses.add(responses.GET, url, status=404)
+        responses.add(responses.GET, url, body="", headers=link)
+
+        cache = MemoryCache()
+
+        with pytest.raises(WebmentionTargetUnavailable) as error:
+            target(url, client=client, cache=cache, stream=stream)
+
+        assert error.value.status_code == 503
+        assert error.value.retry_after == 120
+
+        with pytest.raises(WebmentionEndpointNotFound):
+            target(url, client=client, cache=cache, stream=stream)
+
+        assert target(url, client=client, cache=cache, stream=stream).endpoint == "https://example.com/webmention"
+        assert target(url, client=client, cache=cache, stream=stream).endpoint == "https://example.com/webmention"
+        assert len(responses.calls) == 3
+
+
+class TestStreamingEndpointDiscovery:
+    @responses.activate
+    def test_streaming_discovery_reads_head(self):
+        """Test that streaming discovery finds <link> elements in the <head> and ignores the <body>."""
+        from indieweb_utils import discover_endpoints
+
+        responses.add(
+            responses.GET,
+            "https://example.com/",
+            body=(
+                "<html><head><title>Example</title>"
+                '<link rel="micropub" href="/micropub">'
+                '<link rel="webmention" href="https://example.com/webmention">'
+                '</head><body><link rel="microsub" href="https://example.com/microsub"></body></html>'
+            ),
+        )
+
+        endpoints = discover_endpoints("https://example.com/", ["webmention", "micropub", "microsub"], stream=True)
+
+        assert endpoints == {"webmention": "https://example.com/webmention", "micropub": "https://example.com/micropub"}
+
+    @responses.activate
+    def test_streaming_discovery_prefers_link_header(self):
+        """Test that streaming discovery uses the Link header before the page."""
+        from indieweb_utils import discover_webmention_endpoint
+
+        responses.add(
+            responses.GET,
+            "https://example.com/",
+            body='<html><head><link rel="webmention" href="https://example.com/page-endpoint"></head></html>',
+            headers={"Link": '<https://example.com/header-endpoint>; rel="webmention"'},
+        )
+
+        response = discover_webmention_endpoint("https://example.com/", stream=True)
+
+        assert response.endpoint == "https://example.com/header-endpoint"
+
+    @pytest.mark.parametrize("stream", [False, True])
+    @responses.activate
+    def test_both_modes_use_the_same_precedence(self, stream):
+        """Test that the first Link header wins, then the first <link> in document order, in both modes."""
+        from indieweb_utils import discover_endpoints
+
+        responses.add(
+            responses.GET,
+            "https://example.com/",
+            body=(
+                "<html><head>"
+                '<link rel="micropub" href="/first-micropub">'
+                '<link rel="webmention" href="/page-endpoint">'
+                '<link rel="micropub other" href="/second-micropub">'
+                "</head><body></body></html>"
+            ),
+            headers={
+                "Link": '<https://example.com/first-endpoint>; rel="webmention", '
+                '<https://example.com/second-endpoint>; rel="webmention"'
+            },
+        )
+
+        endpoints = discover_endpoints("https://example.com/", ["webmention", "micropub"], stream=stream)
+
+        assert endpoints == {
+            "webmention": "https://example.com/first-endpoint",
+            "micropub": "https://example.com/first-micropub",
+        }
@@ -0,0 +1,135 @@
+import pytest
+import responses
+
+SOURCE = "https://jamesg.blog/post"
+TARGET = "https://example.com/post"
+ENDPOINT = "https://example.com/webmention"
+
+
+class TestWebmentionOutbox:
+    @pytest.fixture
+    def results(self):
+        return []
+
+    @pytest.fixture
+    def outbox(self, results):
+        from indieweb_utils import HTTPClient, WebmentionOutbox
+
+        # the client does not retry, so retries are made by the outbox
+        outbox = WebmentionOutbox(on_result=results.append, retry_delay=10, client=HTTPClient(max_retries=0))
+
+        yield outbox
+
+        outbox.close()
+
+    @pytest.fixture
+    def target_page(self):
+        responses.add(responses.GET, TARGET, headers={"Link": f'<{ENDPOINT}>; rel="webmention"'})
+
+    @responses.activate
+    def test_webmention_is_sent(self, outbox, results, target_page):
+        """Test that a webmention in the outbox is sent and passed to the callback."""
+        responses.add(responses.POST, ENDPOINT, status=202)
+
+        assert outbox.add(SOURCE, TARGET) is True
+
+        outbox.run_pending()
+
+        assert results[0].sent is True
+        assert outbox.status(SOURCE, TARGET) == "sent"
+
+    def test_duplicate_webmention_is_added_once(self, outbox):
+        """Test that a webmention that is already waiting to be sent is not added again."""
+        assert outbox.add(SOURCE, TARGET) is True
+        assert outbox.add(SOURCE, TARGET) is False
+        assert outbox.pending_count() == 1
+
+    @responses.activate
+    def test_retry_after_is_respected(self, outbox, results, target_page):
+        """Test that a 429 response is retried no sooner than its Retry-After header allows."""
+        responses.add(responses.POST, ENDPOINT, status=429, headers={"Retry-After": "3600"})
+        responses.add(responses.POST, ENDPOINT, status=202)
+
+        outbox.add(SOURCE, TARGET)
+
+        before = outbox.next_attempt_time()
+
+        assert outbox.run_pending() == []
+        assert outbox.status(SOURCE, TARGET) == "pending"
+        assert outbox.next_attempt_time() >= before + 3600
+
+        outbox.run_pending(now=outbox.next_attempt_time())
+
+        assert results[0].sent is True
+        assert results[0].webmention.attempts == 2
+
+    @responses.activate
+    def test_unavailable_target_is_retried(self, outbox, results):
+        """Test that a target that returns a 503 response during discovery is retried, and its endpoint then used."""
+        responses.add(responses.GET, TARGET, status=503, headers={"Retry-After": "60"})
+        responses.add(responses.GET, TARGET, headers={"Link": f'<{ENDPOINT}>; rel="webmention"'})
+        responses.add(responses.POST, ENDPOINT, status=202)
+
+        outbox.add(SOURCE, TARGET)
+
+        before = outbox.next_attempt_time()
+
+        assert outbox.run_pending() == []
+        assert outbox.status(SOURCE, TARGET) == "pending"
+        assert outbox.next_attempt_time() >= before + 60
+
+        outbox.run_pending(now=outbox.next_attempt_time())
+
+        assert results[0].sent is True
+        assert results[0].webmention.attempts == 2
+
+    @responses.activate
+    def test_permanent_error_is_not_retried(self, outbox, results, target_page):
+        """Test that a 400 response from the endpoint fails without a retry."""
+        responses.add(responses.POST, ENDPOINT, status=400)
+
+        outbox.add(SOURCE, TARGET)
+        outbox.run_pending()
+
+        assert results[0].sent is False
+        assert outbox.status(SOURCE, TARGET) == "failed"
+        assert outbox.next_attempt_time() is None
+
+    @responses.activate
+    def test_slow_receiver_does_not_block_other_webmentions(self, outbox, results, target_page):
+        """Test that run() sends webmentions that are added while another one is slow."""
+        import threading
+        import time
+
+        slow_target = "https://slow.example.com/post"
+        release = threading.Event()
+
+        def slow(request):
+            release.wait(5)
+            return (404, {}, "")
+
+        responses.add_callback(responses.GET, slow_target, callback=slow)
+        responses.add(responses.POST, ENDPOINT, status=202)
+
+        outbox.add(SOURCE, slow_target)
+
+        thread = threading.Thread(target=outbox.run)
+        thread.start()
+
+        try:
+            outbox.add(SOURCE, TARGET)
+
+            deadline = time.time() + 2
+
+            while not results and time.time() < deadline:
+                time.sleep(0.01)
+
+            assert [result.webmention.target for result in results] == [TARGET]
+        finally:
+            release.set()
+            outbox.stop()
+            thread.join(5)
+
+        assert not thread.is_alive()
+        assert outbox.status(SOURCE, slow_target) == "failed"
+        assert outbox.pending_count() == 0
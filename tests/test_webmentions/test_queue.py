@@ -0,0 +1,120 @@
+import pytest
+import responses
+
+SOURCE = "https://example.com/reply"
+TARGET = "https://jamesg.blog/post"
+
+
+class TestWebmentionQueue:
+    @pytest.fixture
+    def results(self):
+        return []
+
+    @pytest.fixture
+    def queue(self, results):
+        from indieweb_utils import HTTPClient, WebmentionQueue
+
+        # the client does not retry, so retries are made by the queue
+        queue = WebmentionQueue(on_result=results.append, retry_delay=10, client=HTTPClient(max_retries=0))
+
+        yield queue
+
+        queue.close()
+
+    @responses.activate
+    def test_valid_webmention(self, queue, results):
+        """Test that a queued webmention is validated and passed to the callback."""
+        responses.add(responses.GET, SOURCE, body=f'<a href="{TARGET}">A post</a>', content_type="text/html")
+
+        assert queue.enqueue(SOURCE, TARGET) is True
+
+        queue.run_pending()
+
+        assert len(results) == 1
+        assert results[0].valid is True
+        assert queue.status(SOURCE, TARGET) == "valid"
+
+    def test_duplicate_webmention_is_queued_once(self, queue):
+        """Test that a webmention that is already waiting to be validated is not queued again."""
+        assert queue.enqueue(SOURCE, TARGET) is True
+        assert queue.enqueue(SOURCE, TARGET) is False
+        assert queue.pending_count() == 1
+
+    @responses.activate
+    def test_unavailable_source_is_retried(self, queue, results):
+        """Test that a source that returns a 5xx code is retried later."""
+        responses.add(responses.GET, SOURCE, status=503, content_type="text/html")
+        responses.add(responses.GET, SOURCE, body=f'<a href="{TARGET}">A post</a>', content_type="text/html")
+
+        queue.enqueue(SOURCE, TARGET)
+
+        assert queue.run_pending() == []
+        assert queue.status(SOURCE, TARGET) == "pending"
+
+        queue.run_pending(now=queue.next_attempt_time())
+
+        assert len(results) == 1
+        assert results[0].valid is True
+        assert results[0].webmention.attempts == 2
+
+    @responses.activate
+    def test_invalid_webmention_is_not_retried(self, queue, results):
+        """Test that a source that does not link to the target is invalid and is not retried."""
+        responses.add(responses.GET, SOURCE, body="<p>No links here</p>", content_type="text/html")
+
+        queue.enqueue(SOURCE, TARGET)
+        queue.run_pending()
+
+        assert results[0].valid is False
+        assert queue.status(SOURCE, TARGET) == "invalid"
+        assert queue.next_attempt_time() is None
+
+    def test_queue_is_persisted(self, tmp_path):
+        """Test that queued webmentions are still queued when the database is reopened."""
+        from indieweb_utils import WebmentionQueue
+
+        path = str(tmp_path / "webmentions.db")
+
+        queue = WebmentionQueue(path)
+        queue.enqueue(SOURCE, TARGET)
+        queue.close()
+
+        queue = WebmentionQueue(path)
+
+        assert queue.status(SOURCE, TARGET) == "pending"
+
+        queue.close()
+
+    @responses.activate
+    def test_failing_callback_does_not_leave_webmentions_processing(self):
+        """Test that every outcome is saved when on_result raises."""
+        from indieweb_utils import WebmentionQueue
+
+        sources = [f"https://example{i}.com/reply" for i in range(3)]
+
+        for source in sources:
+            responses.add(responses.GET, source, body=f'<a href="{TARGET}">A post</a>', content_type="text/html")
+
+        def on_result(result):
+            raise ValueError(result.webmention.source)
+
+        queue = WebmentionQueue(on_result=on_result)
+
+        for source in sources:
+            queue.enqueue(source, TARGET)
+
+        assert len(queue.run_pending()) == 3
+        assert [queue.status(source, TARGET) for source in sources] == ["valid"] * 3
+        assert queue.pending_count() == 0
+
+        queue.close()
+
+    def test_store_requires_every_method(self):
+        """Test that a store that does not implement every method cannot be created."""
+        from indieweb_utils.webmentions.store import _WebmentionStore
+
+        class IncompleteStore(_WebmentionStore):
+            _table = "incomplete"
+
+        with pytest.raises(TypeError):
+            IncompleteStore(":memory:", None, 1, 1, 1, 1, 1)
@@ -0,0 +1,34 @@
+import responses
+
+
+class TestSendWebmentions:
+    @responses.activate
+    def test_send_webmentions(self):
+        """Test sending a webmention to several targets, including one without an endpoint."""
+        from indieweb_utils import send_webmentions
+
+        for post in ("1", "2"):
+            responses.add(
+                responses.GET,
+                f"https://example.com/{post}",
+                body="",
+                headers={"Link": '<https://webmention.example.com/endpoint>; rel="webmention"'},
+            )
+
+        responses.add(responses.GET, "https://example.org/", body="<html></html>")
+        responses.add(responses.POST, "https://webmention.example.com/endpoint", status=202)
+
+        results = send_webmentions(
+            "https://jamesg.blog/post",
+            ["https://example.com/1", "https://example.org/", "https://example.com/2", "https://example.com/1"],
+        )
+
+        assert [result.target for result in results] == [
+            "https://example.com/1",
+            "https://example.org/",
+            "https://example.com/2",
+        ]
+        assert [result.sent for result in results] == [True, False, True]
+        assert results[0].response.status_code == 202
+        assert results[1].response is None
+        assert len([call for call in responses.calls if call.request.method == "POST"]) == 2
@@ -0,0 +1,125 @@
+import pytest
+import responses
+
+SOURCE = "https://example.com/reply"
+TARGET = "https://jamesg.blog/post"
+
+
+class TestValidateWebmention:
+    @pytest.fixture
+    def target(self):
+        from indieweb_utils import validate_webmention
+
+        return validate_webmention
+
+    @responses.activate
+    def test_valid_webmention(self, target):
+        """Test that a source that links to the target is valid."""
+        responses.add(responses.GET, SOURCE, body=f'<p><a href="{TARGET}">A post</a></p>', content_type="text/html")
+
+        response = target(SOURCE, TARGET)
+
+        assert response.webmention_is_valid is True
+
+    @responses.activate
+    def test_source_larger_than_max_bytes(self, target):
+        """Test that the download of a source stops once it is larger than max_bytes."""
+        from indieweb_utils.webmentions.validate import WebmentionValidationError
+
+        body = "<p>" + "a" * 10000 + f'<a href="{TARGET}">A post</a></p>'
+
+        responses.add(responses.GET, SOURCE, body=body, content_type="text/html", auto_calculate_content_length=False)
+
+        with pytest.raises(WebmentionValidationError, match="too large"):
+            target(SOURCE, TARGET, max_bytes=1000)
+
+    @responses.activate
+    def test_invalid_content_length_is_ignored(self, target):
+        """Test that a Content-Length header that is not a number does not stop validation."""
+        responses.add(
+            responses.GET,
+            SOURCE,
+            body=f'<p><a href="{TARGET}">A post</a></p>',
+            content_type="text/html",
+            headers={"Content-Length": "abc"},
+            auto_calculate_content_length=False,
+        )
+
+        response = target(SOURCE, TARGET)
+
+        assert response.webmention_is_valid is True
+
+    @responses.activate
+    def test_source_is_gone(self, target):
+        """Test that a source that returns 410 Gone raises WebmentionIsGone."""
+        from indieweb_utils.webmentions.validate import WebmentionIsGone
+
+        responses.add(responses.GET, SOURCE, status=410, content_type="text/html")
+
+        with pytest.raises(WebmentionIsGone):
+            target(SOURCE, TARGET)
+
+    @responses.activate
+    def test_stream_stops_at_link_to_target(self, target):
+        """Test that a streamed source is only read until a link to the target is found."""
+        body = '<p><a href="/post">A post</a></p>' + "<p>" + "a" * 100000 + "</p>"
+
+        responses.add(responses.GET, SOURCE, body=body, content_type="text/html")
+
+        response = target(SOURCE, TARGET, stream=True, max_bytes=None)
+
+        assert response.webmention_is_valid is True
+        assert response.source_tree is None
+        assert len(response.source_text) < len(body)
+
+    @responses.activate
+    def test_stream_source_without_link_to_target(self, target):
+        """Test that a streamed source without a link to the target is invalid."""
+        from indieweb_utils.webmentions.validate import WebmentionValidationError
+
+        responses.add(
+            responses.GET, SOURCE, body='<p><a href="https://example.com/other">Other</a></p>', content_type="text/html"
+        )
+
+        with pytest.raises(WebmentionValidationError, match="does not contain a link"):
+            target(SOURCE, TARGET, stream=True)
+
+    @responses.activate
+    def test_stream_source_with_gone_status(self, target):
+        """Test that a streamed source with a http-equiv 410 Gone status raises WebmentionIsGone."""
+        from indieweb_utils.webmentions.validate import WebmentionIsGone
+
+        body = f'<head><link http-equiv="Status" content="410 Gone"></head><a href="{TARGET}">A post</a>'
+
+        responses.add(responses.GET, SOURCE, body=body, content_type="text/html")
+
+        with pytest.raises(WebmentionIsGone):
+            target(SOURCE, TARGET, stream=True)
+
+    @responses.activate
+    def test_stream_reads_head_after_link_to_target(self, target):
+        """Test that a streamed source is read to the end of its <head> for a gone status after a link is found."""
+        from indieweb_utils.webmentions.validate import WebmentionIsGone
+
+        # the gone status is in a later chunk than the link to the target
+        body = (
+            f'<html><head><link rel="in-reply-to" href="{TARGET}"><style>{"a" * 100000}</style>'
+            '<meta http-equiv="Status" content="410 Gone"></head><body></body></html>'
+        )
+
+        responses.add(responses.GET, SOURCE, body=body, content_type="text/html")
+
+        with pytest.raises(WebmentionIsGone):
+            target(SOURCE, TARGET, stream=True, max_bytes=None)
+
+    @responses.activate
+    def test_meta_gone_status(self, target):
+        """Test that a source with a <meta> http-equiv 410 Gone status raises WebmentionIsGone."""
+        from indieweb_utils.webmentions.validate import WebmentionIsGone
+
+        body = f'<head><meta http-equiv="Status" content="410 Gone"></head><a href="{TARGET}">A post</a>'
+
+        responses.add(responses.GET, SOURCE, body=body, content_type="text/html")
+
+        with pytest.raises(WebmentionIsGone):
+            target(SOURCE, TARGET)